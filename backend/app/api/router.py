@@ -2,7 +2,7 @@
 API router configuration.
 """
 from fastapi import APIRouter
-from app.api.v1 import auth, accounts, transactions, budgets, goals, dashboard, reports
+from app.api.v1 import auth, accounts, transactions, budgets, goals, dashboard, reports, forecast, alerts, rules, insights
 
 api_router = APIRouter()
 
@@ -14,4 +14,7 @@ api_router.include_router(budgets.router, prefix="/budgets", tags=["budgets"])
 api_router.include_router(goals.router, prefix="/goals", tags=["goals"])
 api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
 api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
-
+api_router.include_router(forecast.router, prefix="/forecast", tags=["forecast"])
+api_router.include_router(alerts.router, prefix="/alerts", tags=["alerts"])
+api_router.include_router(rules.router, prefix="/rules", tags=["categorization"])
+api_router.include_router(insights.router, prefix="/insights", tags=["insights"])
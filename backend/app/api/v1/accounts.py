@@ -1,40 +1,68 @@
 """
 Accounts API endpoints.
 """
-from typing import List
+from typing import List, Optional, Union
+from datetime import date
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from app.core.serialization import LeanJSONResponse
 from app.db.session import get_db
-from app.dependencies import get_current_user
-from app.models.user import User
+from app.dependencies import get_current_user, get_read_only_user
+from app.schemas.user import User
 from app.models.account import Account
 from app.schemas.account import AccountCreate, AccountUpdate, Account as AccountSchema
-from app.services.accounts_service import AccountsService
+from app.schemas.pagination import Page
+from app.services.accounts_service import ACCOUNT_COLUMNS, AccountsService
+from app.services.balance_history_service import BalanceHistoryService
+from app.services.rollup_service import Granularity
+from app.services.async_service import AsyncService
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[AccountSchema])
+@router.get("/", response_model=Union[List[AccountSchema], Page[AccountSchema]])
 async def get_accounts(
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_read_only_user),
     db: Session = Depends(get_db)
 ):
-    """Get all accounts for the current user."""
-    service = AccountsService(db)
-    return service.get_user_accounts(current_user.id, skip=skip, limit=limit)
+    """
+    Get all accounts for the current user.
+
+    Passing ``cursor`` (empty for the first page) switches to keyset
+    pagination and returns ``items`` with a ``next_cursor``.
+    """
+    service = AsyncService(AccountsService, db)
+    if cursor is not None:
+        try:
+            items, next_cursor = await service.get_user_accounts_page(
+                current_user.id,
+                cursor=cursor,
+                limit=limit,
+                columns=ACCOUNT_COLUMNS
+            )
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(exc)
+            )
+        return LeanJSONResponse({"items": items, "next_cursor": next_cursor})
+    return LeanJSONResponse(
+        await service.get_user_accounts(current_user.id, skip=skip, limit=limit, columns=ACCOUNT_COLUMNS)
+    )
 
 
 @router.get("/{account_id}", response_model=AccountSchema)
 async def get_account(
     account_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_read_only_user),
     db: Session = Depends(get_db)
 ):
     """Get a specific account by ID."""
-    service = AccountsService(db)
-    account = service.get_account(account_id, current_user.id)
+    service = AsyncService(AccountsService, db)
+    account = await service.get_account(account_id, current_user.id)
     if not account:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -43,6 +71,43 @@ async def get_account(
     return account
 
 
+@router.get("/{account_id}/balance-history")
+async def get_balance_history(
+    account_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    granularity: Granularity = Granularity.DAY,
+    current_user: User = Depends(get_read_only_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get an account's end-of-day balances over a date range.
+
+    Defaults to the last 30 days; with a coarser ``granularity`` each point
+    is the balance at the end of its period.
+    """
+    service = AsyncService(BalanceHistoryService, db)
+    try:
+        history = await service.get_balance_history(
+            account_id,
+            current_user.id,
+            start_date,
+            end_date,
+            granularity
+        )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
+    if history is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Account not found"
+        )
+    return LeanJSONResponse(history)
+
+
 @router.post("/", response_model=AccountSchema, status_code=status.HTTP_201_CREATED)
 async def create_account(
     account_data: AccountCreate,
@@ -50,8 +115,8 @@ async def create_account(
     db: Session = Depends(get_db)
 ):
     """Create a new account."""
-    service = AccountsService(db)
-    return service.create_account(account_data, current_user.id)
+    service = AsyncService(AccountsService, db)
+    return await service.create_account(account_data, current_user.id)
 
 
 @router.put("/{account_id}", response_model=AccountSchema)
@@ -62,8 +127,8 @@ async def update_account(
     db: Session = Depends(get_db)
 ):
     """Update an existing account."""
-    service = AccountsService(db)
-    account = service.update_account(account_id, account_data, current_user.id)
+    service = AsyncService(AccountsService, db)
+    account = await service.update_account(account_id, account_data, current_user.id)
     if not account:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -79,8 +144,8 @@ async def delete_account(
     db: Session = Depends(get_db)
 ):
     """Delete an account."""
-    service = AccountsService(db)
-    success = service.delete_account(account_id, current_user.id)
+    service = AsyncService(AccountsService, db)
+    success = await service.delete_account(account_id, current_user.id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,38 @@
+"""
+Alerts API endpoints.
+"""
+from typing import List
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.core.serialization import LeanJSONResponse
+from app.db.session import get_db
+from app.dependencies import get_read_only_user
+from app.schemas.alert import Alert as AlertSchema
+from app.schemas.user import User
+from app.services.alerts_service import AlertsService
+from app.services.async_service import AsyncService
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[AlertSchema])
+async def get_alerts(
+    include_resolved: bool = False,
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: User = Depends(get_read_only_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the current user's budget alerts, newest first.
+
+    Alerts are recorded when transaction writes push a budget over one of
+    the configured thresholds, so this reads stored rows once budgets left
+    in an earlier period are moved into the current one. Alerts whose
+    spending fell back below the threshold are left out unless
+    ``include_resolved`` is set.
+    """
+    service = AsyncService(AlertsService, db)
+    await service.sync_stale_budgets(current_user.id)
+    return LeanJSONResponse(
+        await service.get_user_alerts(current_user.id, include_resolved=include_resolved, limit=limit)
+    )
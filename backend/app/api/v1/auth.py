@@ -5,12 +5,12 @@ from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from app.db.session import get_db, run_db
 from app.core.security import create_access_token, create_refresh_token, verify_password, get_password_hash
 from app.core.config import settings
 from app.schemas.user import UserCreate, User, Token, UserLogin, RefreshTokenRequest
 from app.models.user import User as UserModel
-from app.dependencies import get_current_user
+from app.dependencies import decode_user_id, get_current_user
 
 router = APIRouter()
 
@@ -19,9 +19,9 @@ router = APIRouter()
 async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     """Register a new user."""
     # Check if user already exists
-    existing_user = db.query(UserModel).filter(
+    existing_user = await run_db(db, lambda session: session.query(UserModel).filter(
         (UserModel.email == user_data.email) | (UserModel.username == user_data.username)
-    ).first()
+    ).first())
     
     if existing_user:
         raise HTTPException(
@@ -38,9 +38,12 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         hashed_password=hashed_password
     )
     
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    def save(session):
+        session.add(db_user)
+        session.commit()
+        session.refresh(db_user)
+    
+    await run_db(db, save)
     
     return db_user
 
@@ -52,7 +55,9 @@ async def login(
 ):
     """Login and get access token."""
     # Find user by username
-    user = db.query(UserModel).filter(UserModel.username == form_data.username).first()
+    user = await run_db(db, lambda session: session.query(UserModel).filter(
+        UserModel.username == form_data.username
+    ).first())
     
     if not user or not verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
@@ -70,10 +75,10 @@ async def login(
     # Create tokens
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.id, "username": user.username},
+        data={"sub": str(user.id), "username": user.username},
         expires_delta=access_token_expires
     )
-    refresh_token = create_refresh_token(data={"sub": user.id, "username": user.username})
+    refresh_token = create_refresh_token(data={"sub": str(user.id), "username": user.username})
     
     return {
         "access_token": access_token,
@@ -88,17 +93,16 @@ async def refresh_token(
     db: Session = Depends(get_db)
 ):
     """Refresh access token using refresh token."""
-    from app.core.security import decode_token
-    
-    payload = decode_token(token_data.refresh_token)
-    if payload is None or payload.get("type") != "refresh":
+    user_id, payload = decode_user_id(token_data.refresh_token)
+    if payload.get("type") != "refresh":
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid refresh token"
         )
     
-    user_id = payload.get("sub")
-    user = db.query(UserModel).filter(UserModel.id == user_id).first()
+    user = await run_db(db, lambda session: session.query(UserModel).filter(
+        UserModel.id == user_id
+    ).first())
     
     if not user or not user.is_active:
         raise HTTPException(
@@ -109,10 +113,10 @@ async def refresh_token(
     # Create new tokens
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.id, "username": user.username},
+        data={"sub": str(user.id), "username": user.username},
         expires_delta=access_token_expires
     )
-    new_refresh_token = create_refresh_token(data={"sub": user.id, "username": user.username})
+    new_refresh_token = create_refresh_token(data={"sub": str(user.id), "username": user.username})
     
     return {
         "access_token": access_token,
@@ -122,7 +126,7 @@ async def refresh_token(
 
 
 @router.get("/me", response_model=User)
-async def get_current_user_info(current_user: UserModel = Depends(get_current_user)):
+async def get_current_user_info(current_user: User = Depends(get_current_user)):
     """Get current user information."""
     return current_user
 
@@ -1,39 +1,94 @@
 """
 Budgets API endpoints.
 """
-from typing import List
+from typing import List, Optional, Union
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from app.core.serialization import LeanJSONResponse
 from app.db.session import get_db
-from app.dependencies import get_current_user
-from app.models.user import User
-from app.schemas.budget import BudgetCreate, BudgetUpdate, Budget as BudgetSchema, BudgetWithSpending
-from app.services.budget_service import BudgetService
+from app.dependencies import get_current_user, get_read_only_user
+from app.schemas.user import User
+from app.schemas.budget import (
+    BudgetCreate,
+    BudgetUpdate,
+    Budget as BudgetSchema,
+    BudgetWithSpending,
+    BudgetPeriodSpending,
+)
+from app.schemas.pagination import Page
+from app.services.budget_service import BUDGET_COLUMNS, BudgetService
+from app.services.async_service import AsyncService
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[BudgetSchema])
+@router.get(
+    "/",
+    response_model=Union[
+        List[BudgetSchema],
+        Page[BudgetSchema],
+        List[BudgetWithSpending],
+        Page[BudgetWithSpending]
+    ]
+)
 async def get_budgets(
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    with_spending: bool = False,
+    current_user: User = Depends(get_read_only_user),
     db: Session = Depends(get_db)
 ):
-    """Get all budgets for the current user."""
-    service = BudgetService(db)
-    return service.get_user_budgets(current_user.id, skip=skip, limit=limit)
+    """
+    Get all budgets for the current user.
+
+    Passing ``cursor`` (empty for the first page) switches to keyset
+    pagination and returns ``items`` with a ``next_cursor``. With
+    ``with_spending`` each budget includes its spent and remaining amounts.
+    """
+    service = AsyncService(BudgetService, db)
+    if cursor is not None:
+        try:
+            if with_spending:
+                items, next_cursor = await service.get_user_budgets_with_spending_page(
+                    current_user.id,
+                    cursor=cursor,
+                    limit=limit
+                )
+                # Rendered here, as validating against the union would pick
+                # Page[Budget] and drop the spending fields
+                return LeanJSONResponse({
+                    "items": [item.model_dump(mode="json") for item in items],
+                    "next_cursor": next_cursor
+                })
+            items, next_cursor = await service.get_user_budgets_page(
+                current_user.id,
+                cursor=cursor,
+                limit=limit,
+                columns=BUDGET_COLUMNS
+            )
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(exc)
+            )
+        return LeanJSONResponse({"items": items, "next_cursor": next_cursor})
+    if with_spending:
+        return await service.get_user_budgets_with_spending(current_user.id, skip=skip, limit=limit)
+    return LeanJSONResponse(
+        await service.get_user_budgets(current_user.id, skip=skip, limit=limit, columns=BUDGET_COLUMNS)
+    )
 
 
 @router.get("/{budget_id}", response_model=BudgetWithSpending)
 async def get_budget(
     budget_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_read_only_user),
     db: Session = Depends(get_db)
 ):
     """Get a specific budget by ID with spending information."""
-    service = BudgetService(db)
-    budget = service.get_budget_with_spending(budget_id, current_user.id)
+    service = AsyncService(BudgetService, db)
+    budget = await service.get_budget_with_spending(budget_id, current_user.id)
     if not budget:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -42,6 +97,28 @@ async def get_budget(
     return budget
 
 
+@router.get("/{budget_id}/history", response_model=List[BudgetPeriodSpending])
+async def get_budget_history(
+    budget_id: int,
+    current_user: User = Depends(get_read_only_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the spent and remaining amounts of every period of a budget so far.
+
+    Periods repeat weekly, monthly or yearly from the budget's start date;
+    the last entry is the current period.
+    """
+    service = AsyncService(BudgetService, db)
+    history = await service.get_budget_history(budget_id, current_user.id)
+    if history is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Budget not found"
+        )
+    return history
+
+
 @router.post("/", response_model=BudgetSchema, status_code=status.HTTP_201_CREATED)
 async def create_budget(
     budget_data: BudgetCreate,
@@ -49,8 +126,8 @@ async def create_budget(
     db: Session = Depends(get_db)
 ):
     """Create a new budget."""
-    service = BudgetService(db)
-    return service.create_budget(budget_data, current_user.id)
+    service = AsyncService(BudgetService, db)
+    return await service.create_budget(budget_data, current_user.id)
 
 
 @router.put("/{budget_id}", response_model=BudgetSchema)
@@ -61,8 +138,8 @@ async def update_budget(
     db: Session = Depends(get_db)
 ):
     """Update an existing budget."""
-    service = BudgetService(db)
-    budget = service.update_budget(budget_id, budget_data, current_user.id)
+    service = AsyncService(BudgetService, db)
+    budget = await service.update_budget(budget_id, budget_data, current_user.id)
     if not budget:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -78,8 +155,8 @@ async def delete_budget(
     db: Session = Depends(get_db)
 ):
     """Delete a budget."""
-    service = BudgetService(db)
-    success = service.delete_budget(budget_id, current_user.id)
+    service = AsyncService(BudgetService, db)
+    success = await service.delete_budget(budget_id, current_user.id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1,22 +1,34 @@
 """
 Dashboard API endpoints.
 """
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
+from app.core.response_cache import cached_response
 from app.db.session import get_db
-from app.dependencies import get_current_user
-from app.models.user import User
+from app.dependencies import get_read_only_user
+from app.schemas.user import User
 from app.services.reports_service import ReportsService
+from app.services.rollup_service import utc_today
+from app.services.async_service import AsyncService
 
 router = APIRouter()
 
 
 @router.get("/summary")
 async def get_dashboard_summary(
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    current_user: User = Depends(get_read_only_user),
     db: Session = Depends(get_db)
 ):
     """Get dashboard summary statistics."""
-    service = ReportsService(db)
-    return service.get_dashboard_summary(current_user.id)
+    service = AsyncService(ReportsService, db)
+    # Month figures roll over with the calendar, not only on writes
+    month = utc_today().replace(day=1)
+    return await cached_response(
+        request,
+        current_user.id,
+        "dashboard.summary",
+        {"month": month},
+        lambda: service.get_dashboard_summary(current_user.id)
+    )
 
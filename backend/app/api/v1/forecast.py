@@ -0,0 +1,34 @@
+"""
+Forecast API endpoints.
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.db.session import get_db
+from app.dependencies import get_read_only_user
+from app.schemas.user import User
+from app.services.forecast_service import ForecastService
+from app.services.async_service import AsyncService
+
+router = APIRouter()
+
+
+@router.get("/expenses")
+async def forecast_expenses(
+    months: int = Query(3, ge=1, le=24),
+    current_user: User = Depends(get_read_only_user),
+    db: Session = Depends(get_db)
+):
+    """Forecast total monthly expenses, starting with the current month."""
+    service = AsyncService(ForecastService, db)
+    return await service.forecast_monthly_expenses(current_user.id, months)
+
+
+@router.get("/expenses/by-category")
+async def forecast_expenses_by_category(
+    months: int = Query(3, ge=1, le=24),
+    current_user: User = Depends(get_read_only_user),
+    db: Session = Depends(get_db)
+):
+    """Forecast monthly expenses for each category."""
+    service = AsyncService(ForecastService, db)
+    return await service.forecast_expenses_by_category(current_user.id, months)
@@ -1,39 +1,64 @@
 """
 Goals API endpoints.
 """
-from typing import List
+from typing import List, Optional, Union
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from app.core.serialization import LeanJSONResponse
 from app.db.session import get_db
-from app.dependencies import get_current_user
-from app.models.user import User
+from app.dependencies import get_current_user, get_read_only_user
+from app.schemas.user import User
 from app.schemas.goal import GoalCreate, GoalUpdate, Goal as GoalSchema, GoalWithProgress
-from app.services.goals_service import GoalsService
+from app.schemas.pagination import Page
+from app.services.goals_service import GOAL_COLUMNS, GoalsService
+from app.services.async_service import AsyncService
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[GoalSchema])
+@router.get("/", response_model=Union[List[GoalSchema], Page[GoalSchema]])
 async def get_goals(
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_read_only_user),
     db: Session = Depends(get_db)
 ):
-    """Get all goals for the current user."""
-    service = GoalsService(db)
-    return service.get_user_goals(current_user.id, skip=skip, limit=limit)
+    """
+    Get all goals for the current user.
+
+    Passing ``cursor`` (empty for the first page) switches to keyset
+    pagination and returns ``items`` with a ``next_cursor``.
+    """
+    service = AsyncService(GoalsService, db)
+    if cursor is not None:
+        try:
+            items, next_cursor = await service.get_user_goals_page(
+                current_user.id,
+                cursor=cursor,
+                limit=limit,
+                columns=GOAL_COLUMNS
+            )
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(exc)
+            )
+        return LeanJSONResponse({"items": items, "next_cursor": next_cursor})
+    return LeanJSONResponse(
+        await service.get_user_goals(current_user.id, skip=skip, limit=limit, columns=GOAL_COLUMNS)
+    )
 
 
 @router.get("/{goal_id}", response_model=GoalWithProgress)
 async def get_goal(
     goal_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_read_only_user),
     db: Session = Depends(get_db)
 ):
     """Get a specific goal by ID with progress information."""
-    service = GoalsService(db)
-    goal = service.get_goal_with_progress(goal_id, current_user.id)
+    service = AsyncService(GoalsService, db)
+    goal = await service.get_goal_with_progress(goal_id, current_user.id)
     if not goal:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -49,8 +74,8 @@ async def create_goal(
     db: Session = Depends(get_db)
 ):
     """Create a new goal."""
-    service = GoalsService(db)
-    return service.create_goal(goal_data, current_user.id)
+    service = AsyncService(GoalsService, db)
+    return await service.create_goal(goal_data, current_user.id)
 
 
 @router.put("/{goal_id}", response_model=GoalSchema)
@@ -61,8 +86,8 @@ async def update_goal(
     db: Session = Depends(get_db)
 ):
     """Update an existing goal."""
-    service = GoalsService(db)
-    goal = service.update_goal(goal_id, goal_data, current_user.id)
+    service = AsyncService(GoalsService, db)
+    goal = await service.update_goal(goal_id, goal_data, current_user.id)
     if not goal:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -78,8 +103,8 @@ async def delete_goal(
     db: Session = Depends(get_db)
 ):
     """Delete a goal."""
-    service = GoalsService(db)
-    success = service.delete_goal(goal_id, current_user.id)
+    service = AsyncService(GoalsService, db)
+    success = await service.delete_goal(goal_id, current_user.id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
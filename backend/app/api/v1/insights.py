@@ -0,0 +1,40 @@
+"""
+Insights API endpoints.
+"""
+from typing import Optional
+from datetime import date
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.orm import Session
+from app.core.response_cache import cached_response
+from app.db.session import get_db
+from app.dependencies import get_read_only_user
+from app.schemas.user import User
+from app.services.insights_service import InsightsService
+from app.services.async_service import AsyncService
+
+router = APIRouter()
+
+
+@router.get("/anomalies")
+async def get_anomalies(
+    request: Request,
+    month: Optional[date] = None,
+    threshold: Optional[float] = Query(None, gt=0, le=10),
+    history_months: Optional[int] = Query(None, ge=2, le=60),
+    current_user: User = Depends(get_read_only_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get categories and transactions with unusually high spending.
+
+    ``month`` is any day of the month to check (default: the current one);
+    ``threshold`` is in standard deviations above the user's norm.
+    """
+    service = AsyncService(InsightsService, db)
+    return await cached_response(
+        request,
+        current_user.id,
+        "insights.anomalies",
+        {"month": month, "threshold": threshold, "history_months": history_months},
+        lambda: service.get_anomalies(current_user.id, month, threshold, history_months)
+    )
@@ -2,37 +2,115 @@
 Reports API endpoints.
 """
 from typing import Optional
-from datetime import datetime
-from fastapi import APIRouter, Depends, Query
+from datetime import date, datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
+from app.core.response_cache import cached_response
 from app.db.session import get_db
-from app.dependencies import get_current_user
-from app.models.user import User
-from app.services.reports_service import ReportsService
+from app.dependencies import get_read_only_user
+from app.schemas.user import User
+from app.services.balance_history_service import BalanceHistoryService
+from app.services.reports_service import Breakdown, ReportsService
+from app.services.rollup_service import Granularity
+from app.services.async_service import AsyncService
 
 router = APIRouter()
 
 
 @router.get("/expenses-by-category")
 async def get_expenses_by_category(
+    request: Request,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_read_only_user),
     db: Session = Depends(get_db)
 ):
     """Get expense breakdown by category."""
-    service = ReportsService(db)
-    return service.get_expenses_by_category(current_user.id, start_date, end_date)
+    service = AsyncService(ReportsService, db)
+    return await cached_response(
+        request,
+        current_user.id,
+        "reports.expenses_by_category",
+        {"start_date": start_date, "end_date": end_date},
+        lambda: service.get_expenses_by_category(current_user.id, start_date, end_date)
+    )
 
 
 @router.get("/income-vs-expenses")
 async def get_income_vs_expenses(
+    request: Request,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    current_user: User = Depends(get_current_user),
+    granularity: Optional[Granularity] = None,
+    breakdown: Optional[Breakdown] = None,
+    current_user: User = Depends(get_read_only_user),
     db: Session = Depends(get_db)
 ):
-    """Get income vs expenses trend."""
-    service = ReportsService(db)
-    return service.get_income_vs_expenses(current_user.id, start_date, end_date)
+    """
+    Get income vs expenses trend.
 
+    With ``granularity`` (day, week, month or quarter) the response is the
+    full zero-filled series; ``breakdown`` splits it by category or account.
+    """
+    service = AsyncService(ReportsService, db)
+    
+    async def compute():
+        try:
+            return await service.get_income_vs_expenses(
+                current_user.id,
+                start_date,
+                end_date,
+                granularity=granularity,
+                breakdown=breakdown
+            )
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(exc)
+            )
+    
+    return await cached_response(
+        request,
+        current_user.id,
+        "reports.income_vs_expenses",
+        {
+            "start_date": start_date,
+            "end_date": end_date,
+            "granularity": granularity,
+            "breakdown": breakdown
+        },
+        compute
+    )
+
+
+@router.get("/net-worth")
+async def get_net_worth(
+    request: Request,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    granularity: Granularity = Granularity.DAY,
+    current_user: User = Depends(get_read_only_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get net worth over time: the summed end-of-period balances of all
+    active accounts. Defaults to daily points for the last 30 days.
+    """
+    service = AsyncService(BalanceHistoryService, db)
+    
+    async def compute():
+        try:
+            return await service.get_net_worth(current_user.id, start_date, end_date, granularity)
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(exc)
+            )
+    
+    return await cached_response(
+        request,
+        current_user.id,
+        "reports.net_worth",
+        {"start_date": start_date, "end_date": end_date, "granularity": granularity},
+        compute
+    )
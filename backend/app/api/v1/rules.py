@@ -0,0 +1,121 @@
+"""
+Categorization rules API endpoints.
+"""
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from app.db.session import get_db
+from app.dependencies import get_current_user, get_read_only_user
+from app.schemas.user import User
+from app.schemas.categorization_rule import (
+    CategorizationRuleCreate,
+    CategorizationRuleUpdate,
+    CategorizationRule as CategorizationRuleSchema,
+    RecategorizeResult,
+)
+from app.services.categorization_service import CategorizationService
+from app.services.async_service import AsyncService
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[CategorizationRuleSchema])
+async def get_rules(
+    skip: int = 0,
+    limit: int = 100,
+    current_user: User = Depends(get_read_only_user),
+    db: Session = Depends(get_db)
+):
+    """Get the current user's categorization rules in the order they are applied."""
+    service = AsyncService(CategorizationService, db)
+    return await service.get_user_rules(current_user.id, skip=skip, limit=limit)
+
+
+@router.post("/apply", response_model=RecategorizeResult)
+async def apply_rules(
+    only_uncategorized: bool = Query(True),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Re-categorize existing transactions with the current rules.
+
+    By default only uncategorized transactions are considered; pass
+    ``only_uncategorized=false`` to let rules override earlier categories.
+    """
+    service = AsyncService(CategorizationService, db)
+    return await service.recategorize(current_user.id, only_uncategorized=only_uncategorized)
+
+
+@router.get("/{rule_id}", response_model=CategorizationRuleSchema)
+async def get_rule(
+    rule_id: int,
+    current_user: User = Depends(get_read_only_user),
+    db: Session = Depends(get_db)
+):
+    """Get a specific rule by ID."""
+    service = AsyncService(CategorizationService, db)
+    rule = await service.get_rule(rule_id, current_user.id)
+    if not rule:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Rule not found"
+        )
+    return rule
+
+
+@router.post("/", response_model=CategorizationRuleSchema, status_code=status.HTTP_201_CREATED)
+async def create_rule(
+    rule_data: CategorizationRuleCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Create a new categorization rule."""
+    service = AsyncService(CategorizationService, db)
+    try:
+        return await service.create_rule(rule_data, current_user.id)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
+
+
+@router.put("/{rule_id}", response_model=CategorizationRuleSchema)
+async def update_rule(
+    rule_id: int,
+    rule_data: CategorizationRuleUpdate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Update an existing categorization rule."""
+    service = AsyncService(CategorizationService, db)
+    try:
+        rule = await service.update_rule(rule_id, rule_data, current_user.id)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
+    if not rule:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Rule not found"
+        )
+    return rule
+
+
+@router.delete("/{rule_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_rule(
+    rule_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Delete a categorization rule."""
+    service = AsyncService(CategorizationService, db)
+    success = await service.delete_rule(rule_id, current_user.id)
+    if not success:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Rule not found"
+        )
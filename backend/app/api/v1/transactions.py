@@ -1,52 +1,174 @@
 """
 Transactions API endpoints.
 """
-from typing import List, Optional
+import csv
+import io
+from typing import Any, List, Optional, Union
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Body, Depends, File, HTTPException, status, Query, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.dependencies import get_current_user
-from app.models.user import User
-from app.schemas.transaction import TransactionCreate, TransactionUpdate, Transaction as TransactionSchema
-from app.services.transactions_service import TransactionsService
+from app.core.export import MEDIA_TYPES, ExportFormat, encode_batches, parquet_available
+from app.core.serialization import LeanJSONResponse
+from app.db.session import SessionLocal, get_db, run_db
+from app.dependencies import get_current_user, get_read_only_user
+from app.schemas.user import User
+from app.schemas.transaction import (
+    TransactionCreate,
+    TransactionUpdate,
+    Transaction as TransactionSchema,
+    TransactionImportResult,
+)
+from app.schemas.pagination import Page
+from app.services.transactions_service import EXPORT_COLUMNS, TRANSACTION_COLUMNS, TransactionsService
+from app.services.async_service import AsyncService
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[TransactionSchema])
+@router.get("/", response_model=Union[List[TransactionSchema], Page[TransactionSchema]])
 async def get_transactions(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     account_id: Optional[int] = None,
     category_id: Optional[int] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    current_user: User = Depends(get_current_user),
+    q: Optional[str] = Query(None, max_length=200),
+    current_user: User = Depends(get_read_only_user),
     db: Session = Depends(get_db)
 ):
-    """Get all transactions for the current user with optional filters."""
-    service = TransactionsService(db)
-    return service.get_user_transactions(
+    """
+    Get all transactions for the current user with optional filters.
+
+    ``q`` searches descriptions and notes; matches are ranked by relevance
+    (newest first under keyset pagination). Passing ``cursor`` (empty for
+    the first page) switches to keyset pagination and returns ``items``
+    with a ``next_cursor``; ``skip`` is kept for backward compatibility
+    only.
+    """
+    q = q.strip() if q else None
+    service = AsyncService(TransactionsService, db)
+    if cursor is not None:
+        try:
+            items, next_cursor = await service.get_user_transactions_page(
+                current_user.id,
+                cursor=cursor,
+                limit=limit,
+                account_id=account_id,
+                category_id=category_id,
+                start_date=start_date,
+                end_date=end_date,
+                q=q,
+                columns=TRANSACTION_COLUMNS
+            )
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(exc)
+            )
+        return LeanJSONResponse({"items": items, "next_cursor": next_cursor})
+    return LeanJSONResponse(await service.get_user_transactions(
         current_user.id,
         skip=skip,
         limit=limit,
         account_id=account_id,
         category_id=category_id,
         start_date=start_date,
-        end_date=end_date
+        end_date=end_date,
+        q=q,
+        columns=TRANSACTION_COLUMNS
+    ))
+
+
+@router.post("/bulk", response_model=TransactionImportResult)
+async def bulk_create_transactions(
+    rows: List[Any] = Body(...),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Import a JSON array of transactions, reporting rejected rows."""
+    service = AsyncService(TransactionsService, db)
+    return await service.bulk_create_transactions(rows, current_user.id)
+
+
+@router.post("/bulk/csv", response_model=TransactionImportResult)
+async def bulk_import_transactions_csv(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Import transactions from a CSV upload.
+
+    The header row must name the transaction fields (account_id, amount,
+    transaction_type, date, ...). Rows are read from the upload as a stream.
+    """
+    reader = csv.DictReader(io.TextIOWrapper(file.file, encoding="utf-8-sig", newline=""))
+    service = AsyncService(TransactionsService, db)
+    try:
+        return await service.bulk_create_transactions(reader, current_user.id)
+    except (UnicodeDecodeError, csv.Error) as exc:
+        await run_db(db, lambda session: session.rollback())
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid CSV file: {exc}"
+        )
+
+
+@router.get("/export")
+async def export_transactions(
+    format: ExportFormat = ExportFormat.CSV,
+    account_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    current_user: User = Depends(get_read_only_user)
+):
+    """
+    Export the current user's transactions as CSV, NDJSON or Parquet.
+
+    Takes the same filters as the list endpoint. Rows are streamed from
+    the database straight into the response, so the export size does not
+    affect memory use.
+    """
+    if format == ExportFormat.PARQUET and not parquet_available():
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Parquet export requires the pyarrow package"
+        )
+    
+    def batches():
+        # The stream outlives the request handler, so it owns its session
+        db = SessionLocal()
+        try:
+            yield from TransactionsService(db).iter_export_batches(
+                current_user.id,
+                account_id=account_id,
+                category_id=category_id,
+                start_date=start_date,
+                end_date=end_date
+            )
+        finally:
+            db.close()
+    
+    return StreamingResponse(
+        encode_batches(format, EXPORT_COLUMNS, batches()),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="transactions.{format.value}"'}
     )
 
 
 @router.get("/{transaction_id}", response_model=TransactionSchema)
 async def get_transaction(
     transaction_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_read_only_user),
     db: Session = Depends(get_db)
 ):
     """Get a specific transaction by ID."""
-    service = TransactionsService(db)
-    transaction = service.get_transaction(transaction_id, current_user.id)
+    service = AsyncService(TransactionsService, db)
+    transaction = await service.get_transaction(transaction_id, current_user.id)
     if not transaction:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -62,8 +184,14 @@ async def create_transaction(
     db: Session = Depends(get_db)
 ):
     """Create a new transaction."""
-    service = TransactionsService(db)
-    return service.create_transaction(transaction_data, current_user.id)
+    service = AsyncService(TransactionsService, db)
+    try:
+        return await service.create_transaction(transaction_data, current_user.id)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
 
 
 @router.put("/{transaction_id}", response_model=TransactionSchema)
@@ -74,8 +202,14 @@ async def update_transaction(
     db: Session = Depends(get_db)
 ):
     """Update an existing transaction."""
-    service = TransactionsService(db)
-    transaction = service.update_transaction(transaction_id, transaction_data, current_user.id)
+    service = AsyncService(TransactionsService, db)
+    try:
+        transaction = await service.update_transaction(transaction_id, transaction_data, current_user.id)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
     if not transaction:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -91,8 +225,8 @@ async def delete_transaction(
     db: Session = Depends(get_db)
 ):
     """Delete a transaction."""
-    service = TransactionsService(db)
-    success = service.delete_transaction(transaction_id, current_user.id)
+    service = AsyncService(TransactionsService, db)
+    success = await service.delete_transaction(transaction_id, current_user.id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,77 @@
+"""
+In-process caching primitives.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+# Sentinel returned on cache misses so None can be cached
+MISSING = object()
+
+
+class CacheBackend:
+    """
+    Interface for cache backends.
+
+    The in-process TTLCache is the default; a shared backend (e.g. Redis)
+    can implement the same methods and be swapped in so that all workers see
+    the same entries and invalidations.
+    """
+    
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value or MISSING."""
+        raise NotImplementedError
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, expiring after ``ttl`` seconds (backend default if None)."""
+        raise NotImplementedError
+    
+    def delete(self, key: Hashable) -> None:
+        """Remove a key if present."""
+        raise NotImplementedError
+    
+    def clear(self) -> None:
+        """Remove every entry."""
+        raise NotImplementedError
+
+
+class TTLCache(CacheBackend):
+    """Thread-safe LRU cache whose entries also expire after a TTL."""
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return MISSING
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return MISSING
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,301 @@
+"""
+Compiled matcher for categorization rules.
+
+A user's rules are compiled once into a ``RuleMatcher``:
+
+- merchant substrings (case-insensitive) become one regex shaped like a
+  trie of all the literals (the regex-engine equivalent of Aho-Corasick's
+  goto function), searched from every match start so that overlapping
+  occurrences are found too, in time independent of the number of rules;
+- regex rules are OR-ed into one combined pattern that rejects most
+  descriptions in one search, and only on a hit is each regex checked;
+- amount range and account conditions are checked on the few candidates.
+
+The first matching rule in priority order (highest first, then oldest)
+decides the category.
+"""
+import re
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Sequence
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+CONTAINS = "contains"
+REGEX = "regex"
+
+# Regex syntax that changes meaning, or can't be repeated, once patterns
+# are OR-ed together: backreferences, named groups, global inline flags
+_UNCOMBINABLE = re.compile(r"\\[1-9]|\(\?P[<=]|\(\?\(|\(\?[aiLmsux]+\)")
+
+
+# Unbounded repeats allowed in one rule regex: each one more multiplies the
+# worst-case backtracking by the length of the text
+MAX_UNBOUNDED_REPEATS = 2
+
+# Regex rules see the first this many characters of a description
+REGEX_TEXT_LIMIT = 256
+
+# Parsed regex repeat operators
+_REPEATS = {
+    sre_constants.MAX_REPEAT,
+    sre_constants.MIN_REPEAT,
+    getattr(sre_constants, "POSSESSIVE_REPEAT", sre_constants.MAX_REPEAT),
+}
+_ZERO_WIDTH = {sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT}
+
+
+def regex_hazard(pattern: str) -> Optional[str]:
+    """
+    Why a regex could backtrack catastrophically, or None when it can't.
+
+    Rule patterns run on every transaction write with the backtracking
+    ``re`` engine, so shapes with exponentially many ways to match one
+    input are refused: a variable-length repeat inside another repeat, as
+    in ``(a+)+``, and alternatives that can start with the same character
+    inside a repeat, as in ``(a\\w|\\wb)+``. Adjacent unbounded repeats, as
+    in ``.*a.*b.*c``, cost polynomial time instead, so at most
+    ``MAX_UNBOUNDED_REPEATS`` are allowed. This is conservative; such
+    patterns can almost always be written without the nesting.
+    """
+    try:
+        parsed = sre_parse.parse(pattern, re.IGNORECASE)
+    except re.error:
+        return None
+    if _unbounded_repeats(list(parsed)) > MAX_UNBOUNDED_REPEATS:
+        return f"more than {MAX_UNBOUNDED_REPEATS} unbounded repeats"
+    return _hazard(list(parsed), False)
+
+
+def _unbounded_repeats(items: List) -> int:
+    """Number of unbounded repeats in a parsed subpattern."""
+    return sum(
+        (op in _REPEATS and av[1] == sre_constants.MAXREPEAT)
+        + sum(_unbounded_repeats(list(child)) for child in _children(op, av))
+        for op, av in items
+    )
+
+
+def _hazard(items: List, in_repeat: bool) -> Optional[str]:
+    """``regex_hazard`` of a parsed subpattern, ``in_repeat`` when repeated."""
+    for op, av in items:
+        repeated = in_repeat
+        if op in _REPEATS:
+            low, high, _ = av
+            if in_repeat and low != high:
+                return "nested quantifiers"
+            repeated = in_repeat or high > 1
+        elif op == sre_constants.BRANCH and in_repeat:
+            # The parser factors (a|aa) into a(|a): an optional part
+            if any(not alternative for alternative in av[1]):
+                return "nested quantifiers"
+            if _overlapping(av[1]):
+                return "overlapping alternatives inside a repeat"
+        for child in _children(op, av):
+            found = _hazard(list(child), repeated)
+            if found:
+                return found
+    return None
+
+
+def _children(op, av) -> List:
+    """Subpatterns nested in one parsed regex item."""
+    if op in _REPEATS:
+        return [av[2]]
+    if op == sre_constants.BRANCH:
+        return list(av[1])
+    if op == sre_constants.SUBPATTERN:
+        return [av[-1]]
+    if op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+        return [av[1]]
+    if op == sre_constants.GROUPREF_EXISTS:
+        return [part for part in av[1:] if part is not None]
+    if op == getattr(sre_constants, "ATOMIC_GROUP", None):
+        return [av]
+    return []
+
+
+def _first_characters(items: List) -> Optional[set]:
+    """Characters a parsed subpattern can start with; None when any may."""
+    for op, av in items:
+        if op in _ZERO_WIDTH:
+            continue
+        if op == sre_constants.LITERAL:
+            return {chr(av).lower()}
+        if op == sre_constants.SUBPATTERN:
+            return _first_characters(list(av[-1]))
+        return None
+    return set()
+
+
+def _overlapping(alternatives: List) -> bool:
+    """Whether two alternatives of a branch can start with the same character."""
+    firsts = [
+        first for first in (_first_characters(list(alternative)) for alternative in alternatives)
+        if first != set()
+    ]
+    if len(firsts) < 2:
+        return False
+    if any(first is None for first in firsts):
+        return True
+    seen: set = set()
+    for first in firsts:
+        if first & seen:
+            return True
+        seen |= first
+    return False
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """
+    Regex matching any of ``words``, built as a trie so that alternatives
+    sharing a prefix are tried once; the longest word wins at a position.
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+    return _trie_regex(trie)
+
+
+def _trie_regex(node: Dict[str, Any]) -> str:
+    """Regex of one trie node's subtree (empty if it only ends a word)."""
+    branches = [re.escape(char) + _trie_regex(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    if len(branches) == 1:
+        body = branches[0]
+    elif all(len(branch) == 1 for branch in branches):
+        body = "[" + "".join(branches) + "]"
+    else:
+        body = "(?:" + "|".join(branches) + ")"
+    if "" in node:
+        body = "(?:" + body + ")?"
+    return body
+
+
+class RuleMatcher:
+    """Matcher for one user's active rules."""
+    
+    def __init__(self, rules: Sequence[Any]):
+        """
+        ``rules`` are objects or rows with ``category_id``, ``match_type``,
+        ``pattern``, ``min_amount``, ``max_amount``, ``account_id``,
+        ``priority`` and ``id``.
+        """
+        ordered = sorted(rules, key=lambda rule: (-(rule.priority or 0), rule.id))
+        self.categories = [rule.category_id for rule in ordered]
+        self.min_amounts = [_decimal(rule.min_amount) for rule in ordered]
+        self.max_amounts = [_decimal(rule.max_amount) for rule in ordered]
+        self.accounts = [rule.account_id for rule in ordered]
+        
+        # Rules with an amount or account condition still to check on a hit
+        self.conditional = {
+            index for index in range(len(ordered))
+            if self.min_amounts[index] is not None
+            or self.max_amounts[index] is not None
+            or self.accounts[index] is not None
+        }
+        
+        literals: Dict[str, List[int]] = {}
+        self.regexes: Dict[int, Pattern] = {}
+        self.unconditional: List[int] = []
+        for index, rule in enumerate(ordered):
+            if not rule.pattern:
+                self.unconditional.append(index)
+            elif _kind(rule.match_type) == REGEX:
+                self.regexes[index] = re.compile(rule.pattern, re.IGNORECASE)
+            else:
+                literals.setdefault(rule.pattern.lower(), []).append(index)
+        
+        # The scanner reports the longest literal at a position, so each
+        # literal maps to the rules of every literal that is a prefix of it
+        lengths = sorted({len(literal) for literal in literals})
+        self.literals: Dict[str, List[int]] = {
+            literal: [
+                index
+                for length in lengths if length <= len(literal)
+                for index in literals.get(literal[:length], ())
+            ]
+            for literal in literals
+        }
+        self.literal_scanner = re.compile(trie_pattern(literals)) if literals else None
+        
+        combinable = [
+            pattern.pattern for pattern in self.regexes.values()
+            if not _UNCOMBINABLE.search(pattern.pattern)
+        ]
+        self.regex_filter = None
+        if self.regexes and len(combinable) == len(self.regexes):
+            try:
+                self.regex_filter = re.compile("|".join(f"(?:{pattern})" for pattern in combinable), re.IGNORECASE)
+            except re.error:
+                # Valid alone but not together: each regex is tried in turn
+                pass
+    
+    def __len__(self) -> int:
+        return len(self.categories)
+    
+    def match(
+        self,
+        description: Optional[str],
+        amount: Any = None,
+        account_id: Optional[int] = None
+    ) -> Optional[int]:
+        """Category id of the first rule matching a transaction, or None."""
+        candidates = self._candidates(description or "")
+        if not candidates:
+            return None
+        first = min(candidates)
+        if first not in self.conditional:
+            return self.categories[first]
+        
+        amount = _decimal(amount)
+        for index in sorted(candidates):
+            low = self.min_amounts[index]
+            high = self.max_amounts[index]
+            if low is not None and (amount is None or amount < low):
+                continue
+            if high is not None and (amount is None or amount > high):
+                continue
+            if self.accounts[index] is not None and self.accounts[index] != account_id:
+                continue
+            return self.categories[index]
+        return None
+    
+    def _candidates(self, description: str) -> List[int]:
+        """Indexes of the rules whose text condition holds (may repeat)."""
+        candidates = list(self.unconditional)
+        
+        if self.literal_scanner is not None and description:
+            text = description.lower()
+            search = self.literal_scanner.search
+            found = search(text)
+            while found is not None:
+                candidates.extend(self.literals[found.group()])
+                found = search(text, found.start() + 1)
+        
+        if self.regexes:
+            # Bounds the backtracking a pattern regex_hazard lets through
+            text = description[:REGEX_TEXT_LIMIT]
+            if self.regex_filter is None or self.regex_filter.search(text):
+                candidates.extend(
+                    index for index, pattern in self.regexes.items() if pattern.search(text)
+                )
+        return candidates
+
+
+def _kind(match_type: Any) -> str:
+    """Plain string of a match type enum member or value."""
+    return getattr(match_type, "value", match_type) or CONTAINS
+
+
+def _decimal(value: Any) -> Optional[Decimal]:
+    """Decimal of an amount, None when unset."""
+    if value is None:
+        return None
+    return value if isinstance(value, Decimal) else Decimal(str(value))
@@ -0,0 +1,168 @@
+"""
+Streaming encoders for tabular exports.
+
+Each encoder turns an iterator of row batches into an iterator of byte
+chunks, one chunk per batch, so a response can be streamed with memory
+bounded by the batch size rather than by the number of rows.
+"""
+import csv
+import enum
+import importlib.util
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Iterable, Iterator, List, Sequence
+from sqlalchemy import Column, DateTime, Integer, Numeric
+
+
+class ExportFormat(str, enum.Enum):
+    """Supported export formats."""
+    CSV = "csv"
+    NDJSON = "ndjson"
+    PARQUET = "parquet"
+
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+}
+
+
+def parquet_available() -> bool:
+    """Whether the optional pyarrow dependency needed for Parquet is installed."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def encode_batches(
+    export_format: ExportFormat,
+    columns: Sequence[Column],
+    batches: Iterable[Sequence[Sequence[Any]]]
+) -> Iterator[bytes]:
+    """Encode row batches in the given format."""
+    if export_format == ExportFormat.CSV:
+        return csv_chunks(columns, batches)
+    if export_format == ExportFormat.NDJSON:
+        return ndjson_chunks(columns, batches)
+    return parquet_chunks(columns, batches)
+
+
+def csv_chunks(columns: Sequence[Column], batches: Iterable[Sequence[Sequence[Any]]]) -> Iterator[bytes]:
+    """CSV with a header row."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.key for column in columns])
+    for batch in batches:
+        writer.writerows([_plain(value) for value in row] for row in batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def ndjson_chunks(columns: Sequence[Column], batches: Iterable[Sequence[Sequence[Any]]]) -> Iterator[bytes]:
+    """One JSON object per line."""
+    names = [column.key for column in columns]
+    for batch in batches:
+        lines = [
+            json.dumps(dict(zip(names, row)), default=_json_default, separators=(",", ":"))
+            for row in batch
+        ]
+        yield ("\n".join(lines) + "\n").encode()
+
+
+def parquet_chunks(columns: Sequence[Column], batches: Iterable[Sequence[Sequence[Any]]]) -> Iterator[bytes]:
+    """
+    Parquet with one row group per batch.
+
+    Every row group is flushed to the client as soon as it is written; the
+    file footer follows the last one.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    schema = pa.schema([(column.key, _arrow_type(pa, column)) for column in columns])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+    try:
+        for batch in batches:
+            arrays = [
+                pa.array([_arrow_value(row[index]) for row in batch], type=field.type)
+                for index, field in enumerate(schema)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+class _ChunkSink:
+    """Write-only file object handing out what was written since the last drain."""
+    
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+    
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        # Parquet records absolute offsets, so report the total written
+        return self._position
+    
+    def flush(self) -> None:
+        pass
+    
+    def close(self) -> None:
+        self.closed = True
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _plain(value: Any) -> Any:
+    """Value as written to CSV."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _json_default(value: Any) -> Any:
+    """JSON encoding of non-native values, matching the API responses."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _arrow_type(pa, column: Column):
+    """Arrow type for a SQLAlchemy column (strings for everything else)."""
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Numeric):
+        return pa.decimal128(column.type.precision or 38, column.type.scale or 0)
+    if isinstance(column.type, DateTime):
+        # Naive values (e.g. from SQLite) are stored as UTC
+        return pa.timestamp("us", tz="UTC")
+    return pa.string()
+
+
+def _arrow_value(value: Any) -> Any:
+    """Value as handed to pyarrow."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
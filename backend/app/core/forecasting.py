@@ -0,0 +1,154 @@
+"""
+Vectorized monthly time-series forecasting.
+
+Every function works on a matrix of monthly series, one row per series
+(e.g. one per user and category) and one column per month, oldest first,
+so a whole batch of series is fitted with a handful of array operations
+instead of a Python loop per series.
+
+The model is a classical additive decomposition: a seasonal profile taken
+from the detrended history (only when at least two full years are
+available), and damped-trend exponential smoothing (Holt) on the
+deseasonalized series, with the smoothing parameters picked per series by
+a grid search over one-step-ahead errors.
+"""
+from datetime import date
+from typing import Sequence, Tuple
+import numpy as np
+
+SEASON_LENGTH = 12
+
+# Smoothing parameter grid searched for every series at once
+ALPHAS = (0.1, 0.2, 0.4, 0.6, 0.8)
+BETAS = (0.0, 0.05, 0.1, 0.2)
+DAMPING = 0.9
+
+
+def month_number(day: date) -> int:
+    """Months since year 0, so consecutive months differ by one."""
+    return day.year * 12 + day.month - 1
+
+
+def month_start(number: int) -> date:
+    """First day of the month with the given month_number."""
+    return date(number // 12, number % 12 + 1, 1)
+
+
+def resample_monthly(
+    row_index: Sequence[int],
+    days: Sequence[date],
+    amounts: Sequence[float],
+    n_rows: int,
+    first_month: date,
+    n_months: int
+) -> np.ndarray:
+    """
+    Sum dated amounts into an ``(n_rows, n_months)`` matrix of monthly totals.
+
+    ``row_index[i]`` is the series ``amounts[i]`` belongs to; amounts outside
+    the ``n_months`` window starting at ``first_month`` are ignored.
+    """
+    series = np.zeros((n_rows, n_months))
+    if not len(amounts):
+        return series
+    
+    columns = np.fromiter((month_number(day) for day in days), dtype=np.int64, count=len(days))
+    columns -= month_number(first_month)
+    rows = np.asarray(row_index, dtype=np.int64)
+    values = np.asarray(amounts, dtype=float)
+    inside = (columns >= 0) & (columns < n_months)
+    np.add.at(series, (rows[inside], columns[inside]), values[inside])
+    return series
+
+
+def first_observation(series: np.ndarray) -> np.ndarray:
+    """Column of the first non-zero month of each row (0 for empty rows)."""
+    return np.argmax(series != 0, axis=1)
+
+
+def seasonal_profile(
+    series: np.ndarray,
+    first: np.ndarray,
+    season_length: int = SEASON_LENGTH
+) -> np.ndarray:
+    """
+    Additive seasonal component per row, indexed by ``column % season_length``.
+
+    Uses the most recent whole seasons after removing a linear trend; rows
+    with less than two full seasons of history get a flat (zero) profile.
+    """
+    n_rows, n_months = series.shape
+    seasons = n_months // season_length
+    profile = np.zeros((n_rows, season_length))
+    if seasons < 2 or n_rows == 0:
+        return profile
+    
+    offset = n_months - seasons * season_length
+    recent = series[:, offset:]
+    x = np.arange(recent.shape[1])
+    slope, intercept = np.polyfit(x, recent.T, 1)
+    residual = recent - (slope[:, None] * x + intercept[:, None])
+    profile = residual.reshape(n_rows, seasons, season_length).mean(axis=1)
+    profile -= profile.mean(axis=1, keepdims=True)
+    profile[first > offset] = 0.0
+    # Align so that profile[:, column % season_length] is the column's phase
+    return np.roll(profile, offset, axis=1)
+
+
+def forecast(
+    series: np.ndarray,
+    horizon: int,
+    season_length: int = SEASON_LENGTH
+) -> np.ndarray:
+    """
+    Forecast the next ``horizon`` months of every row.
+
+    Returns an ``(n_rows, horizon)`` matrix of non-negative values; months
+    before a row's first observation are treated as "not started yet"
+    rather than as zero spending.
+    """
+    n_rows, n_months = series.shape
+    if n_rows == 0 or n_months == 0:
+        return np.zeros((n_rows, horizon))
+    
+    first = first_observation(series)
+    profile = seasonal_profile(series, first, season_length)
+    adjusted = series - profile[:, np.arange(n_months) % season_length]
+    
+    # One smoothing run per grid point, all rows at once: shape (grid, rows)
+    alpha, beta = (grid.reshape(-1, 1) for grid in np.meshgrid(ALPHAS, BETAS))
+    level = np.zeros((alpha.shape[0], n_rows))
+    trend = np.zeros_like(level)
+    sse = np.zeros_like(level)
+    
+    for column in range(n_months):
+        observed = adjusted[:, column]
+        predicted = level + DAMPING * trend
+        error = observed - predicted
+        active = column > first
+        sse += np.where(active, error ** 2, 0.0)
+        level = np.where(active, predicted + alpha * error, level)
+        trend = np.where(active, DAMPING * trend + alpha * beta * error, trend)
+        level = np.where(column == first, observed, level)
+    
+    best = sse.argmin(axis=0)
+    rows = np.arange(n_rows)
+    level = level[best, rows]
+    trend = trend[best, rows]
+    
+    steps = np.arange(1, horizon + 1)
+    damped = np.cumsum(DAMPING ** steps)
+    seasonal = profile[:, (n_months - 1 + steps) % season_length]
+    result = level[:, None] + trend[:, None] * damped + seasonal
+    return np.clip(result, 0.0, None)
+
+
+def forecast_window(today: date, history_months: int) -> Tuple[date, date]:
+    """
+    History window ``[first_month, current_month)`` for forecasting.
+
+    The current month is still incomplete, so it is the first month
+    forecast rather than the last one observed.
+    """
+    current = month_number(today)
+    return month_start(current - history_months), month_start(current)
@@ -0,0 +1,324 @@
+"""
+Per-request SQL instrumentation and opt-in request profiling.
+
+``InstrumentationMiddleware`` gives every HTTP request a ``RequestStats``
+that the engine hooks in ``app.db.session`` feed with the duration of each
+statement. When the response starts, the totals go out in a
+``Server-Timing`` header (``db`` and ``app`` durations); when it ends, one
+JSON line with the query count, database time, slowest statements and
+statements repeated often enough to look like N+1 queries is logged to
+``app.requests``: at WARNING when something looks wrong, DEBUG otherwise.
+Statements run while a streamed body is produced (exports) come after the
+header and are only in the log.
+
+Requests sent with ``X-Profile: 1`` (if ``PROFILE_ALLOW_HEADER``) and a
+``PROFILE_SAMPLE_RATE`` share of all requests are also profiled: on the
+event loop thread and inside every ``run_db`` call on the threadpool. The
+loop profile covers whatever else the loop runs meanwhile, so profile
+with little concurrent traffic. Profiles are written to ``PROFILE_DIR`` as
+``.prof`` files (cProfile, for pstats or snakeviz) or ``.html`` files
+(pyinstrument, an optional dependency).
+"""
+import cProfile
+import heapq
+import importlib.util
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from functools import reduce
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+
+T = TypeVar("T")
+
+logger = logging.getLogger("app.requests")
+
+PROFILE_HEADER = "x-profile"
+
+# Distinct statements tracked per request for repeat detection
+MAX_TRACKED_STATEMENTS = 1000
+
+# Longest statement text written to the log
+MAX_LOGGED_STATEMENT = 500
+
+_request_stats: ContextVar[Optional["RequestStats"]] = ContextVar("request_stats", default=None)
+_request_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+
+# Route templates by endpoint, for grouping requests by route
+_route_templates: Dict[Any, str] = {}
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class RequestStats:
+    """SQL statements executed while serving one request."""
+    
+    __slots__ = ("started", "count", "db_time", "slowest", "statements", "_lock")
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.db_time = 0.0
+        # Min-heap of (duration, sequence, statement), the slowest kept
+        self.slowest: List[tuple] = []
+        # Statement text -> [executions, total duration]
+        self.statements: Dict[str, List] = {}
+        self._lock = threading.Lock()
+    
+    def record(self, statement: str, duration: float) -> None:
+        """Count one executed statement; may be called from worker threads."""
+        with self._lock:
+            self.count += 1
+            self.db_time += duration
+            entry = self.statements.get(statement)
+            if entry is not None:
+                entry[0] += 1
+                entry[1] += duration
+            elif len(self.statements) < MAX_TRACKED_STATEMENTS:
+                self.statements[statement] = [1, duration]
+            
+            item = (duration, self.count, statement)
+            if len(self.slowest) < settings.QUERY_LOG_SLOWEST:
+                heapq.heappush(self.slowest, item)
+            elif duration > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, item)
+    
+    def repeated(self, threshold: int) -> List[Dict]:
+        """
+        Statements executed at least ``threshold`` times, most frequent first.
+
+        Statements are compared with their bound parameter placeholders, so
+        one query issued per row of an earlier result (an N+1 pattern)
+        shows up as a single, often repeated statement.
+        """
+        with self._lock:
+            found = [
+                (count, total, statement)
+                for statement, (count, total) in self.statements.items()
+                if count >= threshold
+            ]
+        return [
+            {"count": count, "total_ms": _ms(total), "statement": _shorten(statement)}
+            for count, total, statement in sorted(found, key=lambda item: item[0], reverse=True)
+        ]
+    
+    def slowest_statements(self) -> List[Dict]:
+        """The slowest statements, slowest first."""
+        with self._lock:
+            slowest = sorted(self.slowest, reverse=True)
+        return [{"ms": _ms(duration), "statement": _shorten(statement)} for duration, _, statement in slowest]
+    
+    def server_timing(self) -> str:
+        """``Server-Timing`` header value for the time elapsed so far."""
+        elapsed = time.perf_counter() - self.started
+        return (
+            f'db;dur={_ms(self.db_time)};desc="{self.count} queries", '
+            f"app;dur={_ms(elapsed)}"
+        )
+
+
+class RequestProfile:
+    """Profiler segments of one request: its event loop part and threadpool calls."""
+    
+    def __init__(self, use_pyinstrument: bool):
+        self.use_pyinstrument = use_pyinstrument
+        self.segments: List[Any] = []
+        self._lock = threading.Lock()
+    
+    def start(self, on_event_loop: bool = False) -> Optional[Any]:
+        """Start profiling the current thread; None if a profiler already runs there."""
+        try:
+            if self.use_pyinstrument:
+                from pyinstrument import Profiler
+                
+                profiler = Profiler(async_mode="enabled" if on_event_loop else "disabled")
+                profiler.start()
+            else:
+                profiler = cProfile.Profile()
+                profiler.enable()
+        except (RuntimeError, ValueError):
+            return None
+        return profiler
+    
+    def stop(self, profiler: Optional[Any]) -> None:
+        """Stop a profiler from ``start`` and keep its segment."""
+        if profiler is None:
+            return
+        if self.use_pyinstrument:
+            profiler.stop()
+            segment = profiler.last_session
+        else:
+            profiler.disable()
+            segment = profiler
+        with self._lock:
+            self.segments.append(segment)
+    
+    def write(self, name: str) -> Optional[str]:
+        """Write the combined segments to ``PROFILE_DIR``; returns the file path."""
+        if not self.segments:
+            return None
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        base = os.path.join(settings.PROFILE_DIR, f"{stamp}-{re.sub(r'[^A-Za-z0-9]+', '-', name).strip('-')}")
+        if self.use_pyinstrument:
+            from pyinstrument.renderers import HTMLRenderer
+            from pyinstrument.session import Session
+            
+            path = f"{base}.html"
+            with open(path, "w") as f:
+                f.write(HTMLRenderer().render(reduce(Session.combine, self.segments)))
+        else:
+            path = f"{base}.prof"
+            pstats.Stats(*self.segments).dump_stats(path)
+        return path
+
+
+def pyinstrument_available() -> bool:
+    """Whether the optional pyinstrument profiler is installed."""
+    return importlib.util.find_spec("pyinstrument") is not None
+
+
+def record_statement(statement: str, duration: float) -> None:
+    """Count a statement against the current request, if any (engine hook)."""
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Statement counters of the request being served, if any."""
+    return _request_stats.get()
+
+
+def profiled(fn: Callable[..., T]) -> Callable[..., T]:
+    """Wrap threadpool work so it is profiled when its request is."""
+    profile = _request_profile.get()
+    if profile is None:
+        return fn
+    
+    def run(*args: Any, **kwargs: Any) -> T:
+        profiler = profile.start()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.stop(profiler)
+    
+    return run
+
+
+def route_template(scope: Scope) -> Optional[str]:
+    """Path template of the route that served a request (after routing)."""
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return None
+    template = _route_templates.get(endpoint)
+    if template is None:
+        app = scope.get("app")
+        for route in getattr(getattr(app, "router", None), "routes", ()):
+            if getattr(route, "endpoint", None) is endpoint:
+                template = _route_templates[endpoint] = route.path
+                break
+    return template
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+def _shorten(statement: str) -> str:
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    if len(statement) > MAX_LOGGED_STATEMENT:
+        return statement[:MAX_LOGGED_STATEMENT] + "..."
+    return statement
+
+
+def _wants_profile(scope: Scope) -> bool:
+    if settings.PROFILE_ALLOW_HEADER and Headers(scope=scope).get(PROFILE_HEADER) in ("1", "true"):
+        return True
+    return settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE
+
+
+class InstrumentationMiddleware:
+    """ASGI middleware timing each request's SQL statements and optionally profiling it."""
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.QUERY_INSTRUMENTATION:
+            await self.app(scope, receive, send)
+            return
+        
+        stats = RequestStats()
+        stats_token = _request_stats.set(stats)
+        profile = None
+        profiler = None
+        if _wants_profile(scope):
+            profile = RequestProfile(settings.PROFILER == "pyinstrument" and pyinstrument_available())
+            profiler = profile.start(on_event_loop=True)
+        profile_token = _request_profile.set(profile)
+        status_code = 500
+        
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            duration = time.perf_counter() - stats.started
+            _request_stats.reset(stats_token)
+            _request_profile.reset(profile_token)
+            profile_path = None
+            if profile is not None:
+                profile.stop(profiler)
+                profile_path = profile.write(f"{scope['method']} {scope['path']}")
+            _log_request(scope, status_code, duration, stats, profile_path)
+
+
+def _log_request(
+    scope: Scope,
+    status_code: int,
+    duration: float,
+    stats: RequestStats,
+    profile_path: Optional[str]
+) -> None:
+    """Write the request's structured log line."""
+    repeated = stats.repeated(settings.N_PLUS_ONE_THRESHOLD)
+    slowest = stats.slowest_statements()
+    problem = (
+        duration * 1000 >= settings.SLOW_REQUEST_MS
+        or bool(repeated)
+        or bool(slowest and slowest[0]["ms"] >= settings.SLOW_QUERY_MS)
+    )
+    level = logging.WARNING if problem else logging.INFO if profile_path else logging.DEBUG
+    if not logger.isEnabledFor(level):
+        return
+    
+    record = {
+        "event": "request",
+        "method": scope["method"],
+        "path": scope["path"],
+        "route": route_template(scope),
+        "status": status_code,
+        "duration_ms": _ms(duration),
+        "db_queries": stats.count,
+        "db_time_ms": _ms(stats.db_time),
+        "slowest": slowest,
+        "repeated": repeated,
+    }
+    if profile_path is not None:
+        record["profile"] = profile_path
+    logger.log(level, json.dumps(record), extra={"request": record})
@@ -0,0 +1,320 @@
+"""
+Process metrics in the Prometheus text exposition format.
+
+Counters live in per-thread shards: each thread only ever writes its own
+dict, so recording takes no lock and loses no increments, and a scrape
+copies every shard (one C-level call under the GIL) and adds them up.
+Recording a request costs a few times a plain dict increment, some
+hundreds of nanoseconds; ``python -m app.core.metrics`` measures both.
+
+Recorded here: per-route request counts and latency histograms, requests
+in flight, cache lookups by result, and service events (transactions
+created, imports, alerts raised). Connection pool figures are read from
+the pool when scraped. With several worker processes each serves its own
+numbers.
+"""
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.instrumentation import route_template
+from app.db.pool import pool_metrics
+
+# Request latency histogram bucket bounds, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Route label of requests no route matched, so bad URLs can't add series
+UNMATCHED_ROUTE = "unmatched"
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Exposed metrics: name -> (type, help)
+METRICS = {
+    "http_requests_total": ("counter", "HTTP requests served, by route and status."),
+    "http_request_duration_seconds": ("histogram", "HTTP request latency until the response completed."),
+    "http_requests_in_flight": ("gauge", "HTTP requests being served."),
+    "cache_requests_total": ("counter", "Cache lookups, by cache and result (hit or miss)."),
+    "cache_hit_ratio": ("gauge", "Share of cache lookups that hit since the process started."),
+    "transactions_created_total": ("counter", "Transactions created, singly or by import."),
+    "transaction_imports_total": ("counter", "Bulk transaction imports processed."),
+    "transaction_import_rows_total": ("counter", "Bulk import rows, by result (imported or failed)."),
+    "alerts_raised_total": ("counter", "Budget alerts raised, by type."),
+    "db_pool_size": ("gauge", "Configured connection pool size."),
+    "db_pool_checked_out": ("gauge", "Connections currently checked out of the pool."),
+    "db_pool_overflow": ("gauge", "Connections open beyond the pool size."),
+    "db_pool_checkouts_total": ("counter", "Successful connection checkouts."),
+    "db_pool_checkout_timeouts_total": ("counter", "Connection checkouts that timed out."),
+    "db_pool_checkout_wait_seconds_total": ("counter", "Time spent waiting for connection checkouts."),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# Counter key -> (metric, labels, histogram bucket index or None). Keys are
+# interned strings: their hash is cached, unlike that of label tuples
+_series: Dict[str, Tuple[str, Labels, Optional[int]]] = {}
+_keys: Dict[Tuple, str] = {}
+_keys_lock = threading.Lock()
+
+# (method, route, status) -> request count key, bucket keys, duration sum key
+_request_keys: Dict[Tuple[str, str, int], Tuple[str, Tuple[str, ...], str]] = {}
+
+# (cache, hit) -> cache lookup key
+_cache_keys: Dict[Tuple[str, bool], str] = {}
+
+IN_FLIGHT = "http_requests_in_flight"
+
+
+def series_key(name: str, labels: Labels = (), bucket: Optional[int] = None) -> str:
+    """The counter key of a metric series, registering it on first use."""
+    key = _keys.get((name, labels, bucket))
+    if key is None:
+        with _keys_lock:
+            key = _keys.get((name, labels, bucket))
+            if key is None:
+                key = sys.intern(f"{name}|{labels!r}|{bucket}")
+                _series[key] = (name, labels, bucket)
+                _keys[(name, labels, bucket)] = key
+    return key
+
+
+class ShardedCounters:
+    """
+    Counters summed over per-thread shards.
+
+    Each thread adds to its own dict, so recording is lock-free without
+    losing increments; only registering a thread's shard takes a lock.
+    """
+    
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[Dict[str, float]] = []
+        self._lock = threading.Lock()
+    
+    def shard(self) -> Dict[str, float]:
+        """The calling thread's counters."""
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = defaultdict(int)
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+    
+    def add(self, key: str, amount: float = 1) -> None:
+        """Add to a counter of the calling thread's shard."""
+        self.shard()[key] += amount
+    
+    def totals(self) -> Dict[str, float]:
+        """Every counter summed over all shards."""
+        with self._lock:
+            shards = list(self._shards)
+        totals: Dict[str, float] = defaultdict(float)
+        for shard in shards:
+            for key, value in shard.copy().items():
+                totals[key] += value
+        return totals
+    
+    def reset(self) -> None:
+        """Drop every counter (tests and benchmarks)."""
+        with self._lock:
+            for shard in self._shards:
+                shard.clear()
+
+
+counters = ShardedCounters()
+
+
+def inc(name: str, amount: float = 1, **labels: str) -> None:
+    """Increment a counter, e.g. ``inc("alerts_raised_total", type="warning")``."""
+    counters.add(series_key(name, tuple(labels.items())), amount)
+
+
+def cache_lookup(cache: str, hit: bool) -> None:
+    """Count one lookup of a named cache."""
+    key = _cache_keys.get((cache, hit))
+    if key is None:
+        key = _cache_keys[(cache, hit)] = series_key(
+            "cache_requests_total", (("cache", cache), ("result", "hit" if hit else "miss"))
+        )
+    counters.add(key)
+
+
+def _register_request(method: str, route: str, status_code: int) -> Tuple[str, Tuple[str, ...], str]:
+    labels = (("method", method), ("route", route))
+    keys = (
+        series_key("http_requests_total", labels + (("status", str(status_code)),)),
+        tuple(
+            series_key("http_request_duration_seconds", labels, bucket)
+            for bucket in range(len(LATENCY_BUCKETS) + 1)
+        ),
+        series_key("http_request_duration_seconds_sum", labels),
+    )
+    _request_keys[(method, route, status_code)] = keys
+    return keys
+
+
+def observe_request(
+    method: str,
+    route: str,
+    status_code: int,
+    duration: float,
+    shard: Optional[Dict[str, float]] = None
+) -> None:
+    """Count a finished request and add its latency to the route's histogram."""
+    keys = _request_keys.get((method, route, status_code)) or _register_request(method, route, status_code)
+    if shard is None:
+        shard = counters.shard()
+    shard[keys[0]] += 1
+    shard[keys[1][bisect_left(LATENCY_BUCKETS, duration)]] += 1
+    shard[keys[2]] += duration
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request counts, latencies and requests in flight."""
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        started = time.perf_counter()
+        status_code = 500
+        
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        # Requests start and finish on the event loop thread, so one shard
+        shard = counters.shard()
+        shard[IN_FLIGHT] += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            shard[IN_FLIGHT] -= 1
+            observe_request(
+                scope["method"],
+                route_template(scope) or UNMATCHED_ROUTE,
+                status_code,
+                time.perf_counter() - started,
+                shard
+            )
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _line(name: str, labels: Iterable[Tuple[str, str]], value: float) -> str:
+    rendered = ",".join(f'{key}="{_escape(str(label))}"' for key, label in labels)
+    number = int(value) if float(value).is_integer() else value
+    return f"{name}{{{rendered}}} {number}" if rendered else f"{name} {number}"
+
+
+def _pool_values(pool_status: Optional[Dict]) -> Dict[str, float]:
+    values = {
+        "db_pool_checkouts_total": pool_metrics.checkouts,
+        "db_pool_checkout_timeouts_total": pool_metrics.timeouts,
+        "db_pool_checkout_wait_seconds_total": pool_metrics.total_wait,
+    }
+    if pool_status and "size" in pool_status:
+        values.update({
+            "db_pool_size": pool_status["size"],
+            "db_pool_checked_out": pool_status["checked_out"],
+            "db_pool_overflow": pool_status["overflow"],
+        })
+    return values
+
+
+def render(pool_status: Optional[Dict] = None) -> str:
+    """All metrics in the Prometheus text format; ``pool_status`` from ``get_pool_status``."""
+    series: Dict[str, List[str]] = defaultdict(list)
+    histograms: Dict[Labels, List[float]] = defaultdict(lambda: [0.0] * (len(LATENCY_BUCKETS) + 1))
+    sums: Dict[Labels, float] = {}
+    cache_totals: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0.0])
+    
+    totals = counters.totals()
+    for key in sorted(totals):
+        value = totals[key]
+        name, labels, bucket = _series.get(key, (key, (), None))
+        if name == "http_request_duration_seconds":
+            histograms[labels][bucket] += value
+        elif name == "http_request_duration_seconds_sum":
+            sums[labels] = value
+        else:
+            series[name].append(_line(name, labels, value))
+            if name == "cache_requests_total":
+                lookup = dict(labels)
+                cache_totals[lookup["cache"]][lookup["result"] == "hit"] += value
+    
+    for labels, buckets in histograms.items():
+        cumulative = 0.0
+        for bound, count in zip((*LATENCY_BUCKETS, "+Inf"), buckets):
+            cumulative += count
+            series["http_request_duration_seconds"].append(
+                _line("http_request_duration_seconds_bucket", (*labels, ("le", str(bound))), cumulative)
+            )
+        series["http_request_duration_seconds"].append(
+            _line("http_request_duration_seconds_sum", labels, round(sums.get(labels, 0.0), 6))
+        )
+        series["http_request_duration_seconds"].append(
+            _line("http_request_duration_seconds_count", labels, cumulative)
+        )
+    
+    for cache, (misses, hits) in sorted(cache_totals.items()):
+        if hits + misses:
+            series["cache_hit_ratio"].append(
+                _line("cache_hit_ratio", (("cache", cache),), round(hits / (hits + misses), 4))
+            )
+    
+    for name, value in _pool_values(pool_status).items():
+        series[name].append(_line(name, (), round(value, 6)))
+    
+    if not series["http_requests_in_flight"]:
+        series["http_requests_in_flight"].append(_line("http_requests_in_flight", (), 0))
+    
+    lines = []
+    for name, (metric_type, help_text) in METRICS.items():
+        if series.get(name):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.extend(series[name])
+    return "\n".join(lines) + "\n"
+
+
+def _measure(calls: int = 200000) -> Dict[str, float]:
+    """Nanoseconds per recording call."""
+    timings = {}
+    
+    baseline: Dict[str, int] = {}
+    
+    def request() -> None:
+        shard = counters.shard()
+        shard[IN_FLIGHT] += 1
+        shard[IN_FLIGHT] -= 1
+        observe_request("GET", "/api/v1/accounts/", 200, 0.012, shard)
+    
+    for label, fn in (
+        ("dict increment (baseline)", lambda: baseline.__setitem__("key", baseline.get("key", 0) + 1)),
+        ("request", request),
+        ("inc", lambda: inc("transactions_created_total")),
+        ("cache_lookup", lambda: cache_lookup("response", True)),
+    ):
+        started = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        timings[label] = (time.perf_counter() - started) / calls * 1e9
+    counters.reset()
+    return timings
+
+
+if __name__ == "__main__":
+    for label, nanoseconds in _measure().items():
+        print(f"{label:<28} {nanoseconds:>6.0f} ns/call")
@@ -0,0 +1,94 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Cursors are opaque, URL-safe tokens holding the sort key of the last row of
+a page. The next page continues strictly after that key, so deep pages cost
+the same as the first one and rows inserted between requests do not shift
+the window.
+"""
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+from sqlalchemy import Column, literal, tuple_
+from sqlalchemy.orm import Query
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode sort key values into an opaque cursor string."""
+    serialized = [
+        value.isoformat() if isinstance(value, (datetime, date)) else value
+        for value in values
+    ]
+    raw = json.dumps(serialized, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Column]) -> List[Any]:
+    """
+    Decode a cursor into values typed after the given sort columns.
+
+    Raises ValueError for malformed cursors.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError("Invalid cursor")
+    
+    decoded = []
+    for column, value in zip(columns, values):
+        python_type = column.type.python_type
+        try:
+            if python_type is datetime:
+                decoded.append(datetime.fromisoformat(value))
+            elif python_type is date:
+                decoded.append(date.fromisoformat(value))
+            else:
+                decoded.append(python_type(value))
+        except (ValueError, TypeError) as exc:
+            raise ValueError("Invalid cursor") from exc
+    return decoded
+
+
+def paginate_keyset(
+    query: Query,
+    columns: Sequence[Column],
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = False
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Apply keyset pagination to a query.
+
+    ``columns`` must form a unique sort key (end with the primary key).
+    Returns the page items and the cursor for the next page, or None when
+    this is the last page.
+    """
+    if cursor:
+        key = tuple_(*columns)
+        after = tuple_(*[
+            _typed_literal(column, value)
+            for column, value in zip(columns, decode_cursor(cursor, columns))
+        ])
+        query = query.filter(key < after if descending else key > after)
+    
+    order_by = [column.desc() if descending else column.asc() for column in columns]
+    # Fetch one extra row to learn whether another page exists
+    rows = query.order_by(*order_by).limit(limit + 1).all()
+    
+    if len(rows) <= limit:
+        return rows, None
+    
+    rows = rows[:limit]
+    last = rows[-1]
+    next_cursor = encode_cursor([getattr(last, column.key) for column in columns])
+    return rows, next_cursor
+
+
+def _typed_literal(column: Column, value: Any):
+    """Bind a cursor value with the column's type so dialect processing applies."""
+    return literal(value, type_=column.type)
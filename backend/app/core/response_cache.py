@@ -0,0 +1,121 @@
+"""
+Per-user response cache for read-heavy endpoints.
+
+Results are cached under a key made of the user's data version, the endpoint
+and its normalized parameters. Services bump the version after committing a
+write, which makes every cached result for that user unreachable at once;
+the stale entries simply age out of the LRU. Each entry stores the rendered
+JSON body with its ETag, so hits skip both the queries and serialization and
+an unchanged result can be answered with 304 Not Modified.
+"""
+import hashlib
+import uuid
+from datetime import date, datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.core.cache import MISSING, CacheBackend, TTLCache
+from app.core.config import settings
+from app.core.metrics import cache_lookup
+
+# Versions outlive cached results; other caches (e.g. fitted forecasts) key on them too
+VERSION_TTL_SECONDS = 24 * 3600.0
+
+response_cache: CacheBackend = TTLCache(
+    maxsize=settings.RESPONSE_CACHE_MAX_SIZE,
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS
+)
+
+
+def set_response_cache_backend(backend: CacheBackend) -> None:
+    """Swap the response cache for another backend, e.g. one shared by all workers."""
+    global response_cache
+    response_cache = backend
+
+
+def get_user_version(user_id: int, scope: str = "version") -> str:
+    """
+    Current data version of a user.
+
+    Versions are random tokens rather than counters, so an evicted or
+    expired version never comes back with a value old entries were keyed on.
+    ``scope`` names an independent version for a narrower kind of data
+    (e.g. categorization rules).
+    """
+    key = (scope, user_id)
+    version = response_cache.get(key)
+    if version is MISSING:
+        version = uuid.uuid4().hex
+        response_cache.set(key, version, ttl=VERSION_TTL_SECONDS)
+    return version
+
+
+def bump_user_version(user_id: int, scope: str = "version") -> None:
+    """Invalidate every cached result of a user; call after committing a write."""
+    response_cache.set((scope, user_id), uuid.uuid4().hex, ttl=VERSION_TTL_SECONDS)
+
+
+def normalize_params(params: Dict[str, Any]) -> Tuple:
+    """Canonical, hashable form of query parameters (None values dropped)."""
+    normalized = []
+    for name, value in sorted(params.items()):
+        if value is None:
+            continue
+        if isinstance(value, datetime):
+            if value.tzinfo is not None:
+                value = value.astimezone(timezone.utc).replace(tzinfo=None)
+            value = value.isoformat()
+        elif isinstance(value, date):
+            value = value.isoformat()
+        normalized.append((name, value))
+    return tuple(normalized)
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag of a response body."""
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match covers the given ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+async def cached_response(
+    request: Request,
+    user_id: int,
+    endpoint: str,
+    params: Dict[str, Any],
+    compute: Callable[[], Awaitable[Any]]
+) -> Response:
+    """
+    Serve an endpoint result from the cache, computing it on a miss.
+
+    Responds 304 with no body when the client already holds the current
+    representation.
+    """
+    entry: Any = MISSING
+    key: Optional[Hashable] = None
+    if settings.RESPONSE_CACHE_TTL_SECONDS > 0:
+        key = ("result", user_id, get_user_version(user_id), endpoint, normalize_params(params))
+        entry = response_cache.get(key)
+        cache_lookup("response", entry is not MISSING)
+    
+    if entry is MISSING:
+        result = await compute()
+        body = JSONResponse(content=jsonable_encoder(result)).body
+        entry = (make_etag(body), body)
+        if key is not None:
+            response_cache.set(key, entry)
+    
+    etag, body = entry
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,40 @@
+"""
+Fast JSON serialization for list endpoints.
+
+List endpoints select only the columns of their response schema as rows and
+render them with orjson, skipping ORM object loading and response-model
+validation. The output is identical to what the Pydantic schemas produce.
+"""
+from decimal import Decimal
+from typing import Any, List, Type
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import Row
+
+
+def schema_columns(model: Type, schema: Type[BaseModel]) -> List:
+    """Model columns for every field of a response schema, in field order."""
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+class LeanJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson.
+
+    Content is written as is, so it must already have the response schema's
+    shape; rows selected with schema_columns() do. Decimals are written as
+    strings and UTC datetimes with a "Z" suffix, like Pydantic does.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+
+
+def _default(value: Any) -> Any:
+    """Encode the types orjson does not handle natively."""
+    if isinstance(value, Row):
+        return value._asdict()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
@@ -0,0 +1,108 @@
+"""
+Running statistics (Welford's algorithm).
+
+``RunningStats`` keeps the count, mean and sum of squared deviations
+(``m2``) of a stream of values, updated one value at a time without
+keeping the values. Two summaries combine with Chan et al.'s pairwise
+formula; combining with a negative count removes a batch that was added
+before, which is how stored summaries follow deleted and edited rows.
+"""
+import math
+from typing import Iterable, Optional, Tuple
+
+
+def merge_moments(
+    count: float,
+    mean: float,
+    m2: float,
+    other_count: float,
+    other_mean: float,
+    other_m2: float
+) -> Tuple[float, float]:
+    """
+    Mean and m2 of two combined summaries (``count + other_count`` values).
+
+    Works the same on floats and on SQL column expressions; a negative
+    ``other_count`` (with ``other_m2`` negated) subtracts a batch.
+    """
+    delta = other_mean - mean
+    total = count + other_count
+    return (
+        mean + delta * other_count / total,
+        m2 + other_m2 + delta * delta * count * other_count / total,
+    )
+
+
+class RunningStats:
+    """Count, mean, variance, minimum and maximum of a stream of values."""
+    
+    __slots__ = ("count", "mean", "m2", "minimum", "maximum")
+    
+    def __init__(
+        self,
+        count: int = 0,
+        mean: float = 0.0,
+        m2: float = 0.0,
+        minimum: Optional[float] = None,
+        maximum: Optional[float] = None
+    ):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.minimum = minimum
+        self.maximum = maximum
+    
+    @classmethod
+    def of(cls, values: Iterable[float]) -> "RunningStats":
+        """Summary of the given values."""
+        stats = cls()
+        for value in values:
+            stats.push(value)
+        return stats
+    
+    def push(self, value: float) -> None:
+        """Add one value."""
+        value = float(value)
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+    
+    def merge(self, other: "RunningStats") -> None:
+        """Add all values summarized by ``other``."""
+        if not other.count:
+            return
+        if not self.count:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+        else:
+            self.mean, self.m2 = merge_moments(
+                self.count, self.mean, self.m2, other.count, other.mean, other.m2
+            )
+            self.count += other.count
+        if other.minimum is not None and (self.minimum is None or other.minimum < self.minimum):
+            self.minimum = other.minimum
+        if other.maximum is not None and (self.maximum is None or other.maximum > self.maximum):
+            self.maximum = other.maximum
+    
+    @property
+    def variance(self) -> float:
+        """Population variance (0 for fewer than two values)."""
+        if self.count < 2:
+            return 0.0
+        return max(self.m2, 0.0) / self.count
+    
+    @property
+    def std_dev(self) -> float:
+        """Population standard deviation."""
+        return math.sqrt(self.variance)
+    
+    def z_score(self, value: float) -> Optional[float]:
+        """Standard deviations ``value`` lies above the mean, None without spread."""
+        std_dev = self.std_dev
+        if not std_dev:
+            return None
+        return (float(value) - self.mean) / std_dev
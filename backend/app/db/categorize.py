@@ -0,0 +1,72 @@
+"""
+Re-categorize history job.
+
+Applies each user's categorization rules to their existing transactions,
+in chunks that commit independently, so an interrupted run keeps its
+progress. Users without rules are skipped.
+
+Usage:
+    python -m app.db.categorize [--user-id ID] [--all-rows] [--chunk-size N]
+"""
+import argparse
+import sys
+from typing import List, Optional
+from app.db.session import SessionLocal
+from app.models.categorization_rule import CategorizationRule
+from app.services.categorization_service import RECATEGORIZE_CHUNK_SIZE, CategorizationService
+
+
+def users_with_rules(user_id: Optional[int] = None) -> List[int]:
+    """Ids of users that have active rules."""
+    db = SessionLocal()
+    try:
+        query = db.query(CategorizationRule.user_id).filter(
+            CategorizationRule.is_active == True
+        ).distinct()
+        if user_id is not None:
+            query = query.filter(CategorizationRule.user_id == user_id)
+        return [uid for (uid,) in query.order_by(CategorizationRule.user_id)]
+    finally:
+        db.close()
+
+
+def run(
+    user_id: Optional[int] = None,
+    only_uncategorized: bool = True,
+    chunk_size: int = RECATEGORIZE_CHUNK_SIZE
+) -> dict:
+    """Re-categorize the transactions of every user with rules; returns totals."""
+    totals = {"users": 0, "processed": 0, "updated": 0}
+    for uid in users_with_rules(user_id):
+        db = SessionLocal()
+        try:
+            result = CategorizationService(db).recategorize(uid, only_uncategorized, chunk_size)
+        finally:
+            db.close()
+        totals["users"] += 1
+        totals["processed"] += result.processed
+        totals["updated"] += result.updated
+    return totals
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Apply categorization rules to existing transactions.")
+    parser.add_argument("--user-id", type=int, default=None, help="Limit to one user")
+    parser.add_argument(
+        "--all-rows",
+        action="store_true",
+        help="Also re-categorize transactions that already have a category"
+    )
+    parser.add_argument("--chunk-size", type=int, default=RECATEGORIZE_CHUNK_SIZE)
+    args = parser.parse_args()
+    
+    totals = run(args.user_id, not args.all_rows, args.chunk_size)
+    print(
+        f"Re-categorized {totals['updated']} of {totals['processed']} transactions "
+        f"for {totals['users']} users"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
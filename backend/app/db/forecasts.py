@@ -0,0 +1,144 @@
+"""
+Batch forecast job.
+
+Precomputes expense forecasts for all users into the ``forecasts`` table,
+which the forecast API reads before falling back to fitting inline. Users
+are split into shards; each shard is read with one query, fitted as one
+matrix and written with one INSERT by a worker process. Shards commit
+independently, so an interrupted run resumes where it stopped. Meant to run
+from a scheduler, e.g. nightly.
+
+Usage:
+    python -m app.db.forecasts [--workers N] [--shard-size N] [--horizon N] [--force]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+from typing import Callable, Dict, List, Optional, Sequence
+from app.core.forecasting import month_number, month_start
+from app.db.session import SessionLocal, engine
+from app.models.forecast import Forecast
+from app.models.user import User
+from app.services.forecast_service import ForecastService
+
+DEFAULT_SHARD_SIZE = 500
+DEFAULT_HORIZON = 12
+
+
+def pending_user_ids(as_of: date, force: bool = False) -> List[int]:
+    """
+    Ids of active users still lacking forecasts made in ``as_of``'s month.
+
+    Users without any expense history never get rows, so they are picked up
+    again on every run; their shards cost one empty query.
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(User.id).filter(User.is_active == True)
+        if not force:
+            done = db.query(Forecast.user_id).filter(
+                Forecast.as_of == month_start(month_number(as_of))
+            )
+            query = query.filter(User.id.notin_(done))
+        return [user_id for (user_id,) in query.order_by(User.id)]
+    finally:
+        db.close()
+
+
+def run_shard(user_ids: Sequence[int], as_of: date, horizon: int) -> int:
+    """Fit and store forecasts for one shard; returns rows written."""
+    db = SessionLocal()
+    try:
+        return ForecastService(db).store_forecasts(user_ids, as_of, horizon)
+    finally:
+        db.close()
+
+
+def _init_worker() -> None:
+    """Forget pooled connections inherited from the parent process."""
+    engine.dispose(close=False)
+
+
+def run(
+    workers: int = 1,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    horizon: int = DEFAULT_HORIZON,
+    force: bool = False,
+    as_of: Optional[date] = None,
+    progress: Optional[Callable[[str], None]] = None
+) -> Dict:
+    """
+    Precompute forecasts for all pending users.
+
+    ``workers`` > 1 fits shards in a process pool; each worker opens its own
+    connections. Returns the users and rows processed and the throughput.
+    """
+    as_of = as_of or date.today()
+    user_ids = pending_user_ids(as_of, force)
+    shards = [user_ids[i:i + shard_size] for i in range(0, len(user_ids), shard_size)]
+    
+    started = time.perf_counter()
+    done_users = 0
+    rows = 0
+    
+    def report(shard_users: int, shard_rows: int) -> None:
+        nonlocal done_users, rows
+        done_users += shard_users
+        rows += shard_rows
+        if progress:
+            elapsed = time.perf_counter() - started
+            progress(
+                f"{done_users}/{len(user_ids)} users, {rows} rows, "
+                f"{done_users / elapsed:.0f} users/s"
+            )
+    
+    if workers <= 1:
+        for shard in shards:
+            report(len(shard), run_shard(shard, as_of, horizon))
+    else:
+        # Children must not share the parent's pooled connections
+        engine.dispose()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = {
+                pool.submit(run_shard, shard, as_of, horizon): len(shard)
+                for shard in shards
+            }
+            for future in as_completed(futures):
+                report(futures[future], future.result())
+    
+    elapsed = time.perf_counter() - started
+    return {
+        "users": done_users,
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "users_per_second": round(done_users / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Precompute expense forecasts for all users.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE, help="Users per shard")
+    parser.add_argument("--horizon", type=int, default=DEFAULT_HORIZON, help="Months to forecast")
+    parser.add_argument("--force", action="store_true", help="Recompute users already done this month")
+    args = parser.parse_args()
+    
+    stats = run(
+        workers=args.workers,
+        shard_size=args.shard_size,
+        horizon=args.horizon,
+        force=args.force,
+        progress=print
+    )
+    print(
+        f"Forecast {stats['users']} users ({stats['rows']} rows) in "
+        f"{stats['seconds']}s, {stats['users_per_second']} users/s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,7 +3,8 @@ Database initialization script.
 """
 from app.db.base import Base
 from app.db.session import engine
-from app.models import user, account, transaction, budget, goal, category
+from app.db import search
+from app.models import user, account, transaction, budget, goal, category, daily_rollup, forecast, alert, categorization_rule, category_month_stat, account_balance_snapshot
 
 
 def init_db() -> None:
@@ -0,0 +1,81 @@
+"""
+Connection pool classes with checkout instrumentation.
+"""
+import threading
+import time
+from typing import Dict
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolMetrics:
+    """Process-wide counters for connection checkouts."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+    
+    def record(self, wait: float, timed_out: bool = False) -> None:
+        """Record one checkout attempt and how long it waited."""
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+    
+    def snapshot(self) -> Dict:
+        """Current counter values."""
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": (self.total_wait / attempts * 1000) if attempts else 0.0,
+                "max_wait_ms": self.max_wait * 1000,
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class _TimedPoolMixin:
+    """Times every checkout, including any pre-ping, into ``pool_metrics``."""
+    
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            pool_metrics.record(time.perf_counter() - started, timed_out=True)
+            raise
+        pool_metrics.record(time.perf_counter() - started)
+        return connection
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    """QueuePool recording checkout wait times."""
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool recording checkout wait times."""
+
+
+def get_pool_status(engine: Engine) -> Dict:
+    """Pool occupancy for an engine plus the process-wide checkout metrics."""
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+        })
+    status.update(pool_metrics.snapshot())
+    return status
@@ -0,0 +1,62 @@
+"""
+Daily rollup maintenance commands.
+
+Usage:
+    python -m app.db.rollups rebuild [--user-id ID]
+    python -m app.db.rollups check [--user-id ID]
+"""
+import argparse
+import sys
+from app.db.session import SessionLocal
+from app.services.alerts_service import AlertsService
+from app.services.balance_history_service import BalanceHistoryService
+from app.services.category_stats_service import CategoryStatsService
+from app.services.rollup_service import RollupService
+
+
+def rebuild(user_id: int = None) -> int:
+    """
+    Recompute daily rollups from raw transactions, then the category month
+    statistics, the account balance snapshots and the budget running totals.
+    """
+    db = SessionLocal()
+    try:
+        rows = RollupService(db).rebuild(user_id)
+        CategoryStatsService(db).rebuild(user_id)
+        BalanceHistoryService(db).rebuild(user_id)
+        AlertsService(db).sync_user_budgets(user_id)
+        db.commit()
+        return rows
+    finally:
+        db.close()
+
+
+def check(user_id: int = None) -> list:
+    """Return rollup rows that disagree with raw transactions."""
+    db = SessionLocal()
+    try:
+        return RollupService(db).find_inconsistencies(user_id)
+    finally:
+        db.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Maintain the daily_rollups table.")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--user-id", type=int, default=None, help="Limit to one user")
+    args = parser.parse_args()
+    
+    if args.command == "rebuild":
+        rows = rebuild(args.user_id)
+        print(f"Rebuilt {rows} rollup rows")
+        return 0
+    
+    mismatches = check(args.user_id)
+    for mismatch in mismatches:
+        print(mismatch)
+    print(f"{len(mismatches)} inconsistent rollup rows")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Full-text search schema objects that metadata cannot describe.
+
+PostgreSQL needs the ``pg_trgm`` extension before the trigram index on
+``transactions.description`` is created. SQLite (local runs) searches an
+external-content FTS5 table kept in sync with ``transactions`` by
+triggers; it is created, and filled from existing rows, on the first
+``create_all`` that finds it missing. ``user_id`` is indexed as a token
+so a search intersects with the user's rows inside FTS5 instead of
+ranking every user's matches first. On PostgreSQL, ``rebuild`` also
+creates search indexes missing from a database older than them
+(``CREATE INDEX CONCURRENTLY`` in schema.sql avoids blocking writes).
+
+Usage:
+    python -m app.db.search rebuild
+"""
+import argparse
+import sys
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
+from app.db.base import Base
+from app.db.session import engine
+from app.models.transaction import Transaction
+
+FTS_TABLE = "transactions_fts"
+
+# PostgreSQL indexes declared on the Transaction model
+SEARCH_INDEXES = ("ix_transactions_search", "ix_transactions_description_trgm")
+
+SQLITE_FTS_DDL = (
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        description, notes, user_id,
+        content='transactions', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    # Rank description matches above notes matches; user_id only filters
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', 'bm25(2.0, 1.0, 0.0)')",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON transactions BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, description, notes, user_id)
+        VALUES (new.id, new.description, new.notes, new.user_id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON transactions BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description, notes, user_id)
+        VALUES ('delete', old.id, old.description, old.notes, old.user_id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE OF description, notes ON transactions BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description, notes, user_id)
+        VALUES ('delete', old.id, old.description, old.notes, old.user_id);
+        INSERT INTO {FTS_TABLE}(rowid, description, notes, user_id)
+        VALUES (new.id, new.description, new.notes, new.user_id);
+    END
+    """,
+)
+
+
+@event.listens_for(Base.metadata, "before_create")
+def _create_extensions(target, connection: Connection, **kw) -> None:
+    """Enable trigram indexes on PostgreSQL."""
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_fts_table(target, connection: Connection, **kw) -> None:
+    """Create the SQLite FTS5 table and its triggers when missing."""
+    if connection.dialect.name != "sqlite":
+        return
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": FTS_TABLE}
+    ).first()
+    if exists:
+        return
+    for statement in SQLITE_FTS_DDL:
+        connection.execute(text(statement))
+    rebuild_fts(connection)
+
+
+def rebuild_fts(connection: Connection) -> None:
+    """Re-index every transaction in the SQLite FTS5 table."""
+    connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Maintain the transaction search index.")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.parse_args()
+    
+    with engine.begin() as connection:
+        if connection.dialect.name == "sqlite":
+            rebuild_fts(connection)
+        else:
+            # Databases created before the search indexes lack them
+            _create_extensions(None, connection)
+            for index in Transaction.__table__.indexes:
+                if index.name in SEARCH_INDEXES:
+                    index.create(connection, checkfirst=True)
+                    connection.execute(text(f"REINDEX INDEX {index.name}"))
+    print("Rebuilt transaction search index")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,24 +1,159 @@
 """
 Database session management.
 """
-from sqlalchemy import create_engine
+import time
+from typing import Any, Callable, Dict, TypeVar, Union
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from app.core.config import settings
+from app.core.instrumentation import profiled, record_statement
+from app.db.pool import TimedAsyncAdaptedQueuePool, TimedQueuePool
+
+T = TypeVar("T")
+
+# Async drivers used for each sync database URL scheme
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_engine_options(url: str, is_async: bool = False) -> Dict[str, Any]:
+    """Engine keyword arguments for the pool and statement settings."""
+    backend = make_url(url).get_backend_name()
+    options: Dict[str, Any] = {
+        "echo": settings.DEBUG,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "query_cache_size": settings.DB_QUERY_CACHE_SIZE,
+    }
+    
+    # SQLite (local runs and tests) keeps the dialect's default pool
+    if backend != "sqlite":
+        options.update({
+            "poolclass": TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+        })
+    
+    if backend == "sqlite":
+        options["connect_args"] = {"timeout": settings.DB_SQLITE_BUSY_TIMEOUT}
+    
+    if backend == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS is not None:
+        if is_async:
+            options["connect_args"] = {
+                "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+            }
+        else:
+            options["connect_args"] = {
+                "options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+            }
+    
+    return options
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Time every statement of an engine into the current request's stats.
+
+    Start times are kept on a per-connection stack, so statements nested
+    in another statement's execution are timed correctly.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+    
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        record_statement(statement, time.perf_counter() - conn.info["query_started"].pop())
+    
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        # A failed statement never reaches after_cursor_execute
+        started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+        if started:
+            record_statement(exception_context.statement or "", time.perf_counter() - started.pop())
+
 
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True,
-    echo=settings.DEBUG
+    **get_engine_options(settings.DATABASE_URL)
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+if settings.QUERY_INSTRUMENTATION:
+    instrument_engine(engine)
+
+
+def get_async_database_url(url: str) -> str:
+    """Translate a sync database URL to its async driver equivalent."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend '{backend}'")
+    parsed = parsed.set(drivername=ASYNC_DRIVERS[backend])
+    if backend == "postgresql" and settings.DB_PREPARED_STATEMENT_CACHE_SIZE is not None:
+        parsed = parsed.update_query_dict(
+            {"prepared_statement_cache_size": str(settings.DB_PREPARED_STATEMENT_CACHE_SIZE)}
+        )
+    return parsed.render_as_string(hide_password=False)
+
+
+async_engine = None
+AsyncSessionLocal = None
 
-def get_db() -> Session:
-    """Dependency for getting database session."""
+if settings.DATABASE_ASYNC:
+    async_engine = create_async_engine(
+        get_async_database_url(settings.DATABASE_URL),
+        **get_engine_options(settings.DATABASE_URL, is_async=True)
+    )
+    if settings.QUERY_INSTRUMENTATION:
+        instrument_engine(async_engine.sync_engine)
+    # Objects are serialized after the session work is done, outside the
+    # greenlet, so they must not expire on commit
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+
+def get_request_engine() -> Engine:
+    """The (sync view of the) engine serving API requests."""
+    return async_engine.sync_engine if async_engine is not None else engine
+
+
+def get_sync_db() -> Session:
+    """Dependency for getting a synchronous database session."""
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
 
+
+async def get_async_db() -> AsyncSession:
+    """Dependency for getting an asyncio database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Dependency for getting database session, selected by DATABASE_ASYNC
+get_db = get_async_db if settings.DATABASE_ASYNC else get_sync_db
+
+
+async def run_db(db: Union[Session, AsyncSession], fn: Callable[[Session], T]) -> T:
+    """
+    Run synchronous session code without blocking the event loop.
+
+    With an AsyncSession the code runs on the async driver through
+    ``run_sync``; with a plain Session it runs in the threadpool.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn)
+    return await run_in_threadpool(profiled(fn), db)
@@ -0,0 +1,25 @@
+"""
+Column types shared by the models.
+"""
+from datetime import datetime, timezone
+from sqlalchemy import DateTime
+from sqlalchemy.types import TypeDecorator
+
+
+class UTCDateTime(TypeDecorator):
+    """
+    Timestamp with time zone whose aware values are converted to UTC on the
+    way in.
+
+    SQLite has no timestamp type and stores the wall-clock time without its
+    offset, so without the conversion ``date()`` in SQL would disagree with
+    the UTC day the services bucket a timestamp into. Naive values are taken
+    to be UTC already.
+    """
+    impl = DateTime
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if isinstance(value, datetime) and value.tzinfo is not None:
+            return value.astimezone(timezone.utc)
+        return value
@@ -0,0 +1,60 @@
+"""
+Batched ``INSERT ... ON CONFLICT DO UPDATE`` against a unique index.
+"""
+from typing import Any, Callable, Dict, List, Sequence
+from sqlalchemy import Index, func, literal_column
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+# Rows per statement, well under SQLite's (32766) and PostgreSQL's (65535)
+# bound parameter limits for the tables upserted here
+UPSERT_BATCH_SIZE = 1000
+
+# INSERT constructs with ON CONFLICT support, by dialect
+_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def null_safe(column) -> Any:
+    """
+    Key expression treating NULL as one value in a unique index.
+
+    The literal is inlined so that the ON CONFLICT target repeats the index
+    expression exactly; 0 is never a row id.
+    """
+    return func.coalesce(column, literal_column("0"))
+
+
+def upsert(
+    db: Session,
+    index: Index,
+    rows: Sequence[Dict[str, Any]],
+    values: Callable[[Any], Dict[str, Any]],
+    returning: Sequence[Any] = ()
+) -> List[Any]:
+    """
+    Insert ``rows`` into the table of the unique ``index``, updating rows
+    whose key already exists, in statements of ``UPSERT_BATCH_SIZE`` rows.
+
+    ``values`` receives the ``excluded`` pseudo-row (the proposed values)
+    and returns the SET clause. Keys must not repeat within ``rows``.
+    Returns the ``returning`` columns of every inserted or updated row.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect not in _INSERTS:
+        raise NotImplementedError(f"upserts are not supported on {dialect}")
+    
+    returned: List[Any] = []
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        statement = _INSERTS[dialect](index.table).values(list(rows[start:start + UPSERT_BATCH_SIZE]))
+        statement = statement.on_conflict_do_update(
+            index_elements=list(index.expressions),
+            set_=values(statement.excluded)
+        )
+        if returning:
+            returned.extend(db.execute(statement.returning(*returning)))
+        else:
+            db.execute(statement)
+    return returned
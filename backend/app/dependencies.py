@@ -1,41 +1,104 @@
 """
 Dependency injection for FastAPI routes.
 """
-from typing import Optional
+from typing import Union
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 from jose import JWTError
-from app.db.session import get_db
+from app.db.session import get_db, run_db
+from app.core.cache import MISSING, CacheBackend, TTLCache
 from app.core.security import decode_token
 from app.core.config import settings
+from app.core.metrics import cache_lookup
 from app.models.user import User
+from app.schemas.user import User as UserSchema, TokenUser
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
+# Authenticated users by id, as immutable schema objects
+user_cache: CacheBackend = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS
+)
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get the current authenticated user."""
-    credentials_exception = HTTPException(
+
+def set_user_cache_backend(backend: CacheBackend) -> None:
+    """Swap the user cache for another backend, e.g. one shared by all workers."""
+    global user_cache
+    user_cache = backend
+
+
+def invalidate_cached_user(user_id: int) -> None:
+    """Drop a user from the cache so the next request reloads it."""
+    user_cache.delete(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_change(mapper, connection, target: User) -> None:
+    """Any ORM update (e.g. deactivation) or delete of a user evicts it."""
+    invalidate_cached_user(target.id)
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+
+def decode_user_id(token: str) -> tuple:
+    """Decode a token into ``(user_id, payload)`` or raise 401."""
     payload = decode_token(token)
     if payload is None:
-        raise credentials_exception
+        raise _credentials_exception()
     
-    user_id: Optional[int] = payload.get("sub")
-    if user_id is None:
-        raise credentials_exception
+    try:
+        user_id = int(payload.get("sub"))
+    except (TypeError, ValueError):
+        raise _credentials_exception()
     
-    user = db.query(User).filter(User.id == user_id).first()
+    return user_id, payload
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> UserSchema:
+    """Get the current authenticated user."""
+    user_id, _ = decode_user_id(token)
+    
+    if settings.USER_CACHE_TTL_SECONDS > 0:
+        cached = user_cache.get(user_id)
+        cache_lookup("user", cached is not MISSING)
+        if cached is not MISSING:
+            return cached
+    
+    user = await run_db(db, lambda session: session.query(User).filter(User.id == user_id).first())
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     
-    return user
+    principal = UserSchema.model_validate(user)
+    if settings.USER_CACHE_TTL_SECONDS > 0:
+        user_cache.set(user_id, principal)
+    return principal
+
+
+async def get_read_only_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> Union[UserSchema, TokenUser]:
+    """
+    Get the current user for read-only endpoints.
 
+    With AUTH_TRUST_TOKEN_CLAIMS enabled the user is taken from the signed
+    token claims and no database access happens; otherwise this is the same
+    as get_current_user.
+    """
+    if settings.AUTH_TRUST_TOKEN_CLAIMS:
+        user_id, payload = decode_user_id(token)
+        return TokenUser(id=user_id, username=payload.get("username"))
+    return await get_current_user(token, db)
@@ -1,11 +1,26 @@
 """
 FastAPI application entry point.
 """
-from fastapi import FastAPI
+import logging
+import time
+from fastapi import Depends, FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.api.router import api_router
+from app.core.instrumentation import InstrumentationMiddleware
+from app.core import metrics
 from app.db.init_db import init_db
+from app.db.pool import get_pool_status
+from app.db.session import async_engine, engine, get_db, get_request_engine, run_db
+
+logging.basicConfig(
+    level=settings.LOG_LEVEL,
+    format="%(asctime)s %(levelname)s %(name)s %(message)s"
+)
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -20,8 +35,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Request counts, latency histograms and requests in flight for /metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+# Per-request query counts and timings (outermost, so it times everything)
+app.add_middleware(InstrumentationMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -37,6 +60,14 @@ def on_startup() -> None:
         init_db()
 
 
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    """Close pooled database connections."""
+    if async_engine is not None:
+        await async_engine.dispose()
+    engine.dispose()
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -52,3 +83,33 @@ async def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
 
+
+@app.get("/health/pool")
+async def pool_status():
+    """Database connection pool occupancy and checkout wait metrics."""
+    return get_pool_status(get_request_engine())
+
+
+@app.get("/health/ready")
+async def readiness_check(db: Session = Depends(get_db)):
+    """Readiness probe: 200 once the database answers a query, 503 otherwise."""
+    started = time.perf_counter()
+    try:
+        await run_db(db, lambda session: session.execute(text("SELECT 1")).scalar())
+    except SQLAlchemyError as exc:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unavailable", "database": type(exc).__name__}
+        )
+    return {"status": "ready", "database_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """Process metrics in the Prometheus text format."""
+    if not settings.METRICS_ENABLED:
+        return Response(status_code=404)
+    return Response(
+        content=metrics.render(get_pool_status(get_request_engine())),
+        media_type=metrics.CONTENT_TYPE
+    )
@@ -7,6 +7,12 @@ from app.models.transaction import Transaction
 from app.models.budget import Budget
 from app.models.goal import Goal
 from app.models.category import Category
+from app.models.daily_rollup import DailyRollup
+from app.models.forecast import Forecast
+from app.models.alert import Alert
+from app.models.categorization_rule import CategorizationRule
+from app.models.category_month_stat import CategoryMonthStat
+from app.models.account_balance_snapshot import AccountBalanceSnapshot
 
-__all__ = ["User", "Account", "Transaction", "Budget", "Goal", "Category"]
+__all__ = ["User", "Account", "Transaction", "Budget", "Goal", "Category", "DailyRollup", "Forecast", "Alert", "CategorizationRule", "CategoryMonthStat", "AccountBalanceSnapshot"]
 
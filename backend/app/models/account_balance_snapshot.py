@@ -0,0 +1,33 @@
+"""
+Account balance snapshot model for point-in-time balances.
+"""
+from sqlalchemy import Column, Integer, Numeric, Date, ForeignKey, Index
+from app.db.base import Base
+
+
+class AccountBalanceSnapshot(Base):
+    """
+    End-of-day balance of an account on a day its balance changed.
+
+    Days without a row carry the balance of the previous row forward; the
+    balance before the first row is that row's ``balance - net_change``.
+    Maintained incrementally by the transaction writes; ``day`` is the UTC
+    day of the transaction timestamps, as in the daily rollups.
+    """
+    __tablename__ = "account_balance_snapshots"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    account_id = Column(Integer, ForeignKey("accounts.id", ondelete="CASCADE"), nullable=False)
+    day = Column(Date, nullable=False)
+    balance = Column(Numeric(14, 2), nullable=False)
+    net_change = Column(Numeric(14, 2), nullable=False)
+    
+    __table_args__ = (
+        Index("ix_account_balance_snapshots_account_id_day", account_id, day, unique=True),
+    )
+    
+    def __repr__(self):
+        return (
+            f"<AccountBalanceSnapshot(account_id={self.account_id}, day={self.day}, "
+            f"balance={self.balance})>"
+        )
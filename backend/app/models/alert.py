@@ -0,0 +1,46 @@
+"""
+Alert model for persisted budget threshold crossings.
+"""
+from sqlalchemy import Column, Integer, Numeric, Float, DateTime, ForeignKey, Enum, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+import enum
+from app.db.base import Base
+
+
+class AlertType(str, enum.Enum):
+    """Alert type enumeration."""
+    WARNING = "warning"
+    CRITICAL = "critical"
+
+
+class Alert(Base):
+    """
+    A budget's spending crossing one of the alert thresholds.
+
+    Written when a transaction write pushes a budget's running total over a
+    threshold; ``resolved_at`` is set once spending falls back below it.
+    """
+    __tablename__ = "alerts"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    budget_id = Column(Integer, ForeignKey("budgets.id", ondelete="CASCADE"), nullable=False)
+    threshold = Column(Integer, nullable=False)
+    alert_type = Column(Enum(AlertType), nullable=False)
+    spent = Column(Numeric(12, 2), nullable=False)
+    budget_amount = Column(Numeric(10, 2), nullable=False)
+    percentage = Column(Float, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    resolved_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Relationships
+    budget = relationship("Budget")
+    
+    __table_args__ = (
+        Index("ix_alerts_user_id_resolved_at", user_id, resolved_at),
+        Index("ix_alerts_budget_id_threshold", budget_id, threshold),
+    )
+    
+    def __repr__(self):
+        return f"<Alert(id={self.id}, budget_id={self.budget_id}, threshold={self.threshold})>"
@@ -28,6 +28,11 @@ class Budget(Base):
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=True)
     is_active = Column(Boolean, default=True)
+    # Running total of the expenses counted against the budget's period
+    # starting on running_period_start, kept up to date by transaction
+    # writes for alert evaluation
+    running_spent = Column(Numeric(12, 2), nullable=False, default=0, server_default="0")
+    running_period_start = Column(Date, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -0,0 +1,49 @@
+"""
+Categorization rule model for automatic transaction categorization.
+"""
+from sqlalchemy import Column, Integer, String, Numeric, DateTime, ForeignKey, Enum, Boolean, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+import enum
+from app.db.base import Base
+
+
+class RuleMatchType(str, enum.Enum):
+    """Rule pattern type enumeration."""
+    CONTAINS = "contains"
+    REGEX = "regex"
+
+
+class CategorizationRule(Base):
+    """
+    Rule assigning a category to matching uncategorized transactions.
+
+    A transaction matches when its description contains ``pattern``
+    (case-insensitive; a regular expression for ``regex`` rules) and its
+    amount and account satisfy the optional conditions. The first matching
+    rule by ``priority`` (highest first), then age, wins.
+    """
+    __tablename__ = "categorization_rules"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
+    match_type = Column(Enum(RuleMatchType), nullable=False, default=RuleMatchType.CONTAINS)
+    pattern = Column(String, nullable=True)
+    min_amount = Column(Numeric(10, 2), nullable=True)
+    max_amount = Column(Numeric(10, 2), nullable=True)
+    account_id = Column(Integer, ForeignKey("accounts.id", ondelete="CASCADE"), nullable=True)
+    priority = Column(Integer, nullable=False, default=0)
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Relationships
+    category = relationship("Category")
+    
+    __table_args__ = (
+        Index("ix_categorization_rules_user_id", user_id),
+    )
+    
+    def __repr__(self):
+        return f"<CategorizationRule(id={self.id}, pattern={self.pattern}, category_id={self.category_id})>"
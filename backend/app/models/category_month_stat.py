@@ -0,0 +1,40 @@
+"""
+Category month statistics model for denormalized expense statistics.
+"""
+from sqlalchemy import Column, Integer, Numeric, Float, Date, ForeignKey, Index
+from app.db.base import Base
+from app.db.upsert import null_safe
+
+
+class CategoryMonthStat(Base):
+    """
+    Statistics of one user's expenses in one category and month.
+
+    Maintained incrementally by the transaction writes: ``mean`` and ``m2``
+    (sum of squared deviations from the mean) are Welford running moments
+    of the individual expense amounts. ``month`` is the first day of the
+    UTC month; a NULL ``category_id`` holds uncategorized expenses.
+    """
+    __tablename__ = "category_month_stats"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
+    month = Column(Date, nullable=False)
+    total = Column(Numeric(14, 2), nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+    min_amount = Column(Numeric(10, 2), nullable=True)
+    max_amount = Column(Numeric(10, 2), nullable=True)
+    mean = Column(Float, nullable=False, default=0.0)
+    m2 = Column(Float, nullable=False, default=0.0)
+    
+    __table_args__ = (
+        # Unique (with NULL categories equal) so that writes can upsert
+        Index("ix_category_month_stats_key", user_id, month, null_safe(category_id), unique=True),
+    )
+    
+    def __repr__(self):
+        return (
+            f"<CategoryMonthStat(user_id={self.user_id}, category_id={self.category_id}, "
+            f"month={self.month}, total={self.total}, count={self.count})>"
+        )
@@ -0,0 +1,42 @@
+"""
+Daily rollup model for pre-aggregated transaction totals.
+"""
+from sqlalchemy import Column, Integer, Numeric, Date, ForeignKey, Enum, Index
+from app.db.base import Base
+from app.db.upsert import null_safe
+from app.models.transaction import TransactionType
+
+
+class DailyRollup(Base):
+    """
+    Sum and count of transactions per user, day, category, account and type.
+
+    Maintained incrementally by TransactionsService; ``day`` is the UTC day
+    of the transaction timestamp.
+    """
+    __tablename__ = "daily_rollups"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    day = Column(Date, nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
+    account_id = Column(Integer, ForeignKey("accounts.id"), nullable=False)
+    transaction_type = Column(Enum(TransactionType), nullable=False)
+    total = Column(Numeric(14, 2), nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        # Unique (with NULL categories equal) so that writes can upsert
+        Index(
+            "ix_daily_rollups_key",
+            user_id, day, null_safe(category_id), account_id, transaction_type,
+            unique=True
+        ),
+        Index("ix_daily_rollups_user_id_type_day", user_id, transaction_type, day),
+    )
+    
+    def __repr__(self):
+        return (
+            f"<DailyRollup(user_id={self.user_id}, day={self.day}, "
+            f"type={self.transaction_type}, total={self.total}, count={self.count})>"
+        )
@@ -0,0 +1,34 @@
+"""
+Forecast model for precomputed expense forecasts.
+"""
+from sqlalchemy import Column, Integer, Numeric, Date, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class Forecast(Base):
+    """
+    Forecasted expenses of one user and category for one month.
+
+    Written in bulk by the batch forecast job; ``as_of`` is the month the
+    forecast was made in (its history ends the month before).
+    """
+    __tablename__ = "forecasts"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
+    as_of = Column(Date, nullable=False)
+    month = Column(Date, nullable=False)
+    forecasted_amount = Column(Numeric(14, 2), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_forecasts_user_id_as_of", user_id, as_of),
+    )
+    
+    def __repr__(self):
+        return (
+            f"<Forecast(user_id={self.user_id}, category_id={self.category_id}, "
+            f"month={self.month}, amount={self.forecasted_amount})>"
+        )
@@ -1,11 +1,15 @@
 """
 Transaction model for financial transactions.
 """
-from sqlalchemy import Column, Integer, String, Numeric, DateTime, ForeignKey, Enum, Text
+from sqlalchemy import Column, Integer, String, Numeric, DateTime, ForeignKey, Enum, Text, Index, literal_column
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+# Registers the PostgreSQL to_tsvector construct used by the search index,
+# which otherwise fails to compile unless the dialect was imported first
+import sqlalchemy.dialects.postgresql
 import enum
 from app.db.base import Base
+from app.db.types import UTCDateTime
 
 
 class TransactionType(str, enum.Enum):
@@ -15,6 +19,25 @@ class TransactionType(str, enum.Enum):
     TRANSFER = "transfer"
 
 
+# Text search configuration of the PostgreSQL full-text index
+SEARCH_CONFIG = literal_column("'english'::regconfig")
+
+
+def search_document(description, notes):
+    """
+    PostgreSQL tsvector searched by ``q``, descriptions weighted above notes.
+
+    Queries must build the same expression for the GIN index to be used.
+    """
+    return func.setweight(
+        func.to_tsvector(SEARCH_CONFIG, func.coalesce(description, literal_column("''"))),
+        literal_column("'A'")
+    ).op("||")(func.setweight(
+        func.to_tsvector(SEARCH_CONFIG, func.coalesce(notes, literal_column("''"))),
+        literal_column("'B'")
+    ))
+
+
 class Transaction(Base):
     """Transaction model."""
     __tablename__ = "transactions"
@@ -26,11 +49,34 @@ class Transaction(Base):
     amount = Column(Numeric(10, 2), nullable=False)
     transaction_type = Column(Enum(TransactionType), nullable=False)
     description = Column(Text, nullable=True)
-    date = Column(DateTime(timezone=True), nullable=False, index=True)
+    date = Column(UTCDateTime(timezone=True), nullable=False, index=True)
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Composite indexes matching the hot query shapes: every service filters
+    # on user_id first, then type/category/account, then a date range.
+    __table_args__ = (
+        Index("ix_transactions_user_id_date", user_id, date.desc()),
+        Index("ix_transactions_user_id_type_date", user_id, transaction_type, date),
+        Index("ix_transactions_user_id_category_id_date", user_id, category_id, date),
+        Index("ix_transactions_account_id_date", account_id, date),
+        # Text search on PostgreSQL: full-text matching, plus trigrams for
+        # substring (merchant name) matching; SQLite uses an FTS5 table
+        # (see app.db.search)
+        Index(
+            "ix_transactions_search",
+            search_document(description, notes),
+            postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_transactions_description_trgm",
+            description,
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="transactions")
     account = relationship("Account", back_populates="transactions")
@@ -0,0 +1,25 @@
+"""
+Alert schemas for response validation.
+"""
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+from decimal import Decimal
+from app.models.alert import AlertType
+
+
+class Alert(BaseModel):
+    """Alert response schema."""
+    id: int
+    budget_id: int
+    budget_name: str
+    threshold: int
+    alert_type: AlertType
+    spent: Decimal
+    budget_amount: Decimal
+    percentage: float
+    created_at: datetime
+    resolved_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
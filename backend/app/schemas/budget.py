@@ -54,8 +54,19 @@ class Budget(BudgetInDB):
 
 
 class BudgetWithSpending(Budget):
-    """Budget schema with spending information."""
+    """Budget schema with spending information for the current period."""
+    period_start: Optional[date] = None
+    period_end: Optional[date] = None
     spent: Money = Decimal("0.00")
     remaining: Money = Decimal("0.00")
     percentage_used: float = Field(default=0.0)
 
+
+class BudgetPeriodSpending(BaseModel):
+    """Spending of one budget period."""
+    period_start: date
+    period_end: date
+    spent: Money
+    remaining: Money
+    percentage_used: float
+
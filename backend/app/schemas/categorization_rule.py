@@ -0,0 +1,60 @@
+"""
+Categorization rule schemas for request/response validation.
+"""
+from pydantic import BaseModel, Field, condecimal
+from typing import Optional
+from datetime import datetime
+from app.models.categorization_rule import RuleMatchType
+
+Money = condecimal(max_digits=10, decimal_places=2)
+
+
+class CategorizationRuleBase(BaseModel):
+    """Base categorization rule schema."""
+    category_id: int
+    match_type: RuleMatchType = RuleMatchType.CONTAINS
+    pattern: Optional[str] = Field(None, min_length=1, max_length=200)
+    min_amount: Optional[Money] = None
+    max_amount: Optional[Money] = None
+    account_id: Optional[int] = None
+    priority: int = 0
+
+
+class CategorizationRuleCreate(CategorizationRuleBase):
+    """Schema for categorization rule creation."""
+    pass
+
+
+class CategorizationRuleUpdate(BaseModel):
+    """Schema for categorization rule update."""
+    category_id: Optional[int] = None
+    match_type: Optional[RuleMatchType] = None
+    pattern: Optional[str] = Field(None, min_length=1, max_length=200)
+    min_amount: Optional[Money] = None
+    max_amount: Optional[Money] = None
+    account_id: Optional[int] = None
+    priority: Optional[int] = None
+    is_active: Optional[bool] = None
+
+
+class CategorizationRuleInDB(CategorizationRuleBase):
+    """Categorization rule schema with database fields."""
+    id: int
+    user_id: int
+    is_active: bool
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class CategorizationRule(CategorizationRuleInDB):
+    """Categorization rule response schema."""
+    pass
+
+
+class RecategorizeResult(BaseModel):
+    """Outcome of re-applying rules to existing transactions."""
+    processed: int = 0
+    updated: int = 0
@@ -0,0 +1,13 @@
+"""
+Pagination schemas for cursor-based list responses.
+"""
+from pydantic import BaseModel
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """A page of items with the cursor for the next page."""
+    items: List[T]
+    next_cursor: Optional[str] = None
@@ -2,7 +2,7 @@
 Transaction schemas for request/response validation.
 """
 from pydantic import BaseModel, condecimal
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from decimal import Decimal
 from app.models.transaction import TransactionType
@@ -52,3 +52,16 @@ class Transaction(TransactionInDB):
     """Transaction response schema."""
     pass
 
+
+
+class TransactionImportError(BaseModel):
+    """A rejected row in a bulk import."""
+    row: int
+    detail: str
+
+
+class TransactionImportResult(BaseModel):
+    """Outcome of a bulk transaction import."""
+    imported: int = 0
+    failed: int = 0
+    errors: List[TransactionImportError] = []
@@ -56,6 +56,12 @@ class Token(BaseModel):
     token_type: str = "bearer"
 
 
+class TokenUser(BaseModel):
+    """User identity taken from access token claims, without a database lookup."""
+    id: int
+    username: Optional[str] = None
+
+
 class TokenData(BaseModel):
     """Token data schema."""
     user_id: Optional[int] = None
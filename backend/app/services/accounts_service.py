@@ -1,10 +1,24 @@
 """
 Accounts service for business logic.
 """
-from typing import List, Optional
+from typing import List, Optional, Sequence, Tuple
 from sqlalchemy.orm import Session
+from sqlalchemy import delete
+from app.core.pagination import paginate_keyset
+from app.core.response_cache import bump_user_version
+from app.core.serialization import schema_columns
 from app.models.account import Account
-from app.schemas.account import AccountCreate, AccountUpdate
+from app.models.daily_rollup import DailyRollup
+from app.schemas.account import AccountCreate, AccountUpdate, Account as AccountSchema
+from app.services.alerts_service import AlertsService
+from app.services.balance_history_service import BalanceHistoryService
+from app.services.categorization_service import RULES_SCOPE, CategorizationService
+from app.services.category_stats_service import CategoryStatsService
+from app.services.forecast_service import ForecastService
+
+
+# Columns of the list response schema, for row-based list queries
+ACCOUNT_COLUMNS = schema_columns(Account, AccountSchema)
 
 
 class AccountsService:
@@ -13,11 +27,35 @@ class AccountsService:
     def __init__(self, db: Session):
         self.db = db
     
-    def get_user_accounts(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Account]:
-        """Get all accounts for a user."""
-        return self.db.query(Account).filter(
+    def get_user_accounts(
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        columns: Optional[Sequence] = None
+    ) -> List[Account]:
+        """Get all accounts for a user (rows of ``columns`` only, when given)."""
+        query = self.db.query(Account).filter(
             Account.user_id == user_id
-        ).offset(skip).limit(limit).all()
+        )
+        if columns:
+            query = query.with_entities(*columns)
+        return query.offset(skip).limit(limit).all()
+    
+    def get_user_accounts_page(
+        self,
+        user_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        columns: Optional[Sequence] = None
+    ) -> Tuple[List[Account], Optional[str]]:
+        """Get a page of accounts keyed on id, with the cursor for the next page."""
+        query = self.db.query(Account).filter(
+            Account.user_id == user_id
+        )
+        if columns:
+            query = query.with_entities(*columns)
+        return paginate_keyset(query, [Account.id], cursor, limit)
     
     def get_account(self, account_id: int, user_id: int) -> Optional[Account]:
         """Get a specific account by ID."""
@@ -34,6 +72,7 @@ class AccountsService:
         )
         self.db.add(db_account)
         self.db.commit()
+        bump_user_version(user_id)
         self.db.refresh(db_account)
         return db_account
     
@@ -49,10 +88,18 @@ class AccountsService:
             return None
         
         update_data = account_data.model_dump(exclude_unset=True)
+        if update_data.get("balance") is not None:
+            # Lock the row so no concurrent transaction write slips in
+            # between reading the balance and shifting the history
+            current = self.db.query(Account.balance).filter(
+                Account.id == account.id
+            ).with_for_update().scalar()
+            BalanceHistoryService(self.db).shift(account.id, update_data["balance"] - current)
         for field, value in update_data.items():
             setattr(account, field, value)
         
         self.db.commit()
+        bump_user_version(user_id)
         self.db.refresh(account)
         return account
     
@@ -62,7 +109,17 @@ class AccountsService:
         if not account:
             return False
         
+        # Transactions cascade with the account; drop their rollups too
+        self.db.execute(delete(DailyRollup).where(DailyRollup.account_id == account.id))
+        BalanceHistoryService(self.db).delete_account_snapshots(account.id)
+        ForecastService(self.db).discard_stored(user_id)
+        CategorizationService(self.db).delete_account_rules(account.id)
         self.db.delete(account)
+        self.db.flush()
+        CategoryStatsService(self.db).rebuild(user_id)
+        AlertsService(self.db).sync_user_budgets(user_id)
         self.db.commit()
+        bump_user_version(user_id)
+        bump_user_version(user_id, RULES_SCOPE)
         return True
 
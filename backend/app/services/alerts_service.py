@@ -1,13 +1,47 @@
 """
 Alerts service for budget alerts and notifications.
 """
-from typing import List, Dict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from collections import defaultdict
 from datetime import date
 from decimal import Decimal
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import delete, func, or_, update
+from app.core.config import settings
+from app.core.metrics import inc
+from app.models.alert import Alert, AlertType
 from app.models.budget import Budget
-from app.models.transaction import Transaction, TransactionType
+from app.models.transaction import TransactionType
+from app.services.rollup_service import RollupDeltas
+from app.services.spending_service import SpendingService
+
+# Columns of the alert response schema, for row-based list queries
+ALERT_COLUMNS = (
+    Alert.id,
+    Alert.budget_id,
+    Budget.name.label("budget_name"),
+    Alert.threshold,
+    Alert.alert_type,
+    Alert.spent,
+    Alert.budget_amount,
+    Alert.percentage,
+    Alert.created_at,
+    Alert.resolved_at,
+)
+
+# Budget columns needed to match expenses and evaluate thresholds
+TRACKED_BUDGET_COLUMNS = (
+    Budget.id,
+    Budget.user_id,
+    Budget.category_id,
+    Budget.amount,
+    Budget.period,
+    Budget.start_date,
+    Budget.end_date,
+    Budget.running_period_start,
+)
+
+SYNC_CHUNK_SIZE = 500
 
 
 class AlertsService:
@@ -16,41 +50,188 @@ class AlertsService:
     def __init__(self, db: Session):
         self.db = db
     
-    def get_budget_alerts(self, user_id: int) -> List[Dict]:
-        """Get budget alerts for user."""
-        alerts = []
-        budgets = self.db.query(Budget).filter(
+    def get_user_alerts(
+        self,
+        user_id: int,
+        include_resolved: bool = False,
+        limit: int = 100
+    ) -> List[Any]:
+        """Get a user's alerts as rows of ``ALERT_COLUMNS``, newest first."""
+        query = self.db.query(*ALERT_COLUMNS).join(
+            Budget, Budget.id == Alert.budget_id
+        ).filter(Alert.user_id == user_id)
+        if not include_resolved:
+            query = query.filter(Alert.resolved_at.is_(None))
+        return query.order_by(Alert.id.desc()).limit(limit).all()
+    
+    def record_spending(self, user_id: int, deltas: RollupDeltas) -> List[Alert]:
+        """
+        Apply a transaction write's expense deltas to budget running totals.
+
+        Only active budgets whose current period contains a changed day,
+        and whose category matches when they have one, are touched: one
+        atomic UPDATE each, followed by the threshold check. Budgets whose
+        running total still belongs to an earlier period are recomputed
+        instead. Runs inside the caller's transaction; returns the alerts
+        raised.
+        """
+        expenses: Dict[Tuple[date, Optional[int]], Decimal] = defaultdict(Decimal)
+        for (_, day, category_id, _, transaction_type), (amount, _) in deltas.items():
+            if transaction_type == TransactionType.EXPENSE and amount:
+                expenses[(day, category_id)] += amount
+        if not expenses:
+            return []
+        
+        days = [day for day, _ in expenses]
+        budgets = self.db.query(*TRACKED_BUDGET_COLUMNS).filter(
             Budget.user_id == user_id,
-            Budget.is_active == True
-        ).all()
+            Budget.is_active == True,
+            Budget.start_date <= max(days),
+            or_(Budget.end_date.is_(None), Budget.end_date >= min(days)),
+            or_(
+                Budget.category_id.is_(None),
+                Budget.category_id.in_({category_id for _, category_id in expenses})
+            )
+        ).order_by(Budget.id).all()
         
+        # Budgets are written in id order, rolled over ones included, so
+        # concurrent writes lock them in the same order
+        raised = []
         for budget in budgets:
-            # Calculate spending
-            spent = self.db.query(func.sum(Transaction.amount)).filter(
-                Transaction.user_id == user_id,
-                Transaction.transaction_type == TransactionType.EXPENSE,
-                Transaction.date >= budget.start_date
-            )
+            first_day, last_day = SpendingService.budget_days(budget)
+            if budget.running_period_start != first_day:
+                raised += self.sync_budgets([self.db.get(Budget, budget.id)])
+                self.db.flush()
+                continue
             
-            if budget.end_date:
-                spent = spent.filter(Transaction.date <= budget.end_date)
-            
-            if budget.category_id:
-                spent = spent.filter(Transaction.category_id == budget.category_id)
+            delta = sum(
+                (
+                    amount for (day, category_id), amount in expenses.items()
+                    if first_day <= day <= last_day
+                    and (budget.category_id is None or category_id == budget.category_id)
+                ),
+                Decimal("0")
+            )
+            if not delta:
+                continue
             
-            spent_amount = spent.scalar() or Decimal("0.00")
-            percentage = (spent_amount / Decimal(str(budget.amount)) * 100) if budget.amount > 0 else 0
+            spent = self.db.execute(
+                update(Budget)
+                .where(Budget.id == budget.id)
+                # Keep updated_at for changes to the budget itself
+                .values(running_spent=Budget.running_spent + delta, updated_at=Budget.updated_at)
+                .returning(Budget.running_spent)
+            ).scalar_one()
+            raised += self._evaluate(
+                budget,
+                spent,
+                budget_percentage(spent - delta, budget.amount),
+                budget_percentage(spent, budget.amount)
+            )
+        return raised
+    
+    def sync_budgets(
+        self,
+        budgets: Sequence[Budget],
+        previous: Optional[Dict[int, float]] = None
+    ) -> List[Alert]:
+        """
+        Recompute the running totals of whole budgets and check thresholds.
+
+        For changes running totals cannot follow: a budget being created or
+        edited, or spending removed wholesale. ``previous`` maps budget ids
+        to their percentage before the change and defaults to the stored
+        running total, so alerts of a period that ended are resolved.
+        Inactive budgets resolve all their alerts.
+        """
+        spending = SpendingService(self.db).get_spending(budgets)
+        raised = []
+        for budget in budgets:
+            if previous and budget.id in previous:
+                old_percentage = previous[budget.id]
+            else:
+                old_percentage = budget_percentage(budget.running_spent or 0, budget.amount)
             
-            # Alert if over 80% of budget
-            if percentage >= 80:
-                alerts.append({
-                    "budget_id": budget.id,
-                    "budget_name": budget.name,
-                    "spent": float(spent_amount),
-                    "budget_amount": float(budget.amount),
-                    "percentage": float(percentage),
-                    "alert_type": "warning" if percentage < 100 else "critical"
-                })
+            budget.running_spent = spending[budget.id]
+            budget.running_period_start = SpendingService.budget_days(budget)[0]
+            percentage = budget_percentage(budget.running_spent, budget.amount) if budget.is_active else 0.0
+            raised += self._evaluate(budget, budget.running_spent, old_percentage, percentage)
+        return raised
+    
+    def sync_stale_budgets(self, user_id: int) -> int:
+        """
+        Move a user's active budgets whose running total belongs to an
+        earlier period into the current one; returns budgets synced.
+
+        ``record_spending`` only rolls a budget over on a matching expense,
+        so budgets without new spending would keep last period's total and
+        alerts. Reads call this first; commits when anything changed.
+        """
+        budgets = self.db.query(*TRACKED_BUDGET_COLUMNS).filter(
+            Budget.user_id == user_id,
+            Budget.is_active == True
+        ).order_by(Budget.id).all()
+        stale = [
+            budget.id for budget in budgets
+            if budget.running_period_start != SpendingService.budget_days(budget)[0]
+        ]
+        if not stale:
+            return 0
         
-        return alerts
+        self.sync_budgets(self.db.query(Budget).filter(Budget.id.in_(stale)).order_by(Budget.id).all())
+        self.db.commit()
+        return len(stale)
+    
+    def sync_user_budgets(self, user_id: Optional[int] = None) -> int:
+        """Recompute the running totals of a user's (or every) budget; returns budgets synced."""
+        query = self.db.query(Budget).order_by(Budget.id)
+        if user_id is not None:
+            query = query.filter(Budget.user_id == user_id)
+        budgets = query.all()
+        for start in range(0, len(budgets), SYNC_CHUNK_SIZE):
+            self.sync_budgets(budgets[start:start + SYNC_CHUNK_SIZE])
+        return len(budgets)
+    
+    def delete_budget_alerts(self, budget_id: int) -> None:
+        """Drop the alerts of a budget being deleted."""
+        self.db.execute(delete(Alert).where(Alert.budget_id == budget_id))
+    
+    def _evaluate(
+        self,
+        budget: Any,
+        spent: Decimal,
+        old_percentage: float,
+        percentage: float
+    ) -> List[Alert]:
+        """Raise alerts for thresholds crossed upwards and resolve those crossed downwards."""
+        raised = []
+        for threshold in sorted(settings.BUDGET_ALERT_THRESHOLDS):
+            if old_percentage < threshold <= percentage:
+                alert = Alert(
+                    user_id=budget.user_id,
+                    budget_id=budget.id,
+                    threshold=threshold,
+                    alert_type=AlertType.CRITICAL if threshold >= 100 else AlertType.WARNING,
+                    spent=spent,
+                    budget_amount=budget.amount,
+                    percentage=round(percentage, 2)
+                )
+                self.db.add(alert)
+                raised.append(alert)
+                inc("alerts_raised_total", type=alert.alert_type.value)
+            elif percentage < threshold <= old_percentage:
+                self.db.execute(
+                    update(Alert).where(
+                        Alert.budget_id == budget.id,
+                        Alert.threshold == threshold,
+                        Alert.resolved_at.is_(None)
+                    ).values(resolved_at=func.now())
+                )
+        return raised
+
 
+def budget_percentage(spent: Decimal, amount: Decimal) -> float:
+    """Share of a budget amount spent, in percent."""
+    if not amount or amount <= 0:
+        return 0.0
+    return float(Decimal(str(spent)) / Decimal(str(amount)) * 100)
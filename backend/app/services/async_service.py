@@ -0,0 +1,33 @@
+"""
+Async facade over the synchronous service classes.
+"""
+from typing import Any, Type, Union
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.db.session import run_db
+
+
+class AsyncService:
+    """
+    Awaitable variant of a service class.
+
+    Every method of the wrapped service becomes a coroutine that runs the
+    service against the request session via ``run_db``, so the same business
+    logic serves both the sync and the async database stack.
+    """
+    
+    def __init__(self, service_class: Type, db: Union[Session, AsyncSession]):
+        self.service_class = service_class
+        self.db = db
+    
+    def __getattr__(self, name: str):
+        if not callable(getattr(self.service_class, name, None)):
+            raise AttributeError(name)
+        
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return await run_db(
+                self.db,
+                lambda session: getattr(self.service_class(session), name)(*args, **kwargs)
+            )
+        
+        return call
@@ -0,0 +1,429 @@
+"""
+Balance history service for account balance snapshots and net worth.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, delete, func, insert, or_, select, update
+from app.models.account import Account
+from app.models.account_balance_snapshot import AccountBalanceSnapshot
+from app.models.transaction import Transaction, TransactionType
+from app.services.rollup_service import Granularity, RollupDeltas, bucket_start, next_bucket, rollup_day_column
+
+# Upper bound on the number of points of a balance series
+MAX_HISTORY_POINTS = 5000
+
+DEFAULT_HISTORY_DAYS = 30
+
+SNAPSHOT_COLUMNS = ("account_id", "day", "balance", "net_change")
+
+
+def balance_changes(deltas: RollupDeltas) -> Dict[int, Dict[date, Decimal]]:
+    """Net balance change per account and day of accumulated rollup deltas."""
+    changes: Dict[int, Dict[date, Decimal]] = defaultdict(lambda: defaultdict(Decimal))
+    for (_, day, _, account_id, transaction_type), (amount, _) in deltas.items():
+        if transaction_type == TransactionType.INCOME:
+            changes[account_id][day] += amount
+        elif transaction_type == TransactionType.EXPENSE:
+            changes[account_id][day] -= amount
+    return {
+        account_id: {day: change for day, change in days.items() if change}
+        for account_id, days in changes.items()
+    }
+
+
+class BalanceHistoryService:
+    """Service for the ``account_balance_snapshots`` table."""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def record(self, deltas: RollupDeltas) -> None:
+        """
+        Apply a transaction write's balance changes to the snapshots.
+
+        Call after the account balances themselves were updated, inside the
+        same transaction; pending changes are flushed to read them. A change
+        on a day moves that day's and every later snapshot. Snapshots after
+        an account's last changed day all move by its total change, as in
+        ``shift``; only the days from its first to its last changed day are
+        recomputed from raw transactions, ending on the balance the next
+        snapshot implies. All accounts are written at once, in one UPDATE,
+        one DELETE and one INSERT ... SELECT, so the cost grows with the
+        span of the changed days and not with the history behind them.
+        """
+        changes = {account_id: days for account_id, days in balance_changes(deltas).items() if days}
+        if not changes:
+            return
+        windows = {account_id: (min(days), max(days)) for account_id, days in changes.items()}
+        
+        self.db.flush()
+        later = or_(*[
+            and_(AccountBalanceSnapshot.account_id == account_id, AccountBalanceSnapshot.day > last_day)
+            for account_id, (_, last_day) in sorted(windows.items())
+        ])
+        self.db.execute(
+            update(AccountBalanceSnapshot).where(later).values(
+                balance=AccountBalanceSnapshot.balance + case(
+                    {account_id: sum(days.values()) for account_id, days in changes.items()},
+                    value=AccountBalanceSnapshot.account_id
+                )
+            )
+        )
+        closing = self._closing_balances(windows)
+        self.db.execute(
+            delete(AccountBalanceSnapshot).where(or_(*[
+                and_(
+                    AccountBalanceSnapshot.account_id == account_id,
+                    AccountBalanceSnapshot.day >= first_day,
+                    AccountBalanceSnapshot.day <= last_day
+                )
+                for account_id, (first_day, last_day) in sorted(windows.items())
+            ]))
+        )
+        self.db.execute(
+            insert(AccountBalanceSnapshot).from_select(
+                list(SNAPSHOT_COLUMNS),
+                running_balances(list(windows), self.db.get_bind().dialect.name, windows, closing)
+            )
+        )
+    
+    def _closing_balances(self, windows: Dict[int, Tuple[date, date]]) -> Dict[int, Decimal]:
+        """
+        Balance at the end of each window's last day: the next snapshot's
+        balance before its change, or for accounts without a later snapshot
+        the current balance less any raw changes after the day.
+        """
+        snapshots = AccountBalanceSnapshot.__table__
+        following = select(
+            snapshots.c.account_id,
+            func.min(snapshots.c.day).label("day")
+        ).where(or_(*[
+            and_(snapshots.c.account_id == account_id, snapshots.c.day > last_day)
+            for account_id, (_, last_day) in windows.items()
+        ])).group_by(snapshots.c.account_id).subquery()
+        closing = {
+            account_id: _decimal(balance) - _decimal(net_change)
+            for account_id, balance, net_change in self.db.execute(
+                select(snapshots.c.account_id, snapshots.c.balance, snapshots.c.net_change).join(
+                    following,
+                    and_(snapshots.c.account_id == following.c.account_id, snapshots.c.day == following.c.day)
+                )
+            )
+        }
+        
+        missing = [account_id for account_id in windows if account_id not in closing]
+        if missing:
+            after = dict(
+                self.db.query(Transaction.account_id, func.sum(_net_amount())).filter(or_(*[
+                    and_(
+                        Transaction.account_id == account_id,
+                        Transaction.date >= _day_start(windows[account_id][1] + timedelta(days=1))
+                    )
+                    for account_id in missing
+                ])).group_by(Transaction.account_id)
+            )
+            closing.update(
+                (account_id, _decimal(balance) - _decimal(after.get(account_id) or 0))
+                for account_id, balance in self.db.query(Account.id, Account.balance).filter(
+                    Account.id.in_(missing)
+                )
+            )
+        return closing
+    
+    def shift(self, account_id: int, amount: Decimal) -> None:
+        """
+        Move a whole account history by ``amount``.
+
+        A balance edited directly is treated as a correction of the opening
+        balance, so every snapshot moves with it.
+        """
+        if amount:
+            self.db.execute(
+                update(AccountBalanceSnapshot)
+                .where(AccountBalanceSnapshot.account_id == account_id)
+                .values(balance=AccountBalanceSnapshot.balance + amount)
+            )
+    
+    def delete_account_snapshots(self, account_id: int) -> None:
+        """Drop the snapshots of an account being deleted."""
+        self.db.execute(
+            delete(AccountBalanceSnapshot).where(AccountBalanceSnapshot.account_id == account_id)
+        )
+    
+    def rebuild(self, user_id: Optional[int] = None) -> int:
+        """
+        Recompute the snapshots of a user's (or every) account from raw
+        transactions in one INSERT ... SELECT; returns the row count written.
+
+        Runs inside the caller's transaction.
+        """
+        account_ids = select(Account.id)
+        if user_id is not None:
+            account_ids = account_ids.where(Account.user_id == user_id)
+        self.db.execute(
+            delete(AccountBalanceSnapshot).where(AccountBalanceSnapshot.account_id.in_(account_ids))
+        )
+        result = self.db.execute(
+            insert(AccountBalanceSnapshot).from_select(
+                list(SNAPSHOT_COLUMNS),
+                running_balances(account_ids, self.db.get_bind().dialect.name)
+            )
+        )
+        return result.rowcount
+    
+    def get_balance_history(
+        self,
+        account_id: int,
+        user_id: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        granularity: Granularity = Granularity.DAY
+    ) -> Optional[List[Dict]]:
+        """
+        End-of-period balances of an account, or None when it is not the user's.
+
+        Raises ValueError for an invalid range.
+        """
+        account = self.db.query(Account.id, Account.balance).filter(
+            Account.id == account_id,
+            Account.user_id == user_id
+        ).first()
+        if not account:
+            return None
+        
+        series = self._series({account.id: account.balance}, start_date, end_date, granularity)
+        return [{"date": day.isoformat(), "balance": float(balance)} for day, balance in series]
+    
+    def get_net_worth(
+        self,
+        user_id: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        granularity: Granularity = Granularity.DAY
+    ) -> List[Dict]:
+        """
+        End-of-period sum of the balances of a user's active accounts.
+
+        Raises ValueError for an invalid range.
+        """
+        accounts = dict(
+            self.db.query(Account.id, Account.balance).filter(
+                Account.user_id == user_id,
+                Account.is_active == True
+            )
+        )
+        series = self._series(accounts, start_date, end_date, granularity)
+        return [{"date": day.isoformat(), "net_worth": float(total)} for day, total in series]
+    
+    def _series(
+        self,
+        accounts: Dict[int, Decimal],
+        start_date: Optional[date],
+        end_date: Optional[date],
+        granularity: Granularity
+    ) -> List[Tuple[date, Decimal]]:
+        """
+        Summed end-of-period balances of ``accounts`` (ids to current balances).
+
+        One point per bucket, dated on the bucket's last day within the
+        range. Reads the balance before the range and the snapshots inside
+        it; accounts with transactions but no snapshots yet (before the
+        first rebuild) fall back to running balances computed by the
+        database from raw transactions.
+        """
+        end_date = end_date or date.today()
+        start_date = start_date or end_date - timedelta(days=DEFAULT_HISTORY_DAYS - 1)
+        if start_date > end_date:
+            raise ValueError("start_date must not be after end_date")
+        points = _closing_days(start_date, end_date, granularity)
+        if not accounts:
+            return [(day, Decimal("0")) for day in points]
+        
+        snapshots = AccountBalanceSnapshot.__table__
+        opening = self._opening_balances(snapshots, list(accounts), start_date)
+        unseen = [account_id for account_id in accounts if account_id not in opening]
+        rows = self._range_rows(snapshots, list(accounts), start_date, end_date)
+        
+        if unseen:
+            unbuilt = [
+                account_id for (account_id,) in self.db.query(Transaction.account_id).filter(
+                    Transaction.account_id.in_(unseen)
+                ).distinct()
+            ]
+            if unbuilt:
+                computed = running_balances(unbuilt, self.db.get_bind().dialect.name).subquery()
+                opening.update(self._opening_balances(computed, unbuilt, start_date))
+                rows += self._range_rows(computed, unbuilt, start_date, end_date)
+                rows.sort(key=lambda row: row[1])
+        
+        # Accounts without any balance change have always had their balance
+        balances = {
+            account_id: opening.get(account_id, current)
+            for account_id, current in accounts.items()
+        }
+        total = sum(balances.values(), Decimal("0"))
+        series = []
+        index = 0
+        for day in points:
+            while index < len(rows) and rows[index][1] <= day:
+                account_id, _, balance = rows[index]
+                total += balance - balances[account_id]
+                balances[account_id] = balance
+                index += 1
+            series.append((day, total))
+        return series
+    
+    def _opening_balances(self, source, account_ids: Sequence[int], day: date) -> Dict[int, Decimal]:
+        """
+        Balances at the start of ``day`` per account, from the last snapshot
+        before it or else the first one from it on; accounts without any
+        snapshot are left out.
+        """
+        earlier = select(
+            source.c.account_id,
+            func.max(source.c.day).label("day")
+        ).where(
+            source.c.account_id.in_(account_ids),
+            source.c.day < day
+        ).group_by(source.c.account_id).subquery()
+        opening = {
+            account_id: _decimal(balance)
+            for account_id, balance in self.db.execute(
+                select(source.c.account_id, source.c.balance).join(
+                    earlier,
+                    and_(source.c.account_id == earlier.c.account_id, source.c.day == earlier.c.day)
+                )
+            )
+        }
+        
+        missing = [account_id for account_id in account_ids if account_id not in opening]
+        if missing:
+            later = select(
+                source.c.account_id,
+                func.min(source.c.day).label("day")
+            ).where(
+                source.c.account_id.in_(missing),
+                source.c.day >= day
+            ).group_by(source.c.account_id).subquery()
+            opening.update(
+                (account_id, _decimal(balance) - _decimal(net_change))
+                for account_id, balance, net_change in self.db.execute(
+                    select(source.c.account_id, source.c.balance, source.c.net_change).join(
+                        later,
+                        and_(source.c.account_id == later.c.account_id, source.c.day == later.c.day)
+                    )
+                )
+            )
+        return opening
+    
+    def _range_rows(
+        self,
+        source,
+        account_ids: Sequence[int],
+        start_date: date,
+        end_date: date
+    ) -> List[Tuple[int, date, Decimal]]:
+        """Snapshots of ``[start_date, end_date]`` as ``(account_id, day, balance)``, oldest first."""
+        return [
+            (account_id, _as_date(day), _decimal(balance))
+            for account_id, day, balance in self.db.execute(
+                select(source.c.account_id, source.c.day, source.c.balance).where(
+                    source.c.account_id.in_(account_ids),
+                    source.c.day >= start_date,
+                    source.c.day <= end_date
+                ).order_by(source.c.day)
+            )
+        ]
+
+
+def running_balances(
+    account_ids,
+    dialect: str,
+    windows: Optional[Dict[int, Tuple[date, date]]] = None,
+    closing: Optional[Dict[int, Decimal]] = None
+):
+    """
+    End-of-day balances of accounts computed from raw transactions.
+
+    A window function sums each account's net changes from the latest day
+    backwards, so ``balance = current balance - changes after the day``
+    is computed by the database in one pass. Yields the snapshot columns
+    for every day with a net change of at least half a cent (SQLite sums
+    decimals as floats). With ``windows``, only the days from the first to
+    the last (inclusive) day it maps each account to are read, and the
+    balance at the end of the last day is taken from ``closing``.
+    """
+    day = rollup_day_column(Transaction.date, dialect)
+    accounts = Transaction.account_id.in_(account_ids)
+    if windows:
+        accounts = or_(*[
+            and_(
+                Transaction.account_id == account_id,
+                Transaction.date >= _day_start(first_day),
+                Transaction.date < _day_start(last_day + timedelta(days=1))
+            )
+            for account_id, (first_day, last_day) in windows.items()
+        ])
+    daily = select(
+        Transaction.account_id,
+        day.label("day"),
+        func.sum(_net_amount()).label("net_change")
+    ).where(accounts).group_by(Transaction.account_id, day).subquery()
+    
+    changes_since = func.sum(daily.c.net_change).over(
+        partition_by=daily.c.account_id,
+        order_by=daily.c.day.desc()
+    )
+    final_balance = case(closing, value=daily.c.account_id) if windows else Account.balance
+    windowed = select(
+        daily.c.account_id,
+        daily.c.day,
+        (final_balance - changes_since + daily.c.net_change).label("balance"),
+        daily.c.net_change
+    ).join(Account, Account.id == daily.c.account_id).subquery()
+    return select(
+        windowed.c.account_id,
+        windowed.c.day,
+        windowed.c.balance,
+        windowed.c.net_change
+    ).where(func.abs(windowed.c.net_change) >= Decimal("0.005"))
+
+
+def _net_amount():
+    """A transaction's effect on its account balance, in SQL."""
+    return case(
+        (Transaction.transaction_type == TransactionType.INCOME, Transaction.amount),
+        (Transaction.transaction_type == TransactionType.EXPENSE, -Transaction.amount),
+        else_=0
+    )
+
+
+def _day_start(day: date) -> datetime:
+    """Start of a UTC day."""
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def _closing_days(start_date: date, end_date: date, granularity: Granularity) -> List[date]:
+    """Last day within the range of every bucket overlapping ``[start_date, end_date]``."""
+    days = []
+    bucket = bucket_start(start_date, granularity)
+    while bucket <= end_date:
+        if len(days) == MAX_HISTORY_POINTS:
+            raise ValueError("Too many periods; use a coarser granularity or a shorter range")
+        following = next_bucket(bucket, granularity)
+        days.append(min(following - timedelta(days=1), end_date))
+        bucket = following
+    return days
+
+
+def _as_date(value) -> date:
+    """Date of a day column value (computed dates come back as text on SQLite)."""
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def _decimal(value) -> Decimal:
+    """Decimal of a balance (computed sums may come back as floats)."""
+    return value if isinstance(value, Decimal) else Decimal(str(value))
@@ -1,14 +1,27 @@
 """
 Budget service for business logic.
 """
-from typing import List, Optional
+from typing import List, Optional, Sequence, Tuple
 from datetime import date, datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
 from decimal import Decimal
+from app.core.pagination import paginate_keyset
+from app.core.response_cache import bump_user_version
+from app.core.serialization import schema_columns
 from app.models.budget import Budget
-from app.models.transaction import Transaction, TransactionType
-from app.schemas.budget import BudgetCreate, BudgetUpdate, BudgetWithSpending
+from app.schemas.budget import (
+    BudgetCreate,
+    BudgetUpdate,
+    BudgetWithSpending,
+    BudgetPeriodSpending,
+    Budget as BudgetSchema,
+)
+from app.services.alerts_service import AlertsService, budget_percentage
+from app.services.spending_service import SpendingService
+
+
+# Columns of the list response schema, for row-based list queries
+BUDGET_COLUMNS = schema_columns(Budget, BudgetSchema)
 
 
 class BudgetService:
@@ -17,12 +30,37 @@ class BudgetService:
     def __init__(self, db: Session):
         self.db = db
     
-    def get_user_budgets(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Budget]:
-        """Get all budgets for a user."""
-        return self.db.query(Budget).filter(
+    def get_user_budgets(
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        columns: Optional[Sequence] = None
+    ) -> List[Budget]:
+        """Get all budgets for a user (rows of ``columns`` only, when given)."""
+        query = self.db.query(Budget).filter(
+            Budget.user_id == user_id,
+            Budget.is_active == True
+        )
+        if columns:
+            query = query.with_entities(*columns)
+        return query.offset(skip).limit(limit).all()
+    
+    def get_user_budgets_page(
+        self,
+        user_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        columns: Optional[Sequence] = None
+    ) -> Tuple[List[Budget], Optional[str]]:
+        """Get a page of budgets keyed on id, with the cursor for the next page."""
+        query = self.db.query(Budget).filter(
             Budget.user_id == user_id,
             Budget.is_active == True
-        ).offset(skip).limit(limit).all()
+        )
+        if columns:
+            query = query.with_entities(*columns)
+        return paginate_keyset(query, [Budget.id], cursor, limit)
     
     def get_budget(self, budget_id: int, user_id: int) -> Optional[Budget]:
         """Get a specific budget by ID."""
@@ -41,35 +79,68 @@ class BudgetService:
         if not budget:
             return None
         
-        # Calculate spending for the budget period
-        spent = self._calculate_spending(budget, user_id)
+        spent = SpendingService(self.db).get_spending([budget])[budget.id]
+        return self._with_spending(budget, spent)
+    
+    def get_user_budgets_with_spending(
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[BudgetWithSpending]:
+        """Get all budgets for a user with spending, in 1 + ceil(n / SPENDING_CHUNK_SIZE) queries."""
+        budgets = self.get_user_budgets(user_id, skip=skip, limit=limit)
+        spending = SpendingService(self.db).get_spending(budgets)
+        return [self._with_spending(budget, spending[budget.id]) for budget in budgets]
+    
+    def get_user_budgets_with_spending_page(
+        self,
+        user_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[BudgetWithSpending], Optional[str]]:
+        """Get a page of budgets keyed on id with spending, and the cursor for the next page."""
+        budgets, next_cursor = self.get_user_budgets_page(user_id, cursor=cursor, limit=limit)
+        spending = SpendingService(self.db).get_spending(budgets)
+        return [self._with_spending(budget, spending[budget.id]) for budget in budgets], next_cursor
+    
+    def get_budget_history(
+        self,
+        budget_id: int,
+        user_id: int
+    ) -> Optional[List[BudgetPeriodSpending]]:
+        """Get spent and remaining amounts of every period of a budget so far, oldest first."""
+        budget = self.get_budget(budget_id, user_id)
+        if not budget:
+            return None
+        
+        amount = Decimal(str(budget.amount))
+        return [
+            BudgetPeriodSpending(
+                period_start=first_day,
+                period_end=last_day,
+                spent=spent,
+                remaining=amount - spent,
+                percentage_used=float(spent / amount * 100) if amount > 0 else 0.0
+            )
+            for first_day, last_day, spent in SpendingService(self.db).get_period_spending(budget)
+        ]
+    
+    def _with_spending(self, budget: Budget, spent: Decimal) -> BudgetWithSpending:
+        """Combine a budget with its spent amount in the current period."""
         remaining = Decimal(str(budget.amount)) - spent
         percentage_used = (spent / Decimal(str(budget.amount)) * 100) if budget.amount > 0 else 0
+        period_start, period_end = SpendingService.budget_days(budget)
         
         return BudgetWithSpending(
             **budget.__dict__,
+            period_start=period_start,
+            period_end=period_end,
             spent=spent,
             remaining=remaining,
             percentage_used=float(percentage_used)
         )
     
-    def _calculate_spending(self, budget: Budget, user_id: int) -> Decimal:
-        """Calculate spending for a budget."""
-        query = self.db.query(func.sum(Transaction.amount)).filter(
-            Transaction.user_id == user_id,
-            Transaction.transaction_type == TransactionType.EXPENSE,
-            Transaction.date >= budget.start_date
-        )
-        
-        if budget.end_date:
-            query = query.filter(Transaction.date <= budget.end_date)
-        
-        if budget.category_id:
-            query = query.filter(Transaction.category_id == budget.category_id)
-        
-        result = query.scalar()
-        return Decimal(str(result)) if result else Decimal("0.00")
-    
     def create_budget(self, budget_data: BudgetCreate, user_id: int) -> Budget:
         """Create a new budget."""
         db_budget = Budget(
@@ -77,7 +148,10 @@ class BudgetService:
             user_id=user_id
         )
         self.db.add(db_budget)
+        self.db.flush()
+        AlertsService(self.db).sync_budgets([db_budget], {db_budget.id: 0.0})
         self.db.commit()
+        bump_user_version(user_id)
         self.db.refresh(db_budget)
         return db_budget
     
@@ -92,11 +166,14 @@ class BudgetService:
         if not budget:
             return None
         
+        previous = {budget.id: budget_percentage(budget.running_spent, budget.amount)}
         update_data = budget_data.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(budget, field, value)
         
+        AlertsService(self.db).sync_budgets([budget], previous)
         self.db.commit()
+        bump_user_version(user_id)
         self.db.refresh(budget)
         return budget
     
@@ -106,7 +183,9 @@ class BudgetService:
         if not budget:
             return False
         
+        AlertsService(self.db).delete_budget_alerts(budget.id)
         self.db.delete(budget)
         self.db.commit()
+        bump_user_version(user_id)
         return True
 
@@ -0,0 +1,248 @@
+"""
+Categorization service for rule-based transaction categorization.
+"""
+import re
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, update
+from app.core.cache import MISSING, CacheBackend, TTLCache
+from app.core.categorization import RuleMatcher, regex_hazard
+from app.core.config import settings
+from app.core.metrics import cache_lookup
+from app.core.response_cache import bump_user_version, get_user_version
+from app.models.account import Account
+from app.models.categorization_rule import CategorizationRule, RuleMatchType
+from app.models.category import Category
+from app.models.transaction import Transaction
+from app.schemas.categorization_rule import (
+    CategorizationRuleCreate,
+    CategorizationRuleUpdate,
+    RecategorizeResult,
+)
+from app.services.alerts_service import AlertsService
+from app.services.category_stats_service import CategoryStatsService, StatsDeltas
+from app.services.forecast_service import ForecastService
+from app.services.rollup_service import RollupDeltas, RollupService
+
+RULES_SCOPE = "rules"
+
+RECATEGORIZE_CHUNK_SIZE = 5000
+
+# Rule columns the matcher is compiled from
+MATCHER_COLUMNS = (
+    CategorizationRule.id,
+    CategorizationRule.category_id,
+    CategorizationRule.match_type,
+    CategorizationRule.pattern,
+    CategorizationRule.min_amount,
+    CategorizationRule.max_amount,
+    CategorizationRule.account_id,
+    CategorizationRule.priority,
+)
+
+# Transaction columns needed to match and to move rollup contributions
+RECATEGORIZE_COLUMNS = (
+    Transaction.id,
+    Transaction.user_id,
+    Transaction.account_id,
+    Transaction.category_id,
+    Transaction.amount,
+    Transaction.transaction_type,
+    Transaction.date,
+    Transaction.description,
+)
+
+# Compiled matchers by user and rules version
+matcher_cache: CacheBackend = TTLCache(
+    maxsize=settings.CATEGORIZATION_CACHE_MAX_SIZE,
+    ttl=settings.CATEGORIZATION_CACHE_TTL_SECONDS
+)
+
+
+class CategorizationService:
+    """Service for categorization rules and automatic categorization."""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def get_user_rules(self, user_id: int, skip: int = 0, limit: int = 100) -> List[CategorizationRule]:
+        """Get a user's rules in the order they are applied."""
+        return self.db.query(CategorizationRule).filter(
+            CategorizationRule.user_id == user_id
+        ).order_by(
+            CategorizationRule.priority.desc(),
+            CategorizationRule.id
+        ).offset(skip).limit(limit).all()
+    
+    def get_rule(self, rule_id: int, user_id: int) -> Optional[CategorizationRule]:
+        """Get a specific rule by ID."""
+        return self.db.query(CategorizationRule).filter(
+            CategorizationRule.id == rule_id,
+            CategorizationRule.user_id == user_id
+        ).first()
+    
+    def create_rule(self, rule_data: CategorizationRuleCreate, user_id: int) -> CategorizationRule:
+        """Create a new rule."""
+        rule = CategorizationRule(**rule_data.model_dump(), user_id=user_id)
+        self._validate(rule)
+        self.db.add(rule)
+        self.db.commit()
+        bump_user_version(user_id, RULES_SCOPE)
+        self.db.refresh(rule)
+        return rule
+    
+    def update_rule(
+        self,
+        rule_id: int,
+        rule_data: CategorizationRuleUpdate,
+        user_id: int
+    ) -> Optional[CategorizationRule]:
+        """Update an existing rule."""
+        rule = self.get_rule(rule_id, user_id)
+        if not rule:
+            return None
+        
+        for field, value in rule_data.model_dump(exclude_unset=True).items():
+            setattr(rule, field, value)
+        try:
+            self._validate(rule)
+        except ValueError:
+            self.db.rollback()
+            raise
+        
+        self.db.commit()
+        bump_user_version(user_id, RULES_SCOPE)
+        self.db.refresh(rule)
+        return rule
+    
+    def delete_rule(self, rule_id: int, user_id: int) -> bool:
+        """Delete a rule."""
+        rule = self.get_rule(rule_id, user_id)
+        if not rule:
+            return False
+        
+        self.db.delete(rule)
+        self.db.commit()
+        bump_user_version(user_id, RULES_SCOPE)
+        return True
+    
+    def delete_account_rules(self, account_id: int) -> None:
+        """
+        Drop the rules limited to an account being deleted.
+
+        Runs inside the caller's transaction, which must bump the user's
+        rules version after committing.
+        """
+        self.db.execute(delete(CategorizationRule).where(CategorizationRule.account_id == account_id))
+    
+    def matcher(self, user_id: int) -> RuleMatcher:
+        """
+        The user's active rules compiled into one matcher.
+
+        Compiling thousands of rules takes a while, so matchers are cached
+        until the user's rules change.
+        """
+        key = ("matcher", user_id, get_user_version(user_id, RULES_SCOPE))
+        matcher = matcher_cache.get(key)
+        cache_lookup("categorization", matcher is not MISSING)
+        if matcher is MISSING:
+            rules = self.db.query(*MATCHER_COLUMNS).filter(
+                CategorizationRule.user_id == user_id,
+                CategorizationRule.is_active == True
+            ).all()
+            matcher = RuleMatcher(rules)
+            matcher_cache.set(key, matcher)
+        return matcher
+    
+    def recategorize(
+        self,
+        user_id: int,
+        only_uncategorized: bool = True,
+        chunk_size: int = RECATEGORIZE_CHUNK_SIZE
+    ) -> RecategorizeResult:
+        """
+        Apply the user's rules to existing transactions.
+
+        Transactions are read in id order, ``chunk_size`` at a time. Changed
+        categories are written with one bulk UPDATE per chunk, and the
+        rollups, category statistics and budget totals move along. Each chunk commits on its own,
+        so an interrupted run keeps its progress. Transactions that no rule
+        matches keep their category.
+        """
+        matcher = self.matcher(user_id)
+        result = RecategorizeResult()
+        if not len(matcher):
+            return result
+        
+        last_id = 0
+        while True:
+            query = self.db.query(*RECATEGORIZE_COLUMNS).filter(
+                Transaction.user_id == user_id,
+                Transaction.id > last_id
+            )
+            if only_uncategorized:
+                query = query.filter(Transaction.category_id.is_(None))
+            rows = query.order_by(Transaction.id).limit(chunk_size).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            result.processed += len(rows)
+            
+            changes = []
+            deltas = RollupDeltas()
+            stats_deltas = StatsDeltas()
+            for row in rows:
+                category_id = matcher.match(row.description, row.amount, row.account_id)
+                if category_id is None or category_id == row.category_id:
+                    continue
+                before = row._asdict()
+                after = {**before, "category_id": category_id}
+                deltas.add(before, sign=-1)
+                deltas.add(after)
+                stats_deltas.add(before, sign=-1)
+                stats_deltas.add(after)
+                changes.append({"id": row.id, "category_id": category_id})
+            
+            if changes:
+                self.db.execute(update(Transaction), changes)
+                RollupService(self.db).apply(deltas)
+                CategoryStatsService(self.db).apply(stats_deltas)
+                AlertsService(self.db).record_spending(user_id, deltas)
+                ForecastService(self.db).discard_stored(user_id, [day for _, day, *_ in deltas])
+                self.db.commit()
+                bump_user_version(user_id)
+                result.updated += len(changes)
+        
+        return result
+    
+    def _validate(self, rule: CategorizationRule) -> None:
+        """Check a rule's references and conditions, raising ValueError."""
+        if not self.db.query(Category.id).filter(Category.id == rule.category_id).first():
+            raise ValueError("Category not found")
+        if rule.account_id is not None and not self.db.query(Account.id).filter(
+            Account.id == rule.account_id,
+            Account.user_id == rule.user_id
+        ).first():
+            raise ValueError("Account not found")
+        if rule.match_type == RuleMatchType.REGEX:
+            if not rule.pattern:
+                raise ValueError("Regex rules need a pattern")
+            try:
+                re.compile(rule.pattern)
+            except re.error as exc:
+                raise ValueError(f"Invalid regular expression: {exc}")
+            hazard = regex_hazard(rule.pattern)
+            if hazard:
+                raise ValueError(f"Regular expression could backtrack catastrophically: {hazard}")
+        if rule.min_amount is not None and rule.max_amount is not None and rule.min_amount > rule.max_amount:
+            raise ValueError("min_amount must not exceed max_amount")
+
+
+def categorize_mapping(matcher: RuleMatcher, mapping: Dict[str, Any]) -> None:
+    """Fill in the category of an uncategorized transaction mapping from the rules."""
+    if mapping.get("category_id") is None:
+        mapping["category_id"] = matcher.match(
+            mapping.get("description"),
+            mapping.get("amount"),
+            mapping.get("account_id")
+        )
@@ -0,0 +1,246 @@
+"""
+Category statistics service for maintaining monthly expense statistics.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from sqlalchemy.orm import Session
+from sqlalchemy import case, delete, func, insert, or_, select, update
+from app.core.forecasting import month_number, month_start
+from app.core.statistics import RunningStats, merge_moments
+from app.db.upsert import upsert
+from app.models.category_month_stat import CategoryMonthStat
+from app.models.transaction import Transaction, TransactionType
+from app.services.rollup_service import lock_order, rollup_amount, rollup_key
+
+# (user_id, month, category_id)
+StatsKey = Tuple[int, date, Optional[int]]
+
+KEY_COLUMNS = ("user_id", "month", "category_id")
+
+REBUILD_BATCH_SIZE = 10000
+
+# Unique index of the stats keys that added amounts upsert against
+_KEY_INDEX = next(
+    index for index in CategoryMonthStat.__table__.indexes if index.name == "ix_category_month_stats_key"
+)
+
+
+def stats_key(transaction: Any) -> Optional[StatsKey]:
+    """Stats key of a transaction object or dict, None unless it is an expense."""
+    user_id, day, category_id, _, transaction_type = rollup_key(transaction)
+    if transaction_type != TransactionType.EXPENSE:
+        return None
+    return user_id, day.replace(day=1), category_id
+
+
+class StatsDeltas(dict):
+    """
+    Expense amounts added and removed per stats key, accumulated before writing.
+
+    Values map the sign (1 or -1) to the running summary and exact total of
+    the amounts added or removed.
+    """
+    
+    def add(self, transaction: Any, sign: int = 1) -> None:
+        """Accumulate a transaction's amount with the given sign (non-expenses are ignored)."""
+        key = stats_key(transaction)
+        if key is None:
+            return
+        batch = self.setdefault(key, {}).setdefault(sign, [RunningStats(), Decimal("0")])
+        amount = rollup_amount(transaction)
+        batch[0].push(amount)
+        batch[1] += amount
+
+
+class CategoryStatsService:
+    """Service for the ``category_month_stats`` table."""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def record(self, transaction: Any, sign: int = 1) -> StatsDeltas:
+        """Add (``sign=1``) or remove (``sign=-1``) a transaction's amount; returns the deltas."""
+        deltas = StatsDeltas()
+        deltas.add(transaction, sign)
+        self.apply(deltas)
+        return deltas
+    
+    def record_change(self, before: Dict[str, Any], after: Any) -> StatsDeltas:
+        """Move a transaction's amount from its old values to its new ones; returns the deltas."""
+        deltas = StatsDeltas()
+        deltas.add(before, sign=-1)
+        deltas.add(after)
+        self.apply(deltas)
+        return deltas
+    
+    def apply(self, deltas: StatsDeltas) -> None:
+        """
+        Apply accumulated deltas in ``lock_order``: added amounts alone with
+        one upsert per ``UPSERT_BATCH_SIZE`` keys, otherwise key by key with
+        atomic statements.
+
+        Removing an amount that was a month's minimum or maximum re-reads
+        the extremes from the remaining transactions, so pending changes
+        (including the deletion itself) are flushed first.
+        """
+        ordered = sorted(deltas.items(), key=lambda item: lock_order(item[0]))
+        if not any(-1 in batches for _, batches in ordered):
+            self._add([(key, batches[1]) for key, batches in ordered])
+            return
+        
+        self.db.flush()
+        for key, batches in ordered:
+            if 1 in batches:
+                self._add([(key, batches[1])])
+            if -1 in batches:
+                self._remove(key, *batches[-1])
+    
+    def rebuild(self, user_id: Optional[int] = None) -> int:
+        """
+        Recompute the statistics from raw transactions; returns the row count written.
+
+        Runs inside the caller's transaction.
+        """
+        statement = delete(CategoryMonthStat)
+        if user_id is not None:
+            statement = statement.where(CategoryMonthStat.user_id == user_id)
+        self.db.execute(statement)
+        
+        query = self.db.query(
+            Transaction.user_id,
+            Transaction.date,
+            Transaction.category_id,
+            Transaction.amount,
+            Transaction.transaction_type
+        ).filter(Transaction.transaction_type == TransactionType.EXPENSE)
+        if user_id is not None:
+            query = query.filter(Transaction.user_id == user_id)
+        
+        deltas = StatsDeltas()
+        for row in query.yield_per(REBUILD_BATCH_SIZE):
+            deltas.add(row._asdict())
+        
+        rows = [
+            {**dict(zip(KEY_COLUMNS, key)), **_row_values(*batches[1])}
+            for key, batches in deltas.items()
+        ]
+        if rows:
+            self.db.execute(insert(CategoryMonthStat), rows)
+        return len(rows)
+    
+    def _add(self, batches: List[Tuple[StatsKey, List]]) -> None:
+        """Merge batches of added amounts into their rows, creating missing ones."""
+        rows = [
+            {**dict(zip(KEY_COLUMNS, key)), **_row_values(stats, total)}
+            for key, (stats, total) in batches
+        ]
+        if not rows:
+            return
+        
+        def merged(excluded) -> Dict[str, Any]:
+            mean, m2 = merge_moments(
+                CategoryMonthStat.count, CategoryMonthStat.mean, CategoryMonthStat.m2,
+                excluded.count, excluded.mean, excluded.m2
+            )
+            return {
+                "count": CategoryMonthStat.count + excluded.count,
+                "total": CategoryMonthStat.total + excluded.total,
+                "mean": mean,
+                "m2": m2,
+                "min_amount": case(
+                    (CategoryMonthStat.min_amount <= excluded.min_amount, CategoryMonthStat.min_amount),
+                    else_=excluded.min_amount
+                ),
+                "max_amount": case(
+                    (CategoryMonthStat.max_amount >= excluded.max_amount, CategoryMonthStat.max_amount),
+                    else_=excluded.max_amount
+                ),
+            }
+        
+        upsert(self.db, _KEY_INDEX, rows, merged)
+    
+    def _remove(self, key: StatsKey, stats: RunningStats, total: Decimal) -> None:
+        """Take a batch of removed amounts out of a row, pruning it when emptied."""
+        filters = _key_filters(key)
+        emptied = self.db.execute(
+            delete(CategoryMonthStat).where(*filters, CategoryMonthStat.count <= stats.count)
+        ).rowcount
+        if emptied:
+            return
+        
+        mean, m2 = merge_moments(
+            CategoryMonthStat.count, CategoryMonthStat.mean, CategoryMonthStat.m2,
+            -stats.count, stats.mean, -stats.m2
+        )
+        self.db.execute(
+            update(CategoryMonthStat).where(*filters).values(
+                count=CategoryMonthStat.count - stats.count,
+                total=CategoryMonthStat.total - total,
+                mean=mean,
+                m2=m2
+            )
+        )
+        
+        # Extremes cannot be subtracted; re-read them when one was removed
+        user_id, month, category_id = key
+        remaining = select(Transaction.amount).where(
+            Transaction.user_id == user_id,
+            Transaction.category_id.is_(None) if category_id is None
+            else Transaction.category_id == category_id,
+            Transaction.transaction_type == TransactionType.EXPENSE,
+            *month_filters(month)
+        ).subquery()
+        self.db.execute(
+            update(CategoryMonthStat).where(
+                *filters,
+                or_(
+                    CategoryMonthStat.min_amount >= _money(stats.minimum),
+                    CategoryMonthStat.max_amount <= _money(stats.maximum)
+                )
+            ).values(
+                min_amount=select(func.min(remaining.c.amount)).scalar_subquery(),
+                max_amount=select(func.max(remaining.c.amount)).scalar_subquery()
+            )
+        )
+
+
+def month_filters(month: date) -> List:
+    """WHERE clauses matching transactions in the UTC month starting at ``month``."""
+    return [
+        Transaction.date >= datetime.combine(month, time.min, tzinfo=timezone.utc),
+        Transaction.date < datetime.combine(
+            month_start(month_number(month) + 1), time.min, tzinfo=timezone.utc
+        ),
+    ]
+
+
+
+def _key_filters(key: StatsKey) -> List:
+    """WHERE clauses matching a stats key (NULL-safe on category)."""
+    user_id, month, category_id = key
+    return [
+        CategoryMonthStat.user_id == user_id,
+        CategoryMonthStat.month == month,
+        CategoryMonthStat.category_id.is_(None) if category_id is None
+        else CategoryMonthStat.category_id == category_id,
+    ]
+
+
+def _row_values(stats: RunningStats, total: Decimal) -> Dict[str, Any]:
+    """Column values of a new row summarizing ``stats``."""
+    return {
+        "count": stats.count,
+        "total": total,
+        "mean": stats.mean,
+        "m2": stats.m2,
+        "min_amount": _money(stats.minimum),
+        "max_amount": _money(stats.maximum),
+    }
+
+
+def _money(value: Optional[float]) -> Optional[Decimal]:
+    """Decimal of an amount summarized as a float."""
+    if value is None:
+        return None
+    return Decimal(str(round(value, 2)))
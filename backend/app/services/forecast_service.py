@@ -1,12 +1,29 @@
 """
 Forecast service for financial forecasting.
 """
-from typing import Dict, List
-from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from datetime import date
 from decimal import Decimal
+import numpy as np
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.models.transaction import Transaction, TransactionType
+from sqlalchemy import delete, func, insert
+from app.core.cache import MISSING, CacheBackend, TTLCache
+from app.core.config import settings
+from app.core.metrics import cache_lookup
+from app.core.forecasting import forecast, forecast_window, month_number, month_start, resample_monthly
+from app.core.response_cache import get_user_version
+from app.models.daily_rollup import DailyRollup
+from app.models.forecast import Forecast
+from app.models.transaction import TransactionType
+
+# (user_id, category_id) of each row of a series matrix
+SeriesKey = Tuple[int, Optional[int]]
+
+# Fitted forecasts by user, data version, month and horizon
+forecast_cache: CacheBackend = TTLCache(
+    maxsize=settings.FORECAST_CACHE_MAX_SIZE,
+    ttl=settings.FORECAST_CACHE_TTL_SECONDS
+)
 
 
 class ForecastService:
@@ -20,25 +37,182 @@ class ForecastService:
         user_id: int,
         months: int = 3
     ) -> List[Dict]:
-        """Forecast monthly expenses based on historical data."""
-        # Get average monthly expenses from last 6 months
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=180)  # 6 months
+        """Forecast total monthly expenses, starting with the current month."""
+        labels, _, matrix = self._fitted(user_id, months)
+        totals = matrix.sum(axis=0) if len(matrix) else np.zeros(months)
+        return [
+            {"month": label, "forecasted_amount": round(float(amount), 2)}
+            for label, amount in zip(labels, totals)
+        ]
+    
+    def forecast_expenses_by_category(
+        self,
+        user_id: int,
+        months: int = 3
+    ) -> List[Dict]:
+        """Forecast monthly expenses of each category the user spends in."""
+        labels, category_ids, matrix = self._fitted(user_id, months)
+        return [
+            {
+                "category_id": category_id,
+                "forecasts": [
+                    {"month": label, "forecasted_amount": round(float(amount), 2)}
+                    for label, amount in zip(labels, row)
+                ]
+            }
+            for category_id, row in zip(category_ids, matrix)
+        ]
+    
+    def monthly_series(
+        self,
+        user_ids: Sequence[int],
+        first_month: date,
+        end_month: date
+    ) -> Tuple[List[SeriesKey], np.ndarray]:
+        """
+        Monthly expense totals per user and category in ``[first_month, end_month)``.
+
+        Reads the daily rollups of all given users in one query and
+        resamples them to months in NumPy; returns the row keys and the
+        ``(rows, months)`` matrix.
+        """
+        rows = self.db.query(
+            DailyRollup.user_id,
+            DailyRollup.category_id,
+            DailyRollup.day,
+            func.sum(DailyRollup.total)
+        ).filter(
+            DailyRollup.user_id.in_(user_ids),
+            DailyRollup.transaction_type == TransactionType.EXPENSE,
+            DailyRollup.day >= first_month,
+            DailyRollup.day < end_month
+        ).group_by(
+            DailyRollup.user_id,
+            DailyRollup.category_id,
+            DailyRollup.day
+        ).all()
+        
+        keys: Dict[SeriesKey, int] = {}
+        row_index = [keys.setdefault((user_id, category_id), len(keys)) for user_id, category_id, _, _ in rows]
+        matrix = resample_monthly(
+            row_index,
+            [day for _, _, day, _ in rows],
+            [float(total) for _, _, _, total in rows],
+            len(keys),
+            first_month,
+            month_number(end_month) - month_number(first_month)
+        )
+        return list(keys), matrix
+    
+    def store_forecasts(self, user_ids: Sequence[int], as_of: date, horizon: int) -> int:
+        """
+        Fit and persist forecasts for a shard of users; returns rows written.
+
+        One query reads the shard's monthly series and one multi-row INSERT
+        writes the results, replacing earlier forecasts made in ``as_of``'s
+        month so a shard can safely be processed again.
+        """
+        first_month, current_month = forecast_window(as_of, settings.FORECAST_HISTORY_MONTHS)
+        series_keys, series = self.monthly_series(user_ids, first_month, current_month)
+        fitted = forecast(series, horizon)
         
-        avg_monthly = self.db.query(func.avg(Transaction.amount)).filter(
-            Transaction.user_id == user_id,
-            Transaction.transaction_type == TransactionType.EXPENSE,
-            Transaction.date >= start_date,
-            Transaction.date <= end_date
-        ).scalar() or Decimal("0.00")
+        months = [month_start(month_number(current_month) + step) for step in range(horizon)]
+        mappings = [
+            {
+                "user_id": user_id,
+                "category_id": category_id,
+                "as_of": current_month,
+                "month": month,
+                "forecasted_amount": Decimal(str(round(float(amount), 2)))
+            }
+            for (user_id, category_id), row in zip(series_keys, fitted)
+            for month, amount in zip(months, row)
+        ]
         
-        forecasts = []
-        for i in range(months):
-            forecast_date = end_date + timedelta(days=30 * (i + 1))
-            forecasts.append({
-                "month": forecast_date.strftime("%Y-%m"),
-                "forecasted_amount": float(avg_monthly)
-            })
+        self.db.execute(
+            delete(Forecast).where(
+                Forecast.user_id.in_(user_ids),
+                Forecast.as_of == current_month
+            )
+        )
+        if mappings:
+            self.db.execute(insert(Forecast), mappings)
+        self.db.commit()
+        return len(mappings)
+    
+    def discard_stored(self, user_id: int, changed_days: Optional[Iterable[date]] = None) -> None:
+        """
+        Drop a user's precomputed forecasts once their history changed.
+
+        Forecasts are fitted on complete months only, so changes dated in the
+        current month (the common case) leave them valid. Runs inside the
+        caller's transaction.
+        """
+        current_month = month_start(month_number(date.today()))
+        if changed_days is not None and all(day >= current_month for day in changed_days):
+            return
+        self.db.execute(delete(Forecast).where(Forecast.user_id == user_id))
+    
+    def _stored(
+        self,
+        user_id: int,
+        current_month: date,
+        months: int
+    ) -> Optional[Tuple[List[Optional[int]], np.ndarray]]:
+        """Category ids and forecast matrix written by the batch job, if it covers the request."""
+        last_month = month_start(month_number(current_month) + months - 1)
+        rows = self.db.query(
+            Forecast.category_id,
+            Forecast.month,
+            Forecast.forecasted_amount
+        ).filter(
+            Forecast.user_id == user_id,
+            Forecast.as_of == current_month,
+            Forecast.month <= last_month
+        ).all()
+        
+        if not rows or max(month for _, month, _ in rows) < last_month:
+            return None
         
-        return forecasts
+        keys: Dict[Optional[int], int] = {}
+        row_index = [keys.setdefault(category_id, len(keys)) for category_id, _, _ in rows]
+        matrix = resample_monthly(
+            row_index,
+            [month for _, month, _ in rows],
+            [float(amount) for _, _, amount in rows],
+            len(keys),
+            current_month,
+            months
+        )
+        return list(keys), matrix
+    
+    def _fitted(self, user_id: int, months: int) -> Tuple[List[str], List[Optional[int]], np.ndarray]:
+        """
+        Month labels, category ids and forecast matrix for a user.
 
+        Forecasts precomputed by the batch job are used when present; other
+        users are fitted inline. Either way the result is memoized until the
+        user's data changes (any committed write bumps the data version) or
+        the month rolls over.
+        """
+        today = date.today()
+        key = ("forecast", user_id, get_user_version(user_id), month_number(today), months)
+        fitted = forecast_cache.get(key)
+        cache_lookup("forecast", fitted is not MISSING)
+        if fitted is not MISSING:
+            return fitted
+        
+        first_month, current_month = forecast_window(today, settings.FORECAST_HISTORY_MONTHS)
+        labels = [
+            month_start(month_number(current_month) + step).strftime("%Y-%m")
+            for step in range(months)
+        ]
+        
+        stored = self._stored(user_id, current_month, months)
+        if stored is not None:
+            fitted = (labels, *stored)
+        else:
+            series_keys, series = self.monthly_series([user_id], first_month, current_month)
+            fitted = (labels, [category_id for _, category_id in series_keys], forecast(series, months))
+        forecast_cache.set(key, fitted)
+        return fitted
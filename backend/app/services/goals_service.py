@@ -1,12 +1,19 @@
 """
 Goals service for business logic.
 """
-from typing import List, Optional
+from typing import List, Optional, Sequence, Tuple
 from datetime import date, datetime
 from decimal import Decimal
 from sqlalchemy.orm import Session
+from app.core.pagination import paginate_keyset
+from app.core.response_cache import bump_user_version
+from app.core.serialization import schema_columns
 from app.models.goal import Goal, GoalStatus
-from app.schemas.goal import GoalCreate, GoalUpdate, GoalWithProgress
+from app.schemas.goal import GoalCreate, GoalUpdate, GoalWithProgress, Goal as GoalSchema
+
+
+# Columns of the list response schema, for row-based list queries
+GOAL_COLUMNS = schema_columns(Goal, GoalSchema)
 
 
 class GoalsService:
@@ -15,11 +22,35 @@ class GoalsService:
     def __init__(self, db: Session):
         self.db = db
     
-    def get_user_goals(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Goal]:
-        """Get all goals for a user."""
-        return self.db.query(Goal).filter(
+    def get_user_goals(
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        columns: Optional[Sequence] = None
+    ) -> List[Goal]:
+        """Get all goals for a user (rows of ``columns`` only, when given)."""
+        query = self.db.query(Goal).filter(
             Goal.user_id == user_id
-        ).offset(skip).limit(limit).all()
+        )
+        if columns:
+            query = query.with_entities(*columns)
+        return query.offset(skip).limit(limit).all()
+    
+    def get_user_goals_page(
+        self,
+        user_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        columns: Optional[Sequence] = None
+    ) -> Tuple[List[Goal], Optional[str]]:
+        """Get a page of goals keyed on id, with the cursor for the next page."""
+        query = self.db.query(Goal).filter(
+            Goal.user_id == user_id
+        )
+        if columns:
+            query = query.with_entities(*columns)
+        return paginate_keyset(query, [Goal.id], cursor, limit)
     
     def get_goal(self, goal_id: int, user_id: int) -> Optional[Goal]:
         """Get a specific goal by ID."""
@@ -63,6 +94,7 @@ class GoalsService:
         )
         self.db.add(db_goal)
         self.db.commit()
+        bump_user_version(user_id)
         self.db.refresh(db_goal)
         return db_goal
     
@@ -86,6 +118,7 @@ class GoalsService:
             goal.status = GoalStatus.COMPLETED
         
         self.db.commit()
+        bump_user_version(user_id)
         self.db.refresh(goal)
         return goal
     
@@ -97,5 +130,6 @@ class GoalsService:
         
         self.db.delete(goal)
         self.db.commit()
+        bump_user_version(user_id)
         return True
 
@@ -0,0 +1,153 @@
+"""
+Insights service for spending anomalies.
+"""
+from typing import Dict, Optional
+from collections import defaultdict
+from datetime import date
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, or_
+from app.core.config import settings
+from app.core.forecasting import month_number, month_start
+from app.core.statistics import RunningStats
+from app.models.category_month_stat import CategoryMonthStat
+from app.models.transaction import Transaction, TransactionType
+from app.services.category_stats_service import month_filters
+
+# Stats columns read for anomaly detection
+STATS_COLUMNS = (
+    CategoryMonthStat.category_id,
+    CategoryMonthStat.month,
+    CategoryMonthStat.total,
+    CategoryMonthStat.count,
+    CategoryMonthStat.mean,
+    CategoryMonthStat.m2,
+    CategoryMonthStat.max_amount,
+)
+
+
+class InsightsService:
+    """Service for insights derived from the monthly category statistics."""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def get_anomalies(
+        self,
+        user_id: int,
+        month: Optional[date] = None,
+        threshold: Optional[float] = None,
+        history_months: Optional[int] = None
+    ) -> Dict:
+        """
+        Flag spending more than ``threshold`` standard deviations above the norm.
+
+        The norm comes from the ``history_months`` months before ``month``
+        (default: the current month), all read with one indexed lookup of
+        ``category_month_stats``:
+
+        - a category is flagged when its month total is unusually high
+          compared to its monthly totals since it first appeared (months
+          without spending count as zero);
+        - a transaction is flagged when its amount is unusually high for
+          its category. Only categories whose largest expense this month
+          exceeds the limit cost a second, indexed query.
+
+        Categories with too little history or no variation are skipped.
+        """
+        threshold = settings.ANOMALY_THRESHOLD if threshold is None else threshold
+        history_months = history_months or settings.ANOMALY_HISTORY_MONTHS
+        target_number = month_number(month or date.today())
+        target = month_start(target_number)
+        
+        rows = self.db.query(*STATS_COLUMNS).filter(
+            CategoryMonthStat.user_id == user_id,
+            CategoryMonthStat.month >= month_start(target_number - history_months),
+            CategoryMonthStat.month <= target
+        ).all()
+        
+        current = {}
+        history = defaultdict(list)
+        for row in rows:
+            if row.month == target:
+                current[row.category_id] = row
+            else:
+                history[row.category_id].append(row)
+        
+        categories = []
+        limits = {}
+        for category_id, row in current.items():
+            past = history.get(category_id)
+            if not past:
+                continue
+            
+            # Monthly totals since the category first appeared, zero-filled
+            first_number = min(month_number(stat.month) for stat in past)
+            totals = {month_number(stat.month): float(stat.total) for stat in past}
+            if target_number - first_number >= settings.ANOMALY_MIN_HISTORY_MONTHS:
+                monthly = RunningStats.of(
+                    totals.get(number, 0.0) for number in range(first_number, target_number)
+                )
+                z_score = monthly.z_score(row.total)
+                if z_score is not None and z_score > threshold:
+                    categories.append({
+                        "category_id": category_id,
+                        "total": float(row.total),
+                        "count": row.count,
+                        "expected": round(monthly.mean, 2),
+                        "std_dev": round(monthly.std_dev, 2),
+                        "z_score": round(z_score, 2),
+                    })
+            
+            # Distribution of single expenses, merged from the monthly moments
+            amounts = RunningStats()
+            for stat in past:
+                amounts.merge(RunningStats(stat.count, stat.mean, stat.m2))
+            if amounts.count >= settings.ANOMALY_MIN_TRANSACTIONS and amounts.std_dev:
+                limit = amounts.mean + threshold * amounts.std_dev
+                if row.max_amount is not None and float(row.max_amount) > limit:
+                    limits[category_id] = (amounts, limit)
+        
+        transactions = []
+        if limits:
+            flagged = self.db.query(
+                Transaction.id,
+                Transaction.date,
+                Transaction.description,
+                Transaction.account_id,
+                Transaction.category_id,
+                Transaction.amount
+            ).filter(
+                Transaction.user_id == user_id,
+                Transaction.transaction_type == TransactionType.EXPENSE,
+                *month_filters(target),
+                or_(*[
+                    and_(
+                        Transaction.category_id.is_(None) if category_id is None
+                        else Transaction.category_id == category_id,
+                        Transaction.amount > limit
+                    )
+                    for category_id, (_, limit) in limits.items()
+                ])
+            ).order_by(Transaction.amount.desc()).all()
+            
+            for t in flagged:
+                amounts, _ = limits[t.category_id]
+                transactions.append({
+                    "id": t.id,
+                    "date": t.date.isoformat(),
+                    "description": t.description,
+                    "account_id": t.account_id,
+                    "category_id": t.category_id,
+                    "amount": float(t.amount),
+                    "expected": round(amounts.mean, 2),
+                    "std_dev": round(amounts.std_dev, 2),
+                    "z_score": round(amounts.z_score(t.amount), 2),
+                })
+        
+        categories.sort(key=lambda item: item["z_score"], reverse=True)
+        return {
+            "month": target.isoformat(),
+            "threshold": threshold,
+            "categories": categories,
+            "transactions": transactions,
+        }
@@ -1,15 +1,34 @@
 """
 Reports service for generating reports and dashboard data.
 """
-from typing import Dict, List, Optional
-from datetime import datetime, date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from collections import defaultdict
+from datetime import datetime, date
+import enum
 from decimal import Decimal
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, case, select
 from app.models.account import Account
 from app.models.transaction import Transaction, TransactionType
 from app.models.budget import Budget
 from app.models.goal import Goal, GoalStatus
+from app.models.daily_rollup import DailyRollup
+from app.services.rollup_service import Granularity, RollupService, bucket_start, next_bucket, rollup_day, utc_today
+
+
+class Breakdown(str, enum.Enum):
+    """Dimensions a trend report can be split by."""
+    CATEGORY = "category"
+    ACCOUNT = "account"
+
+
+BREAKDOWN_COLUMNS = {
+    Breakdown.CATEGORY: "category_id",
+    Breakdown.ACCOUNT: "account_id",
+}
+
+# Upper bound on the length of a zero-filled trend series
+MAX_TREND_BUCKETS = 5000
 
 
 class ReportsService:
@@ -19,56 +38,73 @@ class ReportsService:
         self.db = db
     
     def get_dashboard_summary(self, user_id: int) -> Dict:
-        """Get dashboard summary statistics."""
-        # Total balance across all accounts
-        total_balance = self.db.query(func.sum(Account.balance)).filter(
+        """
+        Get dashboard summary statistics.
+
+        All scalar figures come from one conditional-aggregation statement
+        (month totals read from the daily rollups) and the recent
+        transactions from a second one, so a dashboard load costs exactly two
+        round-trips.
+        """
+        month_start, next_month_start = self._current_month_bounds()
+        
+        # Account, budget and goal figures as uncorrelated scalar subqueries
+        total_balance = select(
+            func.coalesce(func.sum(Account.balance), 0)
+        ).where(
             Account.user_id == user_id,
             Account.is_active == True
-        ).scalar() or Decimal("0.00")
+        ).scalar_subquery()
         
-        # Current month income and expenses
-        today = date.today()
-        month_start = date(today.year, today.month, 1)
-        month_end = date(today.year, today.month + 1, 1) - timedelta(days=1)
-        
-        month_income = self.db.query(func.sum(Transaction.amount)).filter(
-            Transaction.user_id == user_id,
-            Transaction.transaction_type == TransactionType.INCOME,
-            func.date(Transaction.date) >= month_start,
-            func.date(Transaction.date) <= month_end
-        ).scalar() or Decimal("0.00")
-        
-        month_expenses = self.db.query(func.sum(Transaction.amount)).filter(
-            Transaction.user_id == user_id,
-            Transaction.transaction_type == TransactionType.EXPENSE,
-            func.date(Transaction.date) >= month_start,
-            func.date(Transaction.date) <= month_end
-        ).scalar() or Decimal("0.00")
-        
-        # Active budgets count
-        active_budgets = self.db.query(func.count(Budget.id)).filter(
+        active_budgets = select(func.count(Budget.id)).where(
             Budget.user_id == user_id,
             Budget.is_active == True
-        ).scalar() or 0
+        ).scalar_subquery()
         
-        # Active goals count
-        active_goals = self.db.query(func.count(Goal.id)).filter(
+        active_goals = select(func.count(Goal.id)).where(
             Goal.user_id == user_id,
             Goal.status == GoalStatus.ACTIVE
-        ).scalar() or 0
+        ).scalar_subquery()
+        
+        # Current month income and expenses from the daily rollups over a
+        # half-open day range
+        summary = self.db.execute(
+            select(
+                total_balance.label("total_balance"),
+                self._sum_for_type(TransactionType.INCOME).label("month_income"),
+                self._sum_for_type(TransactionType.EXPENSE).label("month_expenses"),
+                active_budgets.label("active_budgets"),
+                active_goals.label("active_goals"),
+            ).select_from(DailyRollup).where(
+                DailyRollup.user_id == user_id,
+                DailyRollup.day >= month_start,
+                DailyRollup.day < next_month_start
+            )
+        ).one()
         
-        # Recent transactions (last 5)
-        recent_transactions = self.db.query(Transaction).filter(
-            Transaction.user_id == user_id
-        ).order_by(Transaction.date.desc()).limit(5).all()
+        # Recent transactions (last 5), only the columns the dashboard shows
+        recent_transactions = self.db.execute(
+            select(
+                Transaction.id,
+                Transaction.amount,
+                Transaction.transaction_type,
+                Transaction.description,
+                Transaction.date
+            ).where(
+                Transaction.user_id == user_id
+            ).order_by(Transaction.date.desc()).limit(5)
+        ).all()
+        
+        month_income = Decimal(str(summary.month_income))
+        month_expenses = Decimal(str(summary.month_expenses))
         
         return {
-            "total_balance": float(total_balance),
+            "total_balance": float(summary.total_balance or 0),
             "month_income": float(month_income),
             "month_expenses": float(month_expenses),
             "month_net": float(month_income - month_expenses),
-            "active_budgets": active_budgets,
-            "active_goals": active_goals,
+            "active_budgets": summary.active_budgets or 0,
+            "active_goals": summary.active_goals or 0,
             "recent_transactions": [
                 {
                     "id": t.id,
@@ -81,6 +117,30 @@ class ReportsService:
             ]
         }
     
+    @staticmethod
+    def _current_month_bounds() -> Tuple[date, date]:
+        """Return the half-open ``[month_start, next_month_start)`` range for today (UTC)."""
+        today = utc_today()
+        month_start = date(today.year, today.month, 1)
+        if today.month == 12:
+            next_month_start = date(today.year + 1, 1, 1)
+        else:
+            next_month_start = date(today.year, today.month + 1, 1)
+        return month_start, next_month_start
+    
+    @staticmethod
+    def _sum_for_type(transaction_type: TransactionType):
+        """Conditional SUM of rolled-up amounts of a single type."""
+        return func.coalesce(
+            func.sum(
+                case(
+                    (DailyRollup.transaction_type == transaction_type, DailyRollup.total),
+                    else_=0
+                )
+            ),
+            0
+        )
+    
     def get_expenses_by_category(
         self,
         user_id: int,
@@ -88,60 +148,123 @@ class ReportsService:
         end_date: Optional[datetime] = None
     ) -> List[Dict]:
         """Get expense breakdown by category."""
-        query = self.db.query(
-            Transaction.category_id,
-            func.sum(Transaction.amount).label("total")
-        ).filter(
-            Transaction.user_id == user_id,
-            Transaction.transaction_type == TransactionType.EXPENSE
+        totals = RollupService(self.db).totals(
+            user_id,
+            ["category_id"],
+            start_date,
+            end_date,
+            transaction_type=TransactionType.EXPENSE
         )
         
-        if start_date:
-            query = query.filter(Transaction.date >= start_date)
-        if end_date:
-            query = query.filter(Transaction.date <= end_date)
-        
-        results = query.group_by(Transaction.category_id).all()
-        
         return [
             {
                 "category_id": cat_id,
                 "total": float(total)
             }
-            for cat_id, total in results
+            for (cat_id,), total in totals.items()
         ]
     
     def get_income_vs_expenses(
         self,
         user_id: int,
         start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None
+        end_date: Optional[datetime] = None,
+        granularity: Optional[Granularity] = None,
+        breakdown: Optional[Breakdown] = None
     ) -> Dict:
-        """Get income vs expenses trend."""
-        query_income = self.db.query(func.sum(Transaction.amount)).filter(
-            Transaction.user_id == user_id,
-            Transaction.transaction_type == TransactionType.INCOME
-        )
+        """
+        Get income vs expenses trend.
+
+        Without ``granularity`` this is the two totals for the range. With it,
+        ``series`` holds one entry per day/week/month/quarter bucket, gaps
+        filled with zeros, read from the daily rollups in one grouped query
+        (plus one for partial edge days). ``breakdown`` splits every entry
+        by category or account.
+        """
+        group_by = ["transaction_type"]
+        if breakdown:
+            group_by.append(BREAKDOWN_COLUMNS[breakdown])
         
-        query_expenses = self.db.query(func.sum(Transaction.amount)).filter(
-            Transaction.user_id == user_id,
-            Transaction.transaction_type == TransactionType.EXPENSE
+        totals = RollupService(self.db).totals(
+            user_id,
+            group_by,
+            start_date,
+            end_date,
+            granularity=granularity
         )
         
-        if start_date:
-            query_income = query_income.filter(Transaction.date >= start_date)
-            query_expenses = query_expenses.filter(Transaction.date >= start_date)
+        if not granularity:
+            return self._income_vs_expenses(totals, breakdown)
         
-        if end_date:
-            query_income = query_income.filter(Transaction.date <= end_date)
-            query_expenses = query_expenses.filter(Transaction.date <= end_date)
+        buckets: Dict[date, Dict[Tuple, Decimal]] = defaultdict(dict)
+        for (bucket, *group), total in totals.items():
+            buckets[bucket][tuple(group)] = total
         
-        total_income = query_income.scalar() or Decimal("0.00")
-        total_expenses = query_expenses.scalar() or Decimal("0.00")
+        series = []
+        for bucket in self._bucket_range(buckets, start_date, end_date, granularity):
+            entry = {"period": bucket.isoformat()}
+            entry.update(self._income_vs_expenses(buckets.get(bucket, {}), breakdown))
+            series.append(entry)
         
-        return {
+        return {"granularity": granularity.value, "series": series}
+    
+    @staticmethod
+    def _income_vs_expenses(totals: Dict[Tuple, Decimal], breakdown: Optional[Breakdown]) -> Dict:
+        """Income, expenses and net from totals keyed by ``(type, [breakdown id])``."""
+        income: Dict = defaultdict(Decimal)
+        expenses: Dict = defaultdict(Decimal)
+        for (transaction_type, *group), total in totals.items():
+            key = group[0] if breakdown else None
+            if transaction_type == TransactionType.INCOME:
+                income[key] += total
+            elif transaction_type == TransactionType.EXPENSE:
+                expenses[key] += total
+        
+        total_income = sum(income.values(), Decimal("0.00"))
+        total_expenses = sum(expenses.values(), Decimal("0.00"))
+        result = {
             "income": float(total_income),
             "expenses": float(total_expenses),
             "net": float(total_income - total_expenses)
         }
+        
+        if breakdown:
+            column = BREAKDOWN_COLUMNS[breakdown]
+            result["breakdown"] = [
+                {
+                    column: key,
+                    "income": float(income[key]),
+                    "expenses": float(expenses[key]),
+                    "net": float(income[key] - expenses[key])
+                }
+                for key in sorted(income.keys() | expenses.keys(), key=lambda k: (k is None, k))
+            ]
+        return result
+    
+    @staticmethod
+    def _bucket_range(
+        buckets: Dict[date, Any],
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+        granularity: Granularity
+    ) -> List[date]:
+        """
+        Every bucket from the range start (or first data) to its end (or last data).
 
+        Raises ValueError when the series would exceed MAX_TREND_BUCKETS.
+        """
+        first = bucket_start(rollup_day(start_date), granularity) if start_date else min(buckets, default=None)
+        last = bucket_start(rollup_day(end_date), granularity) if end_date else max(buckets, default=None)
+        first = first or last
+        last = last or first
+        if first is None:
+            return []
+        
+        result = []
+        bucket = first
+        while bucket <= last:
+            if len(result) == MAX_TREND_BUCKETS:
+                raise ValueError("Too many periods; use a coarser granularity or a shorter range")
+            result.append(bucket)
+            bucket = next_bucket(bucket, granularity)
+        return result
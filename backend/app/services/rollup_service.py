@@ -0,0 +1,376 @@
+"""
+Rollup service for maintaining and querying daily transaction rollups.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+import enum
+from sqlalchemy.orm import Session
+from sqlalchemy import Date, and_, case, cast, delete, func, insert, literal_column, or_, select
+from app.core.forecasting import month_number, month_start
+from app.db.upsert import upsert
+from app.models.daily_rollup import DailyRollup
+from app.models.transaction import Transaction, TransactionType
+
+# (user_id, day, category_id, account_id, transaction_type)
+RollupKey = Tuple[int, date, Optional[int], int, TransactionType]
+
+KEY_COLUMNS = ("user_id", "day", "category_id", "account_id", "transaction_type")
+
+SNAPSHOT_COLUMNS = ("user_id", "date", "category_id", "account_id", "transaction_type", "amount")
+
+# Unique index of the rollup keys that writes upsert against
+_KEY_INDEX = next(index for index in DailyRollup.__table__.indexes if index.name == "ix_daily_rollups_key")
+
+
+class Granularity(str, enum.Enum):
+    """Time bucket sizes for bucketed totals."""
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+    QUARTER = "quarter"
+
+
+def bucket_start(day: date, granularity: Granularity) -> date:
+    """First day of the bucket containing ``day`` (weeks start on Monday)."""
+    if isinstance(day, datetime):
+        day = day.date()
+    if granularity == Granularity.DAY:
+        return day
+    if granularity == Granularity.WEEK:
+        return day - timedelta(days=day.weekday())
+    if granularity == Granularity.MONTH:
+        return day.replace(day=1)
+    return date(day.year, (day.month - 1) // 3 * 3 + 1, 1)
+
+
+def next_bucket(bucket: date, granularity: Granularity) -> date:
+    """First day of the bucket following ``bucket``."""
+    if granularity == Granularity.DAY:
+        return bucket + timedelta(days=1)
+    if granularity == Granularity.WEEK:
+        return bucket + timedelta(days=7)
+    months = 1 if granularity == Granularity.MONTH else 3
+    return month_start(month_number(bucket) + months)
+
+
+def rollup_day(value: datetime) -> date:
+    """UTC day a transaction timestamp is rolled up into."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+def rollup_day_column(column, dialect: str):
+    """``rollup_day`` of a timestamp column, in SQL."""
+    if dialect == "postgresql":
+        # Inlined so that GROUP BY repeats the selected expression exactly
+        return cast(func.timezone(literal_column("'UTC'"), column), Date)
+    # Other databases store the UTC time (see UTCDateTime)
+    return func.date(column, type_=Date)
+
+
+def utc_today() -> date:
+    """The UTC day, which new transactions are rolled up into."""
+    return datetime.now(timezone.utc).date()
+
+
+def rollup_key(transaction: Any) -> RollupKey:
+    """Rollup key of a transaction object or a dict of its column values."""
+    return (
+        _field(transaction, "user_id"),
+        rollup_day(_field(transaction, "date")),
+        _field(transaction, "category_id"),
+        _field(transaction, "account_id"),
+        TransactionType(_field(transaction, "transaction_type")),
+    )
+
+
+def rollup_amount(transaction: Any) -> Decimal:
+    """Amount of a transaction object or a dict of its column values."""
+    return Decimal(str(_field(transaction, "amount")))
+
+
+def rollup_snapshot(transaction: Transaction) -> Dict[str, Any]:
+    """Copy of the columns a rollup depends on, taken before an update."""
+    return {name: getattr(transaction, name) for name in SNAPSHOT_COLUMNS}
+
+
+def lock_order(key: Tuple) -> Tuple:
+    """
+    Sort key of a rollup (or stats) key, NULL categories first.
+
+    Writes apply their derived-table changes in this order so that two
+    writes locking the same rows lock them in the same order.
+    """
+    return tuple((value is not None, value or 0) for value in key)
+
+
+def _field(transaction: Any, name: str) -> Any:
+    """Read a column value from a transaction object or dict."""
+    if isinstance(transaction, dict):
+        return transaction.get(name)
+    return getattr(transaction, name)
+
+
+class RollupDeltas(dict):
+    """Net ``[amount, count]`` changes per rollup key, accumulated before writing."""
+    
+    def add(self, transaction: Any, sign: int = 1) -> None:
+        """Accumulate a transaction's contribution with the given sign."""
+        delta = self.setdefault(rollup_key(transaction), [Decimal("0"), 0])
+        delta[0] += rollup_amount(transaction) * sign
+        delta[1] += sign
+
+
+class RollupService:
+    """Service for the ``daily_rollups`` table."""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def record(self, transaction: Any, sign: int = 1) -> RollupDeltas:
+        """Add (``sign=1``) or remove (``sign=-1``) a transaction's contribution; returns the deltas."""
+        deltas = RollupDeltas()
+        deltas.add(transaction, sign)
+        self.apply(deltas)
+        return deltas
+    
+    def record_change(self, before: Dict[str, Any], after: Any) -> RollupDeltas:
+        """Move a transaction's contribution from its old values to its new ones; returns the deltas."""
+        deltas = RollupDeltas()
+        deltas.add(before, sign=-1)
+        deltas.add(after)
+        self.apply(deltas)
+        return deltas
+    
+    def apply(self, deltas: "RollupDeltas") -> None:
+        """
+        Apply accumulated deltas with one upsert per ``UPSERT_BATCH_SIZE``
+        keys in ``lock_order``, then prune the rows a removal emptied.
+        """
+        rows = [
+            {**dict(zip(KEY_COLUMNS, key)), "total": amount, "count": count}
+            for key, (amount, count) in sorted(deltas.items(), key=lambda item: lock_order(item[0]))
+            if amount or count
+        ]
+        if not rows:
+            return
+        
+        removes = any(row["count"] < 0 for row in rows)
+        written = upsert(
+            self.db,
+            _KEY_INDEX,
+            rows,
+            lambda excluded: {
+                "total": DailyRollup.total + excluded.total,
+                "count": DailyRollup.count + excluded.count,
+            },
+            returning=(DailyRollup.id, DailyRollup.count) if removes else ()
+        )
+        emptied = [row_id for row_id, count in written if count <= 0]
+        if emptied:
+            self.db.execute(delete(DailyRollup).where(DailyRollup.id.in_(emptied)))
+    
+    def totals(
+        self,
+        user_id: int,
+        group_by: Sequence[str],
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        transaction_type: Optional[TransactionType] = None,
+        granularity: Optional[Granularity] = None
+    ) -> Dict[Tuple, Decimal]:
+        """
+        Sum transaction amounts grouped by the named columns.
+
+        The range is ``[start_date, end_date]`` like the raw report filters.
+        Whole days are read from the rollups; only partial days at either
+        edge fall back to raw transaction rows. With ``granularity`` every
+        key starts with the first day of its time bucket.
+        """
+        first_day, end_day, raw_ranges = _split_range(start_date, end_date)
+        totals: Dict[Tuple, Decimal] = defaultdict(Decimal)
+        
+        if first_day is None or end_day is None or first_day < end_day:
+            columns = [getattr(DailyRollup, name) for name in group_by]
+            if granularity:
+                columns.insert(0, self._bucket_column(granularity).label("bucket"))
+            query = self.db.query(*columns, func.sum(DailyRollup.total)).filter(
+                DailyRollup.user_id == user_id
+            )
+            if transaction_type:
+                query = query.filter(DailyRollup.transaction_type == transaction_type)
+            if first_day:
+                query = query.filter(DailyRollup.day >= first_day)
+            if end_day:
+                query = query.filter(DailyRollup.day < end_day)
+            
+            for *group, total in query.group_by(*columns):
+                if granularity:
+                    group[0] = bucket_start(group[0], granularity)
+                totals[tuple(group)] += Decimal(str(total))
+        
+        if raw_ranges:
+            range_filters = [
+                and_(
+                    Transaction.date >= low,
+                    Transaction.date <= high if inclusive else Transaction.date < high
+                )
+                for low, high, inclusive in raw_ranges
+            ]
+            columns = [getattr(Transaction, name) for name in group_by]
+            if granularity:
+                # Each edge range lies within one day, so tag rows with its index
+                columns.insert(0, case(
+                    *[(condition, index) for index, condition in enumerate(range_filters)]
+                ).label("edge"))
+            query = self.db.query(*columns, func.sum(Transaction.amount)).filter(
+                Transaction.user_id == user_id,
+                or_(*range_filters)
+            )
+            if transaction_type:
+                query = query.filter(Transaction.transaction_type == transaction_type)
+            
+            for *group, total in query.group_by(*columns):
+                if granularity:
+                    group[0] = bucket_start(raw_ranges[group[0]][0].date(), granularity)
+                totals[tuple(group)] += Decimal(str(total))
+        
+        return dict(totals)
+    
+    def rebuild(self, user_id: Optional[int] = None) -> int:
+        """Recompute rollups from raw transactions; returns the row count written."""
+        self.db.execute(self._scoped(delete(DailyRollup), DailyRollup, user_id))
+        
+        aggregate = self._scoped(self._raw_aggregate(), Transaction, user_id)
+        result = self.db.execute(
+            insert(DailyRollup).from_select(
+                [*KEY_COLUMNS, "total", "count"],
+                aggregate
+            )
+        )
+        self.db.commit()
+        return result.rowcount
+    
+    def find_inconsistencies(self, user_id: Optional[int] = None) -> List[Dict]:
+        """Compare rollups against raw transactions and list mismatching keys."""
+        expected = {
+            tuple(row[:5]): (Decimal(str(row[5])), row[6])
+            for row in self.db.execute(
+                self._scoped(self._raw_aggregate(), Transaction, user_id)
+            )
+        }
+        actual = {
+            tuple(row[:5]): (Decimal(str(row[5])), row[6])
+            for row in self.db.execute(
+                self._scoped(
+                    select(*[getattr(DailyRollup, name) for name in KEY_COLUMNS],
+                           DailyRollup.total, DailyRollup.count),
+                    DailyRollup,
+                    user_id
+                )
+            )
+        }
+        
+        mismatches = []
+        for key in expected.keys() | actual.keys():
+            want = expected.get(key, (Decimal("0"), 0))
+            have = actual.get(key, (Decimal("0"), 0))
+            if want != have:
+                mismatches.append({
+                    **dict(zip(KEY_COLUMNS, key)),
+                    "expected_total": want[0],
+                    "expected_count": want[1],
+                    "actual_total": have[0],
+                    "actual_count": have[1],
+                })
+        return mismatches
+    
+    def _raw_aggregate(self):
+        """Rollup rows computed directly from transactions."""
+        day = rollup_day_column(Transaction.date, self.db.get_bind().dialect.name)
+        return select(
+            Transaction.user_id,
+            day,
+            Transaction.category_id,
+            Transaction.account_id,
+            Transaction.transaction_type,
+            func.sum(Transaction.amount),
+            func.count(Transaction.id)
+        ).group_by(
+            Transaction.user_id,
+            day,
+            Transaction.category_id,
+            Transaction.account_id,
+            Transaction.transaction_type
+        )
+    
+    def _bucket_column(self, granularity: Granularity):
+        """
+        Rollup day truncated to its bucket in SQL where the dialect allows.
+
+        Other dialects (and quarters on SQLite) group by a finer unit that
+        ``bucket_start`` then folds into buckets, still in one query.
+        """
+        dialect = self.db.get_bind().dialect.name
+        if granularity == Granularity.DAY:
+            return DailyRollup.day
+        if dialect == "postgresql":
+            return cast(func.date_trunc(granularity.value, DailyRollup.day), Date)
+        if dialect == "sqlite":
+            if granularity == Granularity.WEEK:
+                return func.date(DailyRollup.day, "weekday 0", "-6 days", type_=Date)
+            return func.date(DailyRollup.day, "start of month", type_=Date)
+        return DailyRollup.day
+    
+    @staticmethod
+    def _scoped(statement, model, user_id: Optional[int]):
+        """Restrict a statement to one user when given."""
+        if user_id is None:
+            return statement
+        return statement.where(model.user_id == user_id)
+
+
+def _split_range(
+    start_date: Optional[datetime],
+    end_date: Optional[datetime]
+) -> Tuple[Optional[date], Optional[date], List[Tuple[datetime, datetime, bool]]]:
+    """
+    Split an inclusive datetime range into whole rollup days and raw edges.
+
+    Returns ``(first_day, end_day, raw_ranges)`` where whole days are
+    ``[first_day, end_day)`` (None meaning unbounded) and each raw range is
+    ``(low, high, high_inclusive)``.
+    """
+    if start_date is not None and start_date.tzinfo is not None:
+        start_date = start_date.astimezone(timezone.utc)
+    if end_date is not None and end_date.tzinfo is not None:
+        end_date = end_date.astimezone(timezone.utc)
+    
+    first_day = None
+    if start_date is not None:
+        first_day = start_date.date()
+        if start_date.time() != time.min:
+            first_day += timedelta(days=1)
+    
+    # The day containing an inclusive end bound is never complete
+    end_day = end_date.date() if end_date is not None else None
+    
+    if first_day is not None and end_day is not None and first_day >= end_day:
+        if start_date > end_date:
+            return first_day, first_day, []
+        return first_day, first_day, [(start_date, end_date, True)]
+    
+    raw_ranges = []
+    if start_date is not None and start_date.time() != time.min:
+        raw_ranges.append((start_date, _midnight(first_day, start_date), False))
+    if end_date is not None:
+        raw_ranges.append((_midnight(end_day, end_date), end_date, True))
+    return first_day, end_day, raw_ranges
+
+
+def _midnight(day: date, reference: datetime) -> datetime:
+    """Midnight of ``day`` in the timezone of ``reference``."""
+    return datetime.combine(day, time.min, tzinfo=reference.tzinfo)
@@ -0,0 +1,159 @@
+"""
+Spending service for set-based budget spending computation.
+
+Budgets recur: a monthly budget starting on the 15th covers the 15th to
+the 14th of each following month, and its spending is that of the current
+period only.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import calendar
+from datetime import date, timedelta
+from decimal import Decimal
+from sqlalchemy.orm import Session
+from sqlalchemy import Date, Integer, and_, case, func, literal, or_, select, union_all
+from app.core.forecasting import month_number, month_start
+from app.models.budget import Budget, BudgetPeriod
+from app.models.daily_rollup import DailyRollup
+from app.models.transaction import TransactionType
+
+# Length of the month-based budget periods
+PERIOD_MONTHS = {BudgetPeriod.MONTHLY: 1, BudgetPeriod.YEARLY: 12}
+
+# Budgets per spending query; SQLite allows 500 terms in a compound SELECT
+SPENDING_CHUNK_SIZE = 200
+
+
+def add_months(day: date, months: int) -> date:
+    """The same day ``months`` later, clamped to the end of shorter months."""
+    first = month_start(month_number(day) + months)
+    return first.replace(day=min(day.day, calendar.monthrange(first.year, first.month)[1]))
+
+
+def period_start(start_date: date, period: BudgetPeriod, index: int) -> date:
+    """First day of the ``index``-th period of a budget starting on ``start_date``."""
+    if period == BudgetPeriod.WEEKLY:
+        return start_date + timedelta(weeks=index)
+    return add_months(start_date, index * PERIOD_MONTHS[period])
+
+
+def period_index(start_date: date, period: BudgetPeriod, day: date) -> int:
+    """Index of the budget period containing ``day`` (0 for days before the start)."""
+    if day <= start_date:
+        return 0
+    if period == BudgetPeriod.WEEKLY:
+        return (day - start_date).days // 7
+    index = (month_number(day) - month_number(start_date)) // PERIOD_MONTHS[period]
+    if period_start(start_date, period, index) > day:
+        index -= 1
+    return index
+
+
+def period_window(budget: Any, index: int) -> Tuple[date, date]:
+    """First and last (inclusive) day of a budget's ``index``-th period."""
+    first_day = period_start(budget.start_date, budget.period, index)
+    last_day = period_start(budget.start_date, budget.period, index + 1) - timedelta(days=1)
+    if budget.end_date and budget.end_date < last_day:
+        last_day = budget.end_date
+    return first_day, last_day
+
+
+class SpendingService:
+    """Service computing spent amounts for many budgets at once."""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def get_spending(self, budgets: Sequence[Budget]) -> Dict[int, Decimal]:
+        """
+        Get the spent amount for each budget, keyed by budget id.
+
+        The budgets' current periods become a derived table that is joined
+        to the daily rollups and grouped by budget, so every
+        SPENDING_CHUNK_SIZE budgets cost one round-trip and each sum only
+        touches one row per day of the current period.
+        """
+        spending = {budget.id: Decimal("0") for budget in budgets}
+        for offset in range(0, len(budgets), SPENDING_CHUNK_SIZE):
+            spending.update(self._chunk_spending(budgets[offset:offset + SPENDING_CHUNK_SIZE]))
+        return spending
+    
+    def get_period_spending(self, budget: Budget, day: Optional[date] = None) -> List[Tuple[date, date, Decimal]]:
+        """
+        Spent amount of every period of a budget up to the one containing ``day``.
+
+        Returns ``(first_day, last_day, spent)`` per period, oldest first.
+        The daily rollups are grouped by period in one query, each row
+        tagged with its period index by comparing the day against the period
+        starts.
+        """
+        last_index = period_index(budget.start_date, budget.period, self._current_day(budget, day))
+        windows = [period_window(budget, index) for index in range(last_index + 1)]
+        
+        index_column = case(
+            *[(DailyRollup.day >= first_day, index) for index, (first_day, _) in reversed(list(enumerate(windows)))],
+            else_=0
+        ).label("period")
+        query = select(index_column, func.sum(DailyRollup.total)).where(
+            DailyRollup.user_id == budget.user_id,
+            DailyRollup.transaction_type == TransactionType.EXPENSE,
+            DailyRollup.day >= windows[0][0],
+            DailyRollup.day <= windows[-1][1]
+        )
+        if budget.category_id:
+            query = query.where(DailyRollup.category_id == budget.category_id)
+        
+        spending = {index: Decimal(str(total)) for index, total in self.db.execute(query.group_by(index_column))}
+        return [
+            (first_day, last_day, spending.get(index, Decimal("0")))
+            for index, (first_day, last_day) in enumerate(windows)
+        ]
+    
+    @staticmethod
+    def budget_days(budget: Any, day: Optional[date] = None) -> Tuple[date, date]:
+        """
+        Return the first and last (inclusive) day of a budget's current period.
+
+        Periods repeat every week, month or year from ``start_date``; the
+        current one contains ``day`` (default today), clamped to the budget's
+        start and end dates.
+        """
+        day = SpendingService._current_day(budget, day)
+        return period_window(budget, period_index(budget.start_date, budget.period, day))
+    
+    @staticmethod
+    def _current_day(budget: Any, day: Optional[date] = None) -> date:
+        """``day`` (default today), no later than the budget's end date."""
+        day = day or date.today()
+        if budget.end_date and budget.end_date < day:
+            return budget.end_date
+        return day
+    
+    def _chunk_spending(self, budgets: Sequence[Budget]) -> Dict[int, Decimal]:
+        """Spent amounts of the budgets with any spending, in one grouped join."""
+        windows = []
+        for budget in budgets:
+            first_day, last_day = self.budget_days(budget)
+            windows.append(select(
+                literal(budget.id, Integer).label("budget_id"),
+                literal(budget.user_id, Integer).label("user_id"),
+                literal(budget.category_id, Integer).label("category_id"),
+                literal(first_day, Date).label("first_day"),
+                literal(last_day, Date).label("last_day")
+            ))
+        window = union_all(*windows).subquery("budget_windows")
+        
+        query = select(
+            window.c.budget_id,
+            func.sum(DailyRollup.total)
+        ).select_from(window).join(
+            DailyRollup,
+            and_(
+                DailyRollup.user_id == window.c.user_id,
+                DailyRollup.transaction_type == TransactionType.EXPENSE,
+                DailyRollup.day >= window.c.first_day,
+                DailyRollup.day <= window.c.last_day,
+                or_(window.c.category_id.is_(None), DailyRollup.category_id == window.c.category_id)
+            )
+        ).group_by(window.c.budget_id)
+        
+        return {budget_id: Decimal(str(spent)) for budget_id, spent in self.db.execute(query)}
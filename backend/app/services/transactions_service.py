@@ -1,15 +1,57 @@
 """
 Transactions service for business logic.
 """
-from typing import List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 from datetime import datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from app.models.transaction import Transaction
+from itertools import islice
+from pydantic import ValidationError
+from sqlalchemy.orm import Session, Query
+from sqlalchemy import Row, and_, column, delete, func, insert, literal_column, or_, table, update
+from app.core.metrics import inc
+from app.core.pagination import paginate_keyset
+from app.core.response_cache import bump_user_version
+from app.core.serialization import schema_columns
+from app.db.search import FTS_TABLE
+from app.models.transaction import SEARCH_CONFIG, Transaction, TransactionType, search_document
 from app.models.account import Account
-from app.schemas.transaction import TransactionCreate, TransactionUpdate
+from app.schemas.transaction import (
+    Transaction as TransactionSchema,
+    TransactionCreate,
+    TransactionUpdate,
+    TransactionImportError,
+    TransactionImportResult,
+)
+from app.services.alerts_service import AlertsService
+from app.services.balance_history_service import BalanceHistoryService, balance_changes
+from app.services.categorization_service import CategorizationService, categorize_mapping
+from app.services.category_stats_service import CategoryStatsService, StatsDeltas
+from app.services.forecast_service import ForecastService
+from app.services.rollup_service import RollupDeltas, RollupService, rollup_day, rollup_snapshot
 from decimal import Decimal
 
+IMPORT_CHUNK_SIZE = 1000
+
+EXPORT_BATCH_SIZE = 1000
+
+# Columns written by exports, in order
+EXPORT_COLUMNS = (
+    Transaction.id,
+    Transaction.date,
+    Transaction.amount,
+    Transaction.transaction_type,
+    Transaction.account_id,
+    Transaction.category_id,
+    Transaction.description,
+    Transaction.notes,
+)
+
+
+# Columns of the list response schema, for row-based list queries
+TRANSACTION_COLUMNS = schema_columns(Transaction, TransactionSchema)
+
+# SQLite full-text table; ``rank`` is its BM25 score (lower is better)
+TRANSACTIONS_FTS = table(FTS_TABLE, column("rowid"), column("rank"))
+
 
 class TransactionsService:
     """Service for transaction operations."""
@@ -25,9 +67,87 @@ class TransactionsService:
         account_id: Optional[int] = None,
         category_id: Optional[int] = None,
         start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None
+        end_date: Optional[datetime] = None,
+        q: Optional[str] = None,
+        columns: Optional[Sequence] = None
     ) -> List[Transaction]:
-        """Get all transactions for a user with optional filters."""
+        """
+        Get all transactions for a user with optional filters.
+
+        With search text ``q`` only matching transactions are returned, best
+        matches first. With ``columns`` only those columns are selected and
+        rows returned.
+        """
+        query = self._filtered_query(user_id, account_id, category_id, start_date, end_date, q)
+        if columns:
+            query = query.with_entities(*columns)
+        if q:
+            query = query.order_by(*self._search_rank(q))
+        return query.order_by(Transaction.date.desc()).offset(skip).limit(limit).all()
+    
+    def get_user_transactions_page(
+        self,
+        user_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        account_id: Optional[int] = None,
+        category_id: Optional[int] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        q: Optional[str] = None,
+        columns: Optional[Sequence] = None
+    ) -> Tuple[List[Transaction], Optional[str]]:
+        """
+        Get a page of transactions newest first, keyed on ``(date, id)``.
+
+        Returns the transactions (rows of ``columns`` when given, which must
+        include date and id) and the cursor for the next page. Search
+        matches (``q``) keep the newest-first order so pages stay stable.
+        """
+        query = self._filtered_query(user_id, account_id, category_id, start_date, end_date, q)
+        if columns:
+            query = query.with_entities(*columns)
+        return paginate_keyset(
+            query,
+            [Transaction.date, Transaction.id],
+            cursor,
+            limit,
+            descending=True
+        )
+    
+    def iter_export_batches(
+        self,
+        user_id: int,
+        account_id: Optional[int] = None,
+        category_id: Optional[int] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        batch_size: int = EXPORT_BATCH_SIZE
+    ) -> Iterator[Sequence[Row]]:
+        """
+        Stream the user's filtered transactions, oldest first, in batches.
+
+        Rows hold EXPORT_COLUMNS only and are fetched with ``yield_per``
+        (a server-side cursor where the driver supports one), so memory
+        stays bounded by ``batch_size`` however long the history is.
+        """
+        query = self._filtered_query(
+            user_id, account_id, category_id, start_date, end_date
+        ).with_entities(*EXPORT_COLUMNS).order_by(Transaction.date, Transaction.id)
+        
+        result = self.db.execute(query.statement.execution_options(yield_per=batch_size))
+        yield from result.partitions()
+    
+    def _filtered_query(
+        self,
+        user_id: int,
+        account_id: Optional[int] = None,
+        category_id: Optional[int] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        q: Optional[str] = None
+    ) -> Query:
+        """Build the user transactions query with optional filters."""
         query = self.db.query(Transaction).filter(Transaction.user_id == user_id)
         
         if account_id:
@@ -38,8 +158,44 @@ class TransactionsService:
             query = query.filter(Transaction.date >= start_date)
         if end_date:
             query = query.filter(Transaction.date <= end_date)
+        if q:
+            query = self._search(query, q, user_id)
         
-        return query.order_by(Transaction.date.desc()).offset(skip).limit(limit).all()
+        return query
+    
+    def _search(self, query: Query, q: str, user_id: int) -> Query:
+        """
+        Restrict a transactions query to those matching search text ``q``.
+
+        PostgreSQL matches the weighted full-text index (web search syntax:
+        quoted phrases, ``or``, ``-word``) or a description substring through
+        the trigram index. SQLite matches every word as a prefix among the
+        user's rows of the FTS5 table. Other databases fall back to substring matching.
+        """
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            return query.filter(or_(
+                search_document(Transaction.description, Transaction.notes).op("@@")(_tsquery(q)),
+                Transaction.description.ilike(_like_pattern(q), escape="\\")
+            ))
+        if dialect == "sqlite":
+            return query.join(
+                TRANSACTIONS_FTS, TRANSACTIONS_FTS.c.rowid == Transaction.id
+            ).filter(literal_column(FTS_TABLE).op("MATCH")(_fts_match(q, user_id)))
+        pattern = _like_pattern(q)
+        return query.filter(or_(
+            Transaction.description.ilike(pattern, escape="\\"),
+            Transaction.notes.ilike(pattern, escape="\\")
+        ))
+    
+    def _search_rank(self, q: str) -> List:
+        """ORDER BY clauses putting the best ``_search`` matches first."""
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            return [func.ts_rank(search_document(Transaction.description, Transaction.notes), _tsquery(q)).desc()]
+        if dialect == "sqlite":
+            return [TRANSACTIONS_FTS.c.rank]
+        return []
     
     def get_transaction(self, transaction_id: int, user_id: int) -> Optional[Transaction]:
         """Get a specific transaction by ID."""
@@ -48,35 +204,51 @@ class TransactionsService:
             Transaction.user_id == user_id
         ).first()
     
+    def _get_for_write(self, transaction_id: int, user_id: int) -> Optional[Transaction]:
+        """
+        ``get_transaction`` for an update or delete, locking the row until
+        commit so that concurrent writes to one transaction apply one after
+        the other, each reverting the values the previous one left.
+
+        SQLite ignores FOR UPDATE; a no-op UPDATE of the row takes its
+        database-wide write lock before the read instead.
+        """
+        if self.db.get_bind().dialect.name == "sqlite":
+            self.db.execute(
+                update(Transaction)
+                .where(Transaction.id == transaction_id, Transaction.user_id == user_id)
+                .values(updated_at=Transaction.updated_at)
+            )
+        return self.db.query(Transaction).filter(
+            Transaction.id == transaction_id,
+            Transaction.user_id == user_id
+        ).with_for_update().first()
+    
     def create_transaction(
         self,
         transaction_data: TransactionCreate,
         user_id: int
     ) -> Transaction:
         """Create a new transaction and update account balance."""
-        # Verify account belongs to user
-        account = self.db.query(Account).filter(
-            Account.id == transaction_data.account_id,
-            Account.user_id == user_id
-        ).first()
-        
-        if not account:
-            raise ValueError("Account not found")
+        self._check_account(transaction_data.account_id, user_id)
         
+        # Uncategorized transactions get their category from the user's rules
+        mapping = transaction_data.model_dump()
+        categorize_mapping(CategorizationService(self.db).matcher(user_id), mapping)
         db_transaction = Transaction(
-            **transaction_data.model_dump(),
+            **mapping,
             user_id=user_id
         )
         
-        # Update account balance
-        amount = Decimal(str(transaction_data.amount))
-        if transaction_data.transaction_type.value == "income":
-            account.balance += amount
-        elif transaction_data.transaction_type.value == "expense":
-            account.balance -= amount
-        
         self.db.add(db_transaction)
+        deltas = RollupService(self.db).record(db_transaction)
+        CategoryStatsService(self.db).record(db_transaction)
+        AlertsService(self.db).record_spending(user_id, deltas)
+        ForecastService(self.db).discard_stored(user_id, [rollup_day(db_transaction.date)])
+        self._apply_balances(deltas)
         self.db.commit()
+        bump_user_version(user_id)
+        inc("transactions_created_total")
         self.db.refresh(db_transaction)
         return db_transaction
     
@@ -86,54 +258,206 @@ class TransactionsService:
         transaction_data: TransactionUpdate,
         user_id: int
     ) -> Optional[Transaction]:
-        """Update an existing transaction."""
-        transaction = self.get_transaction(transaction_id, user_id)
+        """
+        Update an existing transaction.
+
+        Raises ValueError when moving it to an account of another user.
+        """
+        transaction = self._get_for_write(transaction_id, user_id)
         if not transaction:
+            self.db.rollback()
             return None
         
-        # Handle balance updates if amount or type changes
-        old_amount = transaction.amount
-        old_type = transaction.transaction_type
-        
+        before = rollup_snapshot(transaction)
         update_data = transaction_data.model_dump(exclude_unset=True)
+        if update_data.get("account_id", transaction.account_id) != transaction.account_id:
+            self._check_account(update_data["account_id"], user_id)
         
         # Update transaction
         for field, value in update_data.items():
             setattr(transaction, field, value)
         
-        # Revert old transaction impact on balance
-        account = transaction.account
-        if old_type.value == "income":
-            account.balance -= Decimal(str(old_amount))
-        elif old_type.value == "expense":
-            account.balance += Decimal(str(old_amount))
-        
-        # Apply new transaction impact on balance
-        new_amount = Decimal(str(transaction.amount))
-        if transaction.transaction_type.value == "income":
-            account.balance += new_amount
-        elif transaction.transaction_type.value == "expense":
-            account.balance -= new_amount
-        
+        # The old values' balance effect is reverted along with their rollups
+        deltas = RollupService(self.db).record_change(before, transaction)
+        CategoryStatsService(self.db).record_change(before, transaction)
+        AlertsService(self.db).record_spending(user_id, deltas)
+        ForecastService(self.db).discard_stored(
+            user_id,
+            [rollup_day(before["date"]), rollup_day(transaction.date)]
+        )
+        self._apply_balances(deltas)
         self.db.commit()
+        bump_user_version(user_id)
         self.db.refresh(transaction)
         return transaction
     
     def delete_transaction(self, transaction_id: int, user_id: int) -> bool:
         """Delete a transaction and update account balance."""
-        transaction = self.get_transaction(transaction_id, user_id)
+        transaction = self._get_for_write(transaction_id, user_id)
         if not transaction:
+            self.db.rollback()
             return False
         
-        # Revert balance change
-        account = transaction.account
-        amount = Decimal(str(transaction.amount))
-        if transaction.transaction_type.value == "income":
-            account.balance -= amount
-        elif transaction.transaction_type.value == "expense":
-            account.balance += amount
-        
-        self.db.delete(transaction)
+        # Only the writer whose DELETE removed the row applies its effects
+        deleted = self.db.execute(delete(Transaction).where(Transaction.id == transaction.id))
+        if not deleted.rowcount:
+            self.db.rollback()
+            return False
+        deltas = RollupService(self.db).record(transaction, sign=-1)
+        CategoryStatsService(self.db).record(transaction, sign=-1)
+        AlertsService(self.db).record_spending(user_id, deltas)
+        ForecastService(self.db).discard_stored(user_id, [rollup_day(transaction.date)])
+        self._apply_balances(deltas)
         self.db.commit()
+        bump_user_version(user_id)
         return True
+    
+    def bulk_create_transactions(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        user_id: int,
+        chunk_size: int = IMPORT_CHUNK_SIZE
+    ) -> TransactionImportResult:
+        """
+        Import many transactions in one database transaction.
+
+        Rows are validated in chunks and each chunk is written with a single
+        multi-row INSERT. Balance changes are summed per account and applied
+        once per account, last. Uncategorized rows are categorized by the
+        user's rules. Invalid rows are skipped and reported by their 1-based
+        position in ``rows``.
+        """
+        account_ids = {
+            account_id for (account_id,) in self.db.query(Account.id).filter(
+                Account.user_id == user_id
+            )
+        }
+        
+        matcher = CategorizationService(self.db).matcher(user_id)
+        result = TransactionImportResult()
+        rollup_deltas = RollupDeltas()
+        stats_deltas = StatsDeltas()
+        numbered_rows = enumerate(rows, start=1)
+        
+        while True:
+            chunk = list(islice(numbered_rows, chunk_size))
+            if not chunk:
+                break
+            
+            mappings = []
+            for row_number, row in chunk:
+                if not isinstance(row, dict):
+                    result.errors.append(TransactionImportError(
+                        row=row_number,
+                        detail="Row must be an object"
+                    ))
+                    continue
+                
+                try:
+                    data = TransactionCreate.model_validate(_blank_to_none(row))
+                except ValidationError as exc:
+                    result.errors.append(TransactionImportError(
+                        row=row_number,
+                        detail=_format_validation_error(exc)
+                    ))
+                    continue
+                
+                if data.account_id not in account_ids:
+                    result.errors.append(TransactionImportError(
+                        row=row_number,
+                        detail="Account not found"
+                    ))
+                    continue
+                
+                mapping = {**data.model_dump(), "user_id": user_id}
+                categorize_mapping(matcher, mapping)
+                mappings.append(mapping)
+                rollup_deltas.add(mapping)
+                stats_deltas.add(mapping)
+            
+            if mappings:
+                self.db.execute(insert(Transaction), mappings)
+                result.imported += len(mappings)
+        
+        RollupService(self.db).apply(rollup_deltas)
+        CategoryStatsService(self.db).apply(stats_deltas)
+        AlertsService(self.db).record_spending(user_id, rollup_deltas)
+        ForecastService(self.db).discard_stored(user_id, [day for _, day, *_ in rollup_deltas])
+        self._apply_balances(rollup_deltas)
+        self.db.commit()
+        bump_user_version(user_id)
+        result.failed = len(result.errors)
+        inc("transactions_created_total", result.imported)
+        inc("transaction_imports_total")
+        inc("transaction_import_rows_total", result.imported, result="imported")
+        inc("transaction_import_rows_total", result.failed, result="failed")
+        return result
+    
+    def _check_account(self, account_id: int, user_id: int) -> None:
+        """Raise ValueError unless the account belongs to the user."""
+        if not self.db.query(Account.id).filter(
+            Account.id == account_id,
+            Account.user_id == user_id
+        ).first():
+            raise ValueError("Account not found")
+    
+    def _apply_balances(self, deltas: RollupDeltas) -> None:
+        """
+        Apply a write's net balance changes, then the balance snapshots.
+
+        Each account is changed by one atomic ``balance = balance + delta``
+        UPDATE, never read-modify-write, so concurrent writes cannot lose
+        updates. The UPDATE locks the account row until commit, so this runs
+        last: concurrent writes to one account only queue for this short
+        tail (which also serializes their snapshot changes).
+
+        Accounts are locked in id order. Every write path changes the derived
+        tables before this in one order (rollups, category statistics,
+        budgets, forecasts), each in key order, so writes sharing rows lock
+        them in the same order and cannot deadlock.
+        """
+        changes = balance_changes(deltas)
+        for account_id in sorted(changes):
+            delta = sum(changes[account_id].values(), Decimal("0"))
+            if delta:
+                self.db.execute(
+                    update(Account)
+                    .where(Account.id == account_id)
+                    .values(balance=Account.balance + delta)
+                )
+        BalanceHistoryService(self.db).record(deltas)
+
+
+def _tsquery(q: str):
+    """PostgreSQL tsquery for search text in web search syntax."""
+    return func.websearch_to_tsquery(SEARCH_CONFIG, q)
+
+
+def _fts_match(q: str, user_id: int) -> str:
+    """FTS5 query matching every word of ``q`` as a prefix in a user's descriptions and notes."""
+    words = [word for word in q.split() if any(char.isalnum() for char in word)]
+    phrases = " ".join('"' + word.replace('"', '""') + '"*' for word in words) or '""'
+    return f'user_id : "{user_id}" AND {{description notes}} : ({phrases})'
+
+
+def _like_pattern(q: str) -> str:
+    """LIKE pattern matching ``q`` anywhere, with wildcards escaped."""
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _blank_to_none(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Treat empty strings (e.g. empty CSV cells) as missing values."""
+    return {
+        key: (None if isinstance(value, str) and not value.strip() else value)
+        for key, value in row.items()
+        if key is not None
+    }
+
 
+def _format_validation_error(exc: ValidationError) -> str:
+    """Flatten a pydantic validation error into a one-line message."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+        for error in exc.errors()
+    )
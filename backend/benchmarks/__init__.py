@@ -0,0 +1,13 @@
+"""
+Benchmarks and load tests for the backend.
+
+- ``datagen``: deterministic synthetic users, accounts and transactions
+- ``services``: microbenchmarks of the service methods
+- ``http_load``: in-process load driver for the API endpoints
+- ``run`` / ``compare``: run the suites to a JSON result file and flag
+  regressions between two result files
+- ``balance_stress``: concurrent writes to one account
+
+Run from the backend directory against the database configured in
+``DATABASE_URL``, e.g. ``python -m benchmarks.run --output results.json``.
+"""
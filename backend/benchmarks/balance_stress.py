@@ -0,0 +1,269 @@
+"""
+Concurrency stress test for account balance updates.
+
+Fires thousands of transaction writes (creates, then a mix of updates and
+deletes of distinct transactions, then updates and deletes contending for
+the same few transactions) from parallel threads against one account
+through TransactionsService, then checks that nothing was lost:
+
+- the account balance equals its opening balance plus the signed amounts
+  of the transactions that remain;
+- the daily rollups match the raw transactions;
+- the balance snapshots match a rebuild from the raw transactions.
+
+Writes that fail (e.g. deadlocks or SQLite lock timeouts) roll back as a
+whole. Exits with 1 when any write failed, a check fails or the create
+throughput is below ``--min-throughput``. The user and account it creates are deleted
+afterwards unless ``--keep`` is given.
+
+Usage:
+    python -m benchmarks.balance_stress [--writers N] [--writes N] [--contended N]
+        [--min-throughput TX_PER_S] [--keep]
+"""
+import argparse
+import random
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Callable, Dict, List, Sequence
+from sqlalchemy import func
+from app.db.init_db import init_db
+from app.db.session import SessionLocal
+from app.models.account import Account, AccountType
+from app.models.account_balance_snapshot import AccountBalanceSnapshot
+from app.models.transaction import Transaction, TransactionType
+from app.models.user import User
+from app.schemas.transaction import TransactionCreate, TransactionUpdate
+from app.services.accounts_service import AccountsService
+from app.services.balance_history_service import running_balances
+from app.services.rollup_service import RollupService
+from app.services.transactions_service import TransactionsService
+
+OPENING_BALANCE = Decimal("10000.00")
+
+DEFAULT_WRITERS = 8
+DEFAULT_WRITES = 2000
+
+# Transactions the contended phase's writers all update and delete
+DEFAULT_CONTENDED = 20
+
+# Days back the transactions are spread over, so snapshots shift in place
+SPREAD_DAYS = 30
+
+
+def create_fixture() -> Dict[str, int]:
+    """A throwaway user with one account."""
+    db = SessionLocal()
+    try:
+        name = f"stress-{uuid.uuid4().hex[:12]}"
+        user = User(email=f"{name}@example.com", username=name, hashed_password="!")
+        db.add(user)
+        db.flush()
+        account = Account(
+            user_id=user.id,
+            name="Stress test",
+            account_type=AccountType.CHECKING,
+            balance=OPENING_BALANCE
+        )
+        db.add(account)
+        db.commit()
+        return {"user_id": user.id, "account_id": account.id}
+    finally:
+        db.close()
+
+
+def drop_fixture(fixture: Dict[str, int]) -> None:
+    """Delete the fixture's account (with its transactions) and user."""
+    db = SessionLocal()
+    try:
+        AccountsService(db).delete_account(fixture["account_id"], fixture["user_id"])
+        db.query(User).filter(User.id == fixture["user_id"]).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+def run_parallel(tasks: Sequence[Callable[[TransactionsService], object]], writers: int) -> Dict:
+    """Run write tasks on ``writers`` threads, each with its own session per task."""
+    failures: List[str] = []
+    
+    def run(task):
+        db = SessionLocal()
+        try:
+            return task(TransactionsService(db))
+        except Exception as exc:
+            db.rollback()
+            failures.append(f"{type(exc).__name__}: {exc}")
+            return None
+        finally:
+            db.close()
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=writers) as pool:
+        results = list(pool.map(run, tasks))
+    elapsed = time.perf_counter() - started
+    return {
+        "results": results,
+        "failures": failures,
+        "seconds": elapsed,
+        "throughput": len(tasks) / elapsed if elapsed else 0.0,
+    }
+
+
+def random_update(rng: random.Random) -> TransactionUpdate:
+    """A random new amount, type and date."""
+    return TransactionUpdate(
+        amount=Decimal(rng.randint(100, 50000)) / 100,
+        transaction_type=rng.choice([TransactionType.INCOME, TransactionType.EXPENSE]),
+        date=datetime.now(timezone.utc) - timedelta(days=rng.randint(0, SPREAD_DAYS), hours=rng.randint(0, 23))
+    )
+
+
+def random_create(rng: random.Random, fixture: Dict[str, int]) -> TransactionCreate:
+    """A random income or expense on the fixture account."""
+    return TransactionCreate(
+        account_id=fixture["account_id"],
+        amount=Decimal(rng.randint(100, 50000)) / 100,
+        transaction_type=rng.choice([TransactionType.INCOME, TransactionType.EXPENSE]),
+        description="stress",
+        date=datetime.now(timezone.utc) - timedelta(days=rng.randint(0, SPREAD_DAYS), hours=rng.randint(0, 23))
+    )
+
+
+def check(fixture: Dict[str, int]) -> List[str]:
+    """List the ways the account's balance data disagrees with its transactions."""
+    problems = []
+    db = SessionLocal()
+    try:
+        account_id = fixture["account_id"]
+        balance = db.query(Account.balance).filter(Account.id == account_id).scalar()
+        signed = db.query(
+            func.coalesce(func.sum(Transaction.amount), 0)
+        ).filter(
+            Transaction.account_id == account_id,
+            Transaction.transaction_type == TransactionType.INCOME
+        ).scalar() - db.query(
+            func.coalesce(func.sum(Transaction.amount), 0)
+        ).filter(
+            Transaction.account_id == account_id,
+            Transaction.transaction_type == TransactionType.EXPENSE
+        ).scalar()
+        expected = OPENING_BALANCE + Decimal(str(signed))
+        if Decimal(str(balance)) != expected:
+            problems.append(f"balance {balance} != expected {expected}")
+        
+        mismatches = RollupService(db).find_inconsistencies(fixture["user_id"])
+        if mismatches:
+            problems.append(f"{len(mismatches)} inconsistent rollup rows")
+        
+        stored = {
+            (str(day), Decimal(str(value)))
+            for day, value in db.query(AccountBalanceSnapshot.day, AccountBalanceSnapshot.balance).filter(
+                AccountBalanceSnapshot.account_id == account_id
+            )
+        }
+        computed = {
+            (str(row.day), Decimal(str(row.balance)).quantize(Decimal("0.01")))
+            for row in db.execute(running_balances([account_id], db.get_bind().dialect.name))
+        }
+        if stored != computed:
+            problems.append(f"{len(stored ^ computed)} balance snapshot rows differ from a rebuild")
+    finally:
+        db.close()
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Stress concurrent balance updates on one account.")
+    parser.add_argument("--writers", type=int, default=DEFAULT_WRITERS, help="Parallel writer threads")
+    parser.add_argument("--writes", type=int, default=DEFAULT_WRITES, help="Transactions to create")
+    parser.add_argument("--contended", type=int, default=DEFAULT_CONTENDED,
+                        help="Transactions every writer of the contended phase updates and deletes")
+    parser.add_argument("--min-throughput", type=float, default=0.0, help="Fail below this many creates/s")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep", action="store_true", help="Keep the generated user and account")
+    args = parser.parse_args()
+    
+    init_db()
+    rng = random.Random(args.seed)
+    fixture = create_fixture()
+    try:
+        creates = [random_create(rng, fixture) for _ in range(args.writes)]
+        created = run_parallel(
+            [lambda service, data=data: service.create_transaction(data, fixture["user_id"]).id for data in creates],
+            args.writers
+        )
+        ids = [transaction_id for transaction_id in created["results"] if transaction_id is not None]
+        
+        # Update one quarter and delete another, interleaved
+        rng.shuffle(ids)
+        quarter = len(ids) // 4
+        updates = [(transaction_id, random_update(rng)) for transaction_id in ids[:quarter]]
+        mixed = [
+            lambda service, transaction_id=transaction_id, data=data: service.update_transaction(
+                transaction_id, data, fixture["user_id"]
+            )
+            for transaction_id, data in updates
+        ] + [
+            lambda service, transaction_id=transaction_id: service.delete_transaction(
+                transaction_id, fixture["user_id"]
+            )
+            for transaction_id in ids[quarter:2 * quarter]
+        ]
+        rng.shuffle(mixed)
+        changed = run_parallel(mixed, args.writers)
+        
+        # Writers racing on the same rows: updates, and deletes of which
+        # only the first per transaction finds it
+        targets = ids[2 * quarter:2 * quarter + args.contended]
+        contended = [
+            (lambda service, transaction_id=transaction_id, data=random_update(rng): service.update_transaction(
+                transaction_id, data, fixture["user_id"]
+            ))
+            if rng.random() < 0.9 else
+            (lambda service, transaction_id=transaction_id: service.delete_transaction(
+                transaction_id, fixture["user_id"]
+            ))
+            for transaction_id in (rng.choice(targets) for _ in range(quarter if targets else 0))
+        ]
+        raced = run_parallel(contended, args.writers)
+        
+        print(
+            f"creates: {len(creates)} in {created['seconds']:.2f}s "
+            f"({created['throughput']:.0f}/s), {len(created['failures'])} failed"
+        )
+        print(
+            f"updates+deletes: {len(mixed)} in {changed['seconds']:.2f}s "
+            f"({changed['throughput']:.0f}/s), {len(changed['failures'])} failed"
+        )
+        print(
+            f"contended on {len(targets)}: {len(contended)} in {raced['seconds']:.2f}s "
+            f"({raced['throughput']:.0f}/s), {len(raced['failures'])} failed"
+        )
+        failures = created["failures"] + changed["failures"] + raced["failures"]
+        for failure in sorted(set(failures))[:5]:
+            print(f"  {failure}")
+        
+        problems = check(fixture)
+        failed = len(failures)
+        if failed:
+            problems.append(f"{failed} writes failed")
+        if created["throughput"] < args.min_throughput:
+            problems.append(
+                f"create throughput {created['throughput']:.0f}/s below {args.min_throughput:.0f}/s"
+            )
+        for problem in problems:
+            print(f"FAIL: {problem}")
+        if not problems:
+            print("OK: balance, rollups and snapshots consistent")
+        return 1 if problems else 0
+    finally:
+        if not args.keep:
+            drop_fixture(fixture)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Compare two benchmark result files and flag regressions.
+
+A benchmark regresses when its metric (median latency by default) grew by
+more than ``--threshold`` (a fraction) and by more than ``--min-delta-ms``,
+so sub-millisecond noise on fast calls is not reported. Exits with 1 when
+anything regressed, so it can gate CI. Statements of the plans suite whose
+indexes changed are listed too.
+
+Usage:
+    python -m benchmarks.compare BASELINE.json CURRENT.json [--threshold 0.2] [--metric median_ms]
+"""
+import argparse
+import sys
+from typing import Dict, List
+from benchmarks.results import read_results
+
+DEFAULT_THRESHOLD = 0.2
+DEFAULT_MIN_DELTA_MS = 0.5
+
+# Run settings that make results incomparable when they differ
+COMPARABLE_META = ("database", "database_async", "scale", "seed", "repeat", "requests", "concurrency", "warm_cache")
+
+
+def compare(
+    baseline: Dict,
+    current: Dict,
+    metric: str = "median_ms",
+    threshold: float = DEFAULT_THRESHOLD,
+    min_delta_ms: float = DEFAULT_MIN_DELTA_MS
+) -> List[Dict]:
+    """Benchmarks present in both runs with their change in ``metric``."""
+    rows = []
+    for suite, results in current["results"].items():
+        base_results = baseline["results"].get(suite, {})
+        for name, summary in results.items():
+            base = base_results.get(name, {}).get(metric)
+            value = summary.get(metric)
+            if base is None or value is None:
+                continue
+            change = (value - base) / base if base else 0.0
+            rows.append({
+                "name": f"{suite}/{name}",
+                "baseline": base,
+                "current": value,
+                "change": change,
+                "regressed": change > threshold and value - base > min_delta_ms,
+                "improved": change < -threshold and base - value > min_delta_ms,
+            })
+    return rows
+
+
+def plan_changes(baseline: Dict, current: Dict) -> List[str]:
+    """Captured statements whose plan reads different indexes than before."""
+    base_plans = baseline["results"].get("plans", {})
+    return [
+        f"plans/{name}: {', '.join(base_plans[name]['indexes']) or 'table scan'} -> "
+        f"{', '.join(summary['indexes']) or 'table scan'}"
+        for name, summary in current["results"].get("plans", {}).items()
+        if name in base_plans and base_plans[name].get("indexes") != summary.get("indexes")
+    ]
+
+
+def meta_differences(baseline: Dict, current: Dict) -> List[str]:
+    """Run settings that differ between the two files."""
+    return [
+        f"{key}: {baseline['meta'].get(key)} -> {current['meta'].get(key)}"
+        for key in COMPARABLE_META
+        if baseline["meta"].get(key) != current["meta"].get(key)
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--metric", default="median_ms", help="Summary field to compare, e.g. p95_ms")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed relative slowdown")
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS)
+    args = parser.parse_args()
+    
+    baseline = read_results(args.baseline)
+    current = read_results(args.current)
+    for difference in meta_differences(baseline, current):
+        print(f"warning: runs differ in {difference}")
+    print(f"{baseline['meta'].get('commit')} -> {current['meta'].get('commit')} ({args.metric})\n")
+    
+    rows = compare(baseline, current, args.metric, args.threshold, args.min_delta_ms)
+    for row in rows:
+        flag = "REGRESSED" if row["regressed"] else "improved" if row["improved"] else ""
+        print(
+            f"{row['name']:<65} {row['baseline']:>10.2f} {row['current']:>10.2f} "
+            f"{row['change']:>+8.1%}  {flag}"
+        )
+    
+    changes = plan_changes(baseline, current)
+    if changes:
+        print("\nPlan changes:")
+        for change in changes:
+            print(f"  {change}")
+    
+    regressed = [row for row in rows if row["regressed"]]
+    print(f"\n{len(regressed)} of {len(rows)} benchmarks regressed by more than {args.threshold:.0%}")
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
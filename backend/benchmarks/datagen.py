@@ -0,0 +1,347 @@
+"""
+Deterministic synthetic data for benchmarks.
+
+Generates users with accounts, budgets, goals, categorization rules and
+years of transactions shaped like real spending: a twice-monthly salary,
+rent, utilities, and everyday purchases at recurring merchants with
+log-normally distributed amounts. The same scale, seed and end date always
+produce the same rows. Transactions are inserted in bulk and the derived
+tables (daily rollups, category statistics, balance snapshots, budget
+running totals) are then rebuilt from them, as after a migration.
+
+Generated users are named ``bench-<seed>-<n>``; ``drop`` removes them with
+everything they own. Categories are shared and looked up by name, so they
+are created once and kept.
+
+Usage:
+    python -m benchmarks.datagen generate [--scale small] [--seed 1] [--end YYYY-MM-DD]
+    python -m benchmarks.datagen drop [--seed 1]
+"""
+import argparse
+import random
+import sys
+from calendar import monthrange
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+from app.db.init_db import init_db
+from app.db.rollups import rebuild
+from app.db.session import SessionLocal
+from app.models.account import Account, AccountType
+from app.models.account_balance_snapshot import AccountBalanceSnapshot
+from app.models.alert import Alert
+from app.models.budget import Budget, BudgetPeriod
+from app.models.categorization_rule import CategorizationRule
+from app.models.category import Category
+from app.models.category_month_stat import CategoryMonthStat
+from app.models.daily_rollup import DailyRollup
+from app.models.forecast import Forecast
+from app.models.goal import Goal, GoalStatus, GoalType
+from app.models.transaction import Transaction, TransactionType
+from app.models.user import User
+
+# Sizes per user; "transactions" is the number of everyday purchases a month
+SCALES = {
+    "tiny": {"users": 1, "accounts": 2, "years": 1, "transactions": 30, "budgets": 3, "goals": 2, "rules": 5},
+    "small": {"users": 3, "accounts": 3, "years": 2, "transactions": 80, "budgets": 5, "goals": 3, "rules": 20},
+    "medium": {"users": 10, "accounts": 4, "years": 3, "transactions": 150, "budgets": 8, "goals": 5, "rules": 50},
+    "large": {"users": 50, "accounts": 5, "years": 5, "transactions": 300, "budgets": 10, "goals": 8, "rules": 200},
+}
+
+DEFAULT_SCALE = "small"
+DEFAULT_SEED = 1
+
+# Everyday spending: category -> (merchants, typical amount, log-normal sigma, relative frequency)
+SPENDING_PROFILE = {
+    "Groceries": (("Whole Foods", "Trader Joe's", "Safeway", "Costco", "Aldi"), 65.0, 0.5, 10),
+    "Dining": (("Starbucks", "Chipotle", "Corner Bistro", "Pizza Palace", "Sushi Bar"), 24.0, 0.6, 12),
+    "Transport": (("Shell", "Chevron", "Uber", "Lyft", "Metro Card"), 32.0, 0.5, 8),
+    "Entertainment": (("Netflix", "Spotify", "AMC Theatres", "Steam", "Ticketmaster"), 22.0, 0.7, 4),
+    "Shopping": (("Amazon", "Target", "Best Buy", "IKEA", "Walmart"), 58.0, 0.9, 6),
+    "Health": (("CVS Pharmacy", "Walgreens", "Dental Care", "City Gym"), 45.0, 0.6, 2),
+    "Travel": (("Delta Air Lines", "Marriott", "Airbnb", "Hertz"), 320.0, 0.7, 1),
+}
+
+# Fixed monthly bills: category -> merchants
+BILLS = {
+    "Housing": ("Rent - Parkview Apartments",),
+    "Utilities": ("City Power & Light", "Water Utility", "Comcast Internet"),
+}
+
+INCOME_CATEGORY = "Salary"
+
+# Share of purchases left uncategorized, for the categorization rules to find
+UNCATEGORIZED_SHARE = 0.05
+
+INSERT_CHUNK_SIZE = 5000
+
+ACCOUNT_TYPES = (
+    AccountType.CHECKING,
+    AccountType.CREDIT_CARD,
+    AccountType.SAVINGS,
+    AccountType.INVESTMENT,
+    AccountType.OTHER,
+)
+
+
+def user_prefix(seed: int) -> str:
+    """Username prefix of the users generated with ``seed``."""
+    return f"bench-{seed}-"
+
+
+def ensure_categories(db: Session) -> Dict[str, int]:
+    """Ids of the generator's categories by name, creating missing ones."""
+    names = [*SPENDING_PROFILE, *BILLS, INCOME_CATEGORY]
+    existing = dict(db.execute(select(Category.name, Category.id).where(Category.name.in_(names))).all())
+    for name in names:
+        if name not in existing:
+            category = Category(name=name)
+            db.add(category)
+            db.flush()
+            existing[name] = category.id
+    return existing
+
+
+def _amount(rng: random.Random, typical: float, sigma: float) -> Decimal:
+    """A log-normal amount whose median is ``typical``, in cents."""
+    value = typical * rng.lognormvariate(0.0, sigma)
+    return Decimal(max(int(value * 100), 50)) / 100
+
+
+def _months(start: date, end: date):
+    """First days of the months from ``start`` to ``end``, inclusive."""
+    current = date(start.year, start.month, 1)
+    while current <= end:
+        yield current
+        current = date(current.year + current.month // 12, current.month % 12 + 1, 1)
+
+
+def _at(day: date, rng: random.Random) -> datetime:
+    """A random time of day on ``day``, in UTC."""
+    return datetime(day.year, day.month, day.day, rng.randint(7, 22), rng.randint(0, 59), tzinfo=timezone.utc)
+
+
+def generate_transactions(
+    rng: random.Random,
+    user_id: int,
+    account_ids: Sequence[int],
+    categories: Dict[str, int],
+    start: date,
+    end: date,
+    monthly: int
+) -> List[Dict]:
+    """One user's transactions from ``start`` to ``end`` as insert rows."""
+    checking = account_ids[0]
+    card = account_ids[1] if len(account_ids) > 1 else checking
+    salary = Decimal(rng.randint(2000, 5000))
+    rent = Decimal(rng.randint(800, 2400))
+    names = list(SPENDING_PROFILE)
+    weights = [SPENDING_PROFILE[name][3] for name in names]
+    rows = []
+    
+    def add(day, account_id, category, amount, transaction_type, description, notes=None):
+        if start <= day <= end:
+            rows.append({
+                "user_id": user_id,
+                "account_id": account_id,
+                "category_id": categories[category] if category else None,
+                "amount": amount,
+                "transaction_type": transaction_type,
+                "description": description,
+                "notes": notes,
+                "date": _at(day, rng),
+            })
+    
+    for first in _months(start, end):
+        days = monthrange(first.year, first.month)[1]
+        for payday in (1, 15):
+            add(first.replace(day=payday), checking, INCOME_CATEGORY, salary, TransactionType.INCOME, "Payroll - Acme Corp")
+        add(first, checking, "Housing", rent, TransactionType.EXPENSE, BILLS["Housing"][0])
+        for merchant in BILLS["Utilities"]:
+            add(
+                first.replace(day=rng.randint(5, 20)), checking, "Utilities",
+                _amount(rng, 80.0, 0.3), TransactionType.EXPENSE, merchant
+            )
+        if len(account_ids) > 2:
+            add(
+                first.replace(day=16), checking, None, (salary / 10).quantize(Decimal("0.01")),
+                TransactionType.TRANSFER, "Transfer to savings"
+            )
+        
+        # Everyday purchases vary by +-20% from month to month
+        for _ in range(int(monthly * rng.uniform(0.8, 1.2))):
+            category = rng.choices(names, weights)[0]
+            merchants, typical, sigma, _ = SPENDING_PROFILE[category]
+            merchant = rng.choice(merchants)
+            add(
+                first.replace(day=rng.randint(1, days)),
+                card if rng.random() < 0.6 else checking,
+                None if rng.random() < UNCATEGORIZED_SHARE else category,
+                _amount(rng, typical, sigma),
+                TransactionType.EXPENSE,
+                f"{merchant} #{rng.randint(100, 9999)}",
+                "reimbursable" if rng.random() < 0.02 else None
+            )
+    return rows
+
+
+def generate(
+    db: Session,
+    scale: str = DEFAULT_SCALE,
+    seed: int = DEFAULT_SEED,
+    end: Optional[date] = None
+) -> Dict:
+    """
+    Generate a dataset and commit it.
+
+    Returns the ids benchmarks need: ``users`` maps each user id to its
+    account, budget and goal ids; ``categories`` maps names to ids.
+    """
+    sizes = SCALES[scale]
+    end = end or date.today()
+    start = date(end.year - sizes["years"], end.month, 1)
+    rng = random.Random(seed)
+    categories = ensure_categories(db)
+    spending = list(SPENDING_PROFILE)
+    dataset = {"scale": scale, "seed": seed, "end": end.isoformat(), "categories": categories, "users": {}}
+    
+    for n in range(sizes["users"]):
+        name = f"{user_prefix(seed)}{n}"
+        user = User(email=f"{name}@example.com", username=name, full_name=f"Benchmark User {n}", hashed_password="!")
+        db.add(user)
+        db.flush()
+        
+        accounts = [
+            Account(
+                user_id=user.id,
+                name=f"{account_type.value.replace('_', ' ').title()} {i}",
+                account_type=account_type,
+                balance=Decimal(rng.randint(500, 20000))
+            )
+            for i, account_type in enumerate(ACCOUNT_TYPES[:sizes["accounts"]])
+        ]
+        db.add_all(accounts)
+        db.flush()
+        account_ids = [account.id for account in accounts]
+        
+        rows = generate_transactions(
+            rng, user.id, account_ids, categories, start, end, sizes["transactions"]
+        )
+        for i in range(0, len(rows), INSERT_CHUNK_SIZE):
+            db.execute(insert(Transaction), rows[i:i + INSERT_CHUNK_SIZE])
+        for account in accounts:
+            account.balance += sum(
+                row["amount"] if row["transaction_type"] == TransactionType.INCOME else -row["amount"]
+                for row in rows
+                if row["account_id"] == account.id and row["transaction_type"] != TransactionType.TRANSFER
+            )
+        
+        budgets = [
+            Budget(
+                user_id=user.id,
+                category_id=categories[spending[i % len(spending)]],
+                name=f"{spending[i % len(spending)]} budget",
+                amount=Decimal(rng.randint(100, 1500)),
+                period=BudgetPeriod.WEEKLY if i % 4 == 3 else BudgetPeriod.MONTHLY,
+                start_date=start
+            )
+            for i in range(sizes["budgets"])
+        ]
+        goals = [
+            Goal(
+                user_id=user.id,
+                name=f"Goal {i}",
+                goal_type=list(GoalType)[i % len(GoalType)],
+                target_amount=Decimal(rng.randint(1000, 50000)),
+                current_amount=Decimal(rng.randint(0, 1000)),
+                target_date=end + timedelta(days=rng.randint(90, 1500)),
+                status=GoalStatus.ACTIVE
+            )
+            for i in range(sizes["goals"])
+        ]
+        # Merchant rules first, then generated keywords that never match,
+        # so matching pays for a realistic number of rules
+        merchants = [
+            (merchant, category)
+            for category, (names, *_) in SPENDING_PROFILE.items()
+            for merchant in names
+        ]
+        rules = [
+            CategorizationRule(
+                user_id=user.id,
+                category_id=categories[category],
+                pattern=merchant,
+                priority=1
+            )
+            for merchant, category in merchants[:sizes["rules"]]
+        ] + [
+            CategorizationRule(
+                user_id=user.id,
+                category_id=categories[rng.choice(spending)],
+                pattern=f"merchant-{i}"
+            )
+            for i in range(sizes["rules"] - len(merchants))
+        ]
+        db.add_all(budgets + goals + rules)
+        db.commit()
+        
+        dataset["users"][user.id] = {
+            "accounts": account_ids,
+            "budgets": [budget.id for budget in budgets],
+            "goals": [goal.id for goal in goals],
+            "transactions": len(rows),
+        }
+    
+    for user_id in dataset["users"]:
+        rebuild(user_id)
+    return dataset
+
+
+def drop(db: Session, seed: int = DEFAULT_SEED) -> int:
+    """Delete the users generated with ``seed`` and everything they own."""
+    user_ids = db.execute(
+        select(User.id).where(User.username.startswith(user_prefix(seed), autoescape=True))
+    ).scalars().all()
+    if not user_ids:
+        return 0
+    
+    account_ids = select(Account.id).where(Account.user_id.in_(user_ids))
+    db.execute(delete(AccountBalanceSnapshot).where(AccountBalanceSnapshot.account_id.in_(account_ids)))
+    for model in (
+        Alert, CategorizationRule, Budget, Goal, Transaction,
+        DailyRollup, CategoryMonthStat, Forecast, Account
+    ):
+        db.execute(delete(model).where(model.user_id.in_(user_ids)))
+    db.execute(delete(User).where(User.id.in_(user_ids)))
+    db.commit()
+    return len(user_ids)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generate or drop synthetic benchmark data.")
+    parser.add_argument("command", choices=["generate", "drop"])
+    parser.add_argument("--scale", choices=sorted(SCALES), default=DEFAULT_SCALE)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help="Last day of data (default: today)")
+    args = parser.parse_args()
+    
+    init_db()
+    db = SessionLocal()
+    try:
+        if args.command == "drop":
+            print(f"Dropped {drop(db, args.seed)} benchmark users")
+            return 0
+        
+        drop(db, args.seed)
+        dataset = generate(db, args.scale, args.seed, args.end)
+        transactions = sum(user["transactions"] for user in dataset["users"].values())
+        print(f"Generated {len(dataset['users'])} users with {transactions} transactions")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Batch versus per-user expense forecasting.
+
+Fits synthetic monthly expense series (``--users`` x ``--categories`` rows
+of ``--months`` months) with ``app.core.forecasting.forecast``, once as a
+single matrix, as the batch job does per shard, and once one user at a
+time, as the forecast API does on a cache miss. Both ways must give the
+same forecasts. Needs no database.
+
+Usage:
+    python -m benchmarks.forecast_batch [--users 10000] [--categories 8] [--months 36]
+                                        [--horizon 12] [--repeat 3] [--seed 1] [--output results.json]
+"""
+import argparse
+import sys
+import numpy as np
+from app.core.forecasting import SEASON_LENGTH, forecast
+from benchmarks.results import run_meta, summarize, time_calls, write_results
+from benchmarks.run import print_result
+
+DEFAULT_USERS = 10000
+DEFAULT_CATEGORIES = 8
+DEFAULT_MONTHS = 36
+DEFAULT_HORIZON = 12
+DEFAULT_REPEAT = 3
+
+
+def synthetic_series(rng: np.random.Generator, rows: int, months: int) -> np.ndarray:
+    """
+    Monthly expense totals shaped like real categories: log-normal levels,
+    a yearly cycle, noise, and series that only start part-way through.
+    """
+    level = rng.lognormal(5.0, 1.0, (rows, 1))
+    phase = rng.integers(0, SEASON_LENGTH, (rows, 1))
+    cycle = 1 + 0.2 * np.sin(2 * np.pi * (np.arange(months) + phase) / SEASON_LENGTH)
+    series = level * cycle * rng.gamma(8.0, 1 / 8.0, (rows, months))
+    started = rng.integers(0, months // 2, rows)
+    series[np.arange(months) < started[:, None]] = 0.0
+    return series.round(2)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark batch versus per-user forecasting.")
+    parser.add_argument("--users", type=int, default=DEFAULT_USERS)
+    parser.add_argument("--categories", type=int, default=DEFAULT_CATEGORIES, help="Series per user")
+    parser.add_argument("--months", type=int, default=DEFAULT_MONTHS, help="History length")
+    parser.add_argument("--horizon", type=int, default=DEFAULT_HORIZON, help="Months forecast")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Timed runs of each way")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=None, help="Result file (JSON)")
+    args = parser.parse_args()
+    
+    series = synthetic_series(np.random.default_rng(args.seed), args.users * args.categories, args.months)
+    users = [series[n * args.categories:(n + 1) * args.categories] for n in range(args.users)]
+    print(f"{args.users} users x {args.categories} categories x {args.months} months")
+    
+    batched = forecast(series, args.horizon)
+    one_by_one = np.vstack([forecast(rows, args.horizon) for rows in users])
+    if not np.allclose(batched, one_by_one):
+        print("FAIL: batch and per-user forecasts differ")
+        return 1
+    
+    results = {}
+    for name, fit in (
+        ("forecast batch", lambda: forecast(series, args.horizon)),
+        ("forecast per user", lambda: [forecast(rows, args.horizon) for rows in users]),
+    ):
+        samples = time_calls(fit, args.repeat, warmup=0)
+        results[name] = summarize(samples, users_per_second=round(args.users / min(samples), 1))
+        print_result(name, results[name])
+        print(f"{'':<55} {results[name]['users_per_second']:.0f} users/s")
+    
+    if args.output:
+        meta = run_meta(
+            users=args.users,
+            categories=args.categories,
+            months=args.months,
+            horizon=args.horizon,
+            seed=args.seed,
+            repeat=args.repeat
+        )
+        write_results(args.output, meta, {"forecast": results})
+        print(f"\nWrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
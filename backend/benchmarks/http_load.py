@@ -0,0 +1,211 @@
+"""
+In-process HTTP load driver.
+
+Sends requests to the ASGI app through httpx's ASGI transport, so the full
+request path (routing, auth, validation, services, serialization) is
+measured without a server or network in between. Each endpoint gets
+``requests`` calls from ``concurrency`` concurrent clients, all as the
+first generated user.
+
+Cached endpoints would mostly measure cache hits, so the user's data
+version is bumped before every request (outside the timed region) unless
+``warm_cache`` is set. Created transactions are deleted by the DELETE
+endpoint's own run; imported ones are cleaned up afterwards.
+"""
+import asyncio
+import time
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
+import httpx
+from app.core.config import settings
+from app.core.response_cache import bump_user_version
+from app.core.security import create_access_token
+from app.db.session import SessionLocal
+from app.main import app
+from app.services.transactions_service import TransactionsService
+from benchmarks import services
+from benchmarks.results import summarize
+
+DEFAULT_REQUESTS = 100
+DEFAULT_CONCURRENCY = 4
+
+
+class Endpoint:
+    """
+    A request template. ``path``, string ``params`` and ``body`` are
+    formatted with the context; ``{created_id}`` takes the next id returned
+    by an earlier ``collect`` endpoint.
+    """
+    
+    __slots__ = ("name", "method", "path", "params", "body", "collect")
+    
+    def __init__(
+        self,
+        name: str,
+        path: str,
+        method: str = "GET",
+        params: Optional[Dict] = None,
+        body: Optional[Callable[[Dict], object]] = None,
+        collect: bool = False
+    ):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.params = params or {}
+        self.body = body
+        self.collect = collect
+
+
+YEAR = {"start_date": "{year_start_date}", "end_date": "{end}"}
+
+ENDPOINTS = [
+    Endpoint("GET /auth/me", "/auth/me"),
+    Endpoint("GET /accounts", "/accounts/"),
+    Endpoint("GET /accounts/{id}", "/accounts/{account_id}"),
+    Endpoint("GET /accounts/{id}/balance-history", "/accounts/{account_id}/balance-history", params=YEAR),
+    Endpoint("GET /transactions", "/transactions/", params={"limit": 100}),
+    Endpoint("GET /transactions?cursor", "/transactions/", params={"cursor": "", "limit": 100}),
+    Endpoint("GET /transactions?q", "/transactions/", params={"q": "starbucks", "limit": 50}),
+    Endpoint("GET /transactions/{id}", "/transactions/{transaction_id}"),
+    Endpoint("GET /transactions/export", "/transactions/export", params={"format": "csv"}),
+    Endpoint("GET /budgets", "/budgets/"),
+    Endpoint("GET /budgets/{id}", "/budgets/{budget_id}"),
+    Endpoint("GET /budgets/{id}/history", "/budgets/{budget_id}/history"),
+    Endpoint("GET /goals", "/goals/"),
+    Endpoint("GET /goals/{id}", "/goals/{goal_id}"),
+    Endpoint("GET /alerts", "/alerts/"),
+    Endpoint("GET /rules", "/rules/"),
+    Endpoint("GET /dashboard/summary", "/dashboard/summary"),
+    Endpoint("GET /reports/expenses-by-category", "/reports/expenses-by-category"),
+    Endpoint("GET /reports/income-vs-expenses", "/reports/income-vs-expenses"),
+    Endpoint("GET /reports/net-worth", "/reports/net-worth", params={**YEAR, "granularity": "week"}),
+    Endpoint("GET /forecast/expenses", "/forecast/expenses"),
+    Endpoint("GET /forecast/expenses/by-category", "/forecast/expenses/by-category"),
+    Endpoint("GET /insights/anomalies", "/insights/anomalies"),
+    Endpoint(
+        "POST /transactions",
+        "/transactions/",
+        method="POST",
+        body=lambda ctx: services.new_transaction(ctx).model_dump(mode="json"),
+        collect=True
+    ),
+    Endpoint(
+        "PUT /transactions/{id}",
+        "/transactions/{transaction_id}",
+        method="PUT",
+        body=lambda ctx: {"notes": "benchmark"}
+    ),
+    Endpoint("DELETE /transactions/{id}", "/transactions/{created_id}", method="DELETE"),
+    Endpoint(
+        "POST /transactions/bulk",
+        "/transactions/bulk",
+        method="POST",
+        body=services.import_rows
+    ),
+]
+
+
+def _format(value, ctx: Dict):
+    return value.format(**ctx) if isinstance(value, str) else value
+
+
+async def _drive(
+    client: httpx.AsyncClient,
+    endpoint: Endpoint,
+    ctx: Dict,
+    requests: int,
+    concurrency: int,
+    warm_cache: bool
+) -> Dict:
+    """Send an endpoint's requests and summarize them."""
+    if "{created_id}" in endpoint.path:
+        requests = min(requests, len(ctx["created"]))
+    remaining = iter(range(requests))
+    samples: List[float] = []
+    errors = []
+    
+    async def worker():
+        for _ in remaining:
+            values = ctx
+            if "{created_id}" in endpoint.path:
+                values = {**ctx, "created_id": ctx["created"].pop()}
+            if not warm_cache:
+                bump_user_version(ctx["user_id"])
+            started = time.perf_counter()
+            response = await client.request(
+                endpoint.method,
+                settings.API_V1_STR + endpoint.path.format(**values),
+                params={key: _format(value, values) for key, value in endpoint.params.items()},
+                json=endpoint.body(ctx) if endpoint.body is not None else None
+            )
+            samples.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+            elif endpoint.collect:
+                ctx["created"].append(response.json()["id"])
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return summarize(
+        samples,
+        errors=len(errors),
+        error_statuses=sorted(set(errors)),
+        requests_per_second=round(len(samples) / elapsed, 1) if elapsed else 0.0
+    )
+
+
+async def _run(
+    ctx: Dict,
+    requests: int,
+    concurrency: int,
+    warm_cache: bool,
+    only: Optional[List[str]],
+    report: Optional[Callable[[str, Dict], None]]
+) -> Dict[str, Dict]:
+    token = create_access_token({"sub": str(ctx["user_id"])}, expires_delta=timedelta(hours=12))
+    results = {}
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://benchmark",
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=None
+    ) as client:
+        for endpoint in ENDPOINTS:
+            if only and not any(part in endpoint.name for part in only):
+                continue
+            results[endpoint.name] = await _drive(client, endpoint, ctx, requests, concurrency, warm_cache)
+            if report is not None:
+                report(endpoint.name, results[endpoint.name])
+    return results
+
+
+def run(
+    dataset: Dict,
+    requests: int = DEFAULT_REQUESTS,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    warm_cache: bool = False,
+    only: Optional[List[str]] = None,
+    report: Optional[Callable[[str, Dict], None]] = None
+) -> Dict[str, Dict]:
+    """Load every endpoint (those whose name contains one of ``only``) in turn."""
+    db = SessionLocal()
+    try:
+        ctx = services.context(db, dataset)
+    finally:
+        db.close()
+    ctx.update({
+        "year_start_date": ctx["year_start"].date().isoformat(),
+        "end": ctx["end"].isoformat(),
+        "created": [],
+    })
+    try:
+        return asyncio.run(_run(ctx, requests, concurrency, warm_cache, only, report))
+    finally:
+        db = SessionLocal()
+        try:
+            for transaction_id in ctx["created"]:
+                TransactionsService(db).delete_transaction(transaction_id, ctx["user_id"])
+            services.delete_imported(db, ctx, None)
+        finally:
+            db.close()
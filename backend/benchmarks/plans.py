@@ -0,0 +1,154 @@
+"""
+Query plans of the transaction hot paths, with and without their indexes.
+
+Runs the read-only service cases, captures every statement they send that
+reads ``transactions``, and for each one records the EXPLAIN output, the
+indexes it uses and its latency. It then drops the composite indexes
+declared on the Transaction model (``TRANSACTION_INDEXES``), measures the
+same statements again and puts those numbers under ``without_indexes``.
+That gives the before/after comparison for the index set in one run.
+
+The indexes are dropped inside a transaction that is rolled back. SQLite
+commits DDL implicitly, so any index still missing afterwards is
+recreated. Dropping an index locks the table, so point this at a
+benchmark database only.
+"""
+import re
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from app.core.response_cache import bump_user_version
+from app.db.session import SessionLocal, engine
+from app.models.transaction import Transaction
+from app.services.categorization_service import RULES_SCOPE
+from benchmarks.results import summarize, time_calls
+from benchmarks.services import CASES, context
+
+DEFAULT_REPEAT = 20
+
+# Composite indexes whose effect is measured
+TRANSACTION_INDEXES = (
+    "ix_transactions_user_id_date",
+    "ix_transactions_user_id_type_date",
+    "ix_transactions_user_id_category_id_date",
+    "ix_transactions_account_id_date",
+)
+
+# Queries (not writes) reading the transactions table
+_READS_TRANSACTIONS = re.compile(
+    r"^\s*(?:SELECT|WITH)\b.*\b(?:FROM|JOIN)\s+transactions\b",
+    re.IGNORECASE | re.DOTALL
+)
+
+# Index names in plan output: SQLite, then PostgreSQL
+_PLAN_INDEX = re.compile(
+    r"USING (?:COVERING )?INDEX (\w+)"
+    r"|Index (?:Only )?Scan(?: Backward)? using (\w+)"
+    r"|Bitmap Index Scan on (\w+)"
+)
+
+Statement = Tuple[str, object]
+
+
+def capture_statements(fn: Callable[[], object]) -> List[Statement]:
+    """Distinct queries (with parameters) reading transactions that ``fn`` runs."""
+    captured: Dict[str, object] = {}
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement not in captured and _READS_TRANSACTIONS.search(statement):
+            captured[statement] = parameters
+    
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return list(captured.items())
+
+
+def explain(connection: Connection, statement: str, parameters: object) -> List[str]:
+    """The statement's query plan, one line per plan node."""
+    if connection.dialect.name == "sqlite":
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        return [row[-1] for row in rows]
+    return [row[0] for row in connection.exec_driver_sql(f"EXPLAIN {statement}", parameters).all()]
+
+
+def plan_indexes(plan: Sequence[str]) -> List[str]:
+    """Indexes a plan reads, in plan order."""
+    found = []
+    for line in plan:
+        for match in _PLAN_INDEX.finditer(line):
+            name = next(group for group in match.groups() if group)
+            if name not in found:
+                found.append(name)
+    return found
+
+
+def measure(connection: Connection, statement: str, parameters: object, repeat: int, warmup: int) -> Dict:
+    """Plan, indexes used and latency of one statement."""
+    plan = explain(connection, statement, parameters)
+    samples = time_calls(
+        lambda: connection.exec_driver_sql(statement, parameters).all(),
+        repeat,
+        warmup=warmup
+    )
+    return summarize(samples, indexes=plan_indexes(plan), plan=plan)
+
+
+def run(
+    dataset: Dict,
+    repeat: int = DEFAULT_REPEAT,
+    warmup: int = 1,
+    only: Optional[List[str]] = None,
+    report: Optional[Callable[[str, Dict], None]] = None
+) -> Dict[str, Dict]:
+    """Measure the statements of the read-only cases (those matching ``only``) by name."""
+    db = SessionLocal()
+    statements: List[Tuple[str, str, object]] = []
+    try:
+        ctx = context(db, dataset)
+        for case in CASES:
+            if case.undo is not None or (only and not any(part in case.name for part in only)):
+                continue
+            db.rollback()
+            bump_user_version(ctx["user_id"])
+            bump_user_version(ctx["user_id"], RULES_SCOPE)
+            captured = capture_statements(lambda run=case.run: run(db, ctx))
+            for number, (statement, parameters) in enumerate(captured, start=1):
+                name = case.name if len(captured) == 1 else f"{case.name}#{number}"
+                statements.append((name, statement, parameters))
+        db.rollback()
+    finally:
+        db.close()
+    
+    indexes = [index for index in Transaction.__table__.indexes if index.name in TRANSACTION_INDEXES]
+    results = {}
+    with engine.connect() as connection:
+        for name, statement, parameters in statements:
+            results[name] = measure(connection, statement, parameters, repeat, warmup)
+    
+    # pysqlite caches prepared statements per connection, and a cached
+    # EXPLAIN is not re-planned after a schema change: use new connections
+    engine.dispose()
+    with engine.connect() as connection:
+        try:
+            with connection.begin() as transaction:
+                for index in indexes:
+                    index.drop(connection)
+                for name, statement, parameters in statements:
+                    without = measure(connection, statement, parameters, repeat, warmup)
+                    results[name]["without_indexes"] = {
+                        key: without[key] for key in ("median_ms", "p95_ms", "indexes", "plan")
+                    }
+                transaction.rollback()
+        finally:
+            with connection.begin():
+                for index in indexes:
+                    index.create(connection, checkfirst=True)
+    engine.dispose()
+    
+    if report is not None:
+        for name, summary in results.items():
+            report(name, summary)
+    return results
@@ -0,0 +1,119 @@
+"""
+Benchmark timing summaries and result files.
+
+A result file is JSON with the run's ``meta`` (database, scale, seed,
+commit, versions) and ``results``: suite name -> benchmark name -> summary.
+Summaries are in milliseconds so files from different runs compare
+directly (see ``benchmarks.compare``).
+"""
+import json
+import math
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+from statistics import mean, median
+from typing import Callable, Dict, List, Optional, Sequence
+import sqlalchemy
+from sqlalchemy.engine import make_url
+from app.core.config import settings
+
+RESULTS_VERSION = 1
+
+
+def percentile(sorted_samples: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted samples."""
+    rank = math.ceil(fraction * len(sorted_samples))
+    return sorted_samples[min(max(rank, 1), len(sorted_samples)) - 1]
+
+
+def summarize(samples: Sequence[float], **extra) -> Dict:
+    """Latency summary of timings given in seconds."""
+    ordered = sorted(samples)
+    summary = {"n": len(ordered)}
+    if ordered:
+        summary.update({
+            "min_ms": round(ordered[0] * 1000, 3),
+            "median_ms": round(median(ordered) * 1000, 3),
+            "mean_ms": round(mean(ordered) * 1000, 3),
+            "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+            "max_ms": round(ordered[-1] * 1000, 3),
+        })
+    summary.update(extra)
+    return summary
+
+
+def time_calls(
+    fn: Callable[[], object],
+    repeat: int,
+    warmup: int = 1,
+    setup: Optional[Callable[[], None]] = None,
+    teardown: Optional[Callable[[object], None]] = None
+) -> List[float]:
+    """
+    Time ``repeat`` calls of ``fn`` after ``warmup`` untimed ones.
+
+    ``setup`` runs before and ``teardown`` (given the call's result) after
+    every call, outside the timed region.
+    """
+    samples = []
+    for i in range(warmup + repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        if teardown is not None:
+            teardown(result)
+        if i >= warmup:
+            samples.append(elapsed)
+    return samples
+
+
+def git_commit() -> Optional[str]:
+    """Commit of the working tree, marked dirty if it has changes."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{commit}-dirty" if dirty else commit
+
+
+def run_meta(**extra) -> Dict:
+    """Describe the environment of a benchmark run."""
+    url = make_url(settings.DATABASE_URL)
+    meta = {
+        "version": RESULTS_VERSION,
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "database": url.get_backend_name(),
+        "database_url": url.render_as_string(hide_password=True),
+        "database_async": settings.DATABASE_ASYNC,
+        "python": platform.python_version(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "platform": platform.platform(),
+    }
+    meta.update(extra)
+    return meta
+
+
+def write_results(path: str, meta: Dict, results: Dict[str, Dict[str, Dict]]) -> None:
+    """Write a result file."""
+    with open(path, "w") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def read_results(path: str) -> Dict:
+    """Read a result file."""
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("meta", {}).get("version") != RESULTS_VERSION:
+        raise ValueError(f"{path}: unsupported result file version")
+    return data
@@ -0,0 +1,163 @@
+"""
+Transaction search over a large table.
+
+Loads ``--rows`` transactions (default one million) spread over ``--users``
+generated users, then times searches of one user's transactions through
+``TransactionsService`` (the full-text index of the database) against a
+``LIKE`` scan of the same user's rows, for a rare merchant name and for a
+word in about a tenth of all descriptions. Both ways must find the same
+transactions. The users are created in the database configured by
+``DATABASE_URL`` and deleted afterwards unless ``--keep`` is given; loading
+a million rows takes a few minutes.
+
+Usage:
+    python -m benchmarks.search [--rows 1000000] [--users 100] [--repeat 20] [--seed 1]
+                                [--output results.json] [--keep]
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, List
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+from app.db.init_db import init_db
+from app.db.session import SessionLocal
+from app.models.account import Account, AccountType
+from app.models.transaction import Transaction, TransactionType
+from app.models.user import User
+from app.services.transactions_service import TransactionsService
+from benchmarks import datagen
+from benchmarks.results import run_meta, summarize, time_calls, write_results
+from benchmarks.run import print_result
+
+DEFAULT_ROWS = 1000000
+DEFAULT_USERS = 100
+DEFAULT_REPEAT = 20
+
+MERCHANTS = [merchant for merchants, *_ in datagen.SPENDING_PROFILE.values() for merchant in merchants]
+
+# Search terms: (query, description text, share of rows)
+TERMS = {
+    "rare": ("zanzibar", "Zanzibar Imports", 0.0002),
+    "common": ("coffee", "coffee", 0.1),
+}
+
+RESULT_LIMIT = 100
+
+
+def load(db: Session, seed: int, rows: int, users: int) -> List[int]:
+    """Generated users with ``rows`` transactions between them; returns their ids."""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    user_ids = []
+    for n in range(users):
+        name = f"{datagen.user_prefix(seed)}search-{n}"
+        user = User(email=f"{name}@example.com", username=name, hashed_password="!")
+        db.add(user)
+        db.flush()
+        account = Account(user_id=user.id, name="Checking", account_type=AccountType.CHECKING, balance=Decimal("0"))
+        db.add(account)
+        db.flush()
+        user_ids.append(user.id)
+        
+        count = rows // users + (n < rows % users)
+        for start in range(0, count, datagen.INSERT_CHUNK_SIZE):
+            db.execute(insert(Transaction), [
+                {
+                    "user_id": user.id,
+                    "account_id": account.id,
+                    "amount": Decimal(rng.randint(100, 20000)) / 100,
+                    "transaction_type": TransactionType.EXPENSE,
+                    "description": _description(rng),
+                    "date": now - timedelta(minutes=rng.randint(0, 3 * 365 * 24 * 60)),
+                }
+                for _ in range(min(datagen.INSERT_CHUNK_SIZE, count - start))
+            ])
+        db.commit()
+    db.execute(text("ANALYZE transactions"))
+    db.commit()
+    return user_ids
+
+
+def _description(rng: random.Random) -> str:
+    """A merchant name with a store number, sometimes with a search term."""
+    words = [rng.choice(MERCHANTS), f"#{rng.randint(100, 9999)}"]
+    for _, term, share in TERMS.values():
+        if rng.random() < share:
+            words.append(term)
+    return " ".join(words)
+
+
+def run(user_id: int, repeat: int) -> Dict[str, Dict]:
+    """Time the index search and the LIKE scan for every term."""
+    results = {}
+    db = SessionLocal()
+    try:
+        service = TransactionsService(db)
+        for name, (q, _, _) in TERMS.items():
+            ways = {
+                "search": lambda q=q: service.get_user_transactions(user_id, limit=RESULT_LIMIT, q=q),
+                "like scan": lambda q=q: db.query(Transaction).filter(
+                    Transaction.user_id == user_id,
+                    Transaction.description.ilike(f"%{q}%")
+                ).order_by(Transaction.date.desc()).limit(RESULT_LIMIT).all(),
+            }
+            matches = {way: {transaction.id for transaction in find()} for way, find in ways.items()}
+            db.rollback()
+            # Both return at most RESULT_LIMIT rows, ranked differently
+            if len(matches["search"]) != len(matches["like scan"]) or (
+                len(matches["search"]) < RESULT_LIMIT and matches["search"] != matches["like scan"]
+            ):
+                raise AssertionError(f"{name}: search and LIKE scan find different transactions")
+            
+            for way, find in ways.items():
+                key = f"{way} {name} term"
+                results[key] = summarize(time_calls(find, repeat, setup=db.rollback), matches=len(matches[way]))
+                print_result(key, results[key])
+    finally:
+        db.close()
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark transaction search on a large table.")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="Transactions in total")
+    parser.add_argument("--users", type=int, default=DEFAULT_USERS)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--seed", type=int, default=datagen.DEFAULT_SEED)
+    parser.add_argument("--output", default=None, help="Result file (JSON)")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated users")
+    args = parser.parse_args()
+    
+    init_db()
+    db = SessionLocal()
+    try:
+        datagen.drop(db, args.seed)
+        started = time.perf_counter()
+        user_ids = load(db, args.seed, args.rows, args.users)
+        print(f"Loaded {args.rows} transactions for {args.users} users in {time.perf_counter() - started:.0f}s")
+    finally:
+        db.close()
+    
+    try:
+        results = run(user_ids[0], args.repeat)
+    finally:
+        if not args.keep:
+            db = SessionLocal()
+            try:
+                datagen.drop(db, args.seed)
+            finally:
+                db.close()
+    
+    if args.output:
+        meta = run_meta(rows=args.rows, users=args.users, seed=args.seed, repeat=args.repeat)
+        write_results(args.output, meta, {"search": results})
+        print(f"\nWrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
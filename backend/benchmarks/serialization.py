@@ -0,0 +1,196 @@
+"""
+List endpoint serialization: ORM objects versus column rows.
+
+For ``--rows`` accounts, budgets, goals and transactions of one generated
+user, times the list query plus JSON rendering both ways:
+
+- ``models``: ORM objects validated into the response schema and rendered
+  the way FastAPI renders a ``response_model``, as the endpoints used to;
+- ``rows``: the schema's columns selected as rows and rendered by
+  ``LeanJSONResponse``, as the endpoints do now.
+
+Both ways must produce the same JSON. The user is created in the database
+configured by ``DATABASE_URL`` and deleted afterwards unless ``--keep`` is
+given.
+
+Usage:
+    python -m benchmarks.serialization [--rows 1000] [--repeat 20] [--seed 1] [--output results.json] [--keep]
+"""
+import argparse
+import json
+import sys
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Callable, Dict, List, Sequence, Tuple, Type
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.core.serialization import LeanJSONResponse
+from app.db.init_db import init_db
+from app.db.session import SessionLocal
+from app.models.account import Account, AccountType
+from app.models.budget import Budget, BudgetPeriod
+from app.models.goal import Goal, GoalStatus, GoalType
+from app.models.transaction import Transaction, TransactionType
+from app.models.user import User
+from app.schemas.account import Account as AccountSchema
+from app.schemas.budget import Budget as BudgetSchema
+from app.schemas.goal import Goal as GoalSchema
+from app.schemas.transaction import Transaction as TransactionSchema
+from app.services.accounts_service import ACCOUNT_COLUMNS, AccountsService
+from app.services.budget_service import BUDGET_COLUMNS, BudgetService
+from app.services.goals_service import GOAL_COLUMNS, GoalsService
+from app.services.transactions_service import TRANSACTION_COLUMNS, TransactionsService
+from benchmarks import datagen
+from benchmarks.results import run_meta, summarize, time_calls, write_results
+from benchmarks.run import print_result
+
+DEFAULT_ROWS = 1000
+DEFAULT_REPEAT = 20
+
+
+def create_user(db: Session, seed: int, rows: int) -> int:
+    """A generated user with ``rows`` accounts, budgets, goals and transactions."""
+    name = f"{datagen.user_prefix(seed)}serialization"
+    user = User(email=f"{name}@example.com", username=name, hashed_password="!")
+    db.add(user)
+    db.flush()
+    start = date.today().replace(day=1)
+    db.execute(insert(Account), [
+        {
+            "user_id": user.id,
+            "name": f"Account {n}",
+            "account_type": AccountType.CHECKING,
+            "balance": Decimal(n) + Decimal("0.25"),
+        }
+        for n in range(rows)
+    ])
+    account_id = db.query(Account.id).filter(Account.user_id == user.id).order_by(Account.id).first()[0]
+    db.execute(insert(Budget), [
+        {
+            "user_id": user.id,
+            "name": f"Budget {n}",
+            "amount": Decimal(100 + n),
+            "period": BudgetPeriod.MONTHLY,
+            "start_date": start,
+        }
+        for n in range(rows)
+    ])
+    db.execute(insert(Goal), [
+        {
+            "user_id": user.id,
+            "name": f"Goal {n}",
+            "goal_type": GoalType.SAVINGS,
+            "target_amount": Decimal(1000 + n),
+            "current_amount": Decimal("10.50"),
+            "target_date": start + timedelta(days=365),
+            "status": GoalStatus.ACTIVE,
+        }
+        for n in range(rows)
+    ])
+    now = datetime.now(timezone.utc)
+    db.execute(insert(Transaction), [
+        {
+            "user_id": user.id,
+            "account_id": account_id,
+            "amount": Decimal(n % 500) + Decimal("0.99"),
+            "transaction_type": TransactionType.EXPENSE,
+            "description": f"Purchase {n}",
+            "date": now - timedelta(hours=n),
+        }
+        for n in range(rows)
+    ])
+    db.commit()
+    return user.id
+
+
+def render_models(objects: Sequence, adapter: TypeAdapter) -> bytes:
+    """Validate ORM objects into a list response model and render it like FastAPI."""
+    return JSONResponse(adapter.dump_python(adapter.validate_python(objects, from_attributes=True), mode="json")).body
+
+
+def render_rows(rows: Sequence) -> bytes:
+    """Render column rows like the list endpoints."""
+    return LeanJSONResponse(rows).body
+
+
+def cases(user_id: int, rows: int) -> List[Tuple[str, Type[BaseModel], Sequence, Callable]]:
+    """``(name, schema, columns, list(db, columns))`` per list endpoint."""
+    return [
+        ("accounts", AccountSchema, ACCOUNT_COLUMNS,
+         lambda db, columns: AccountsService(db).get_user_accounts(user_id, limit=rows, columns=columns)),
+        ("budgets", BudgetSchema, BUDGET_COLUMNS,
+         lambda db, columns: BudgetService(db).get_user_budgets(user_id, limit=rows, columns=columns)),
+        ("goals", GoalSchema, GOAL_COLUMNS,
+         lambda db, columns: GoalsService(db).get_user_goals(user_id, limit=rows, columns=columns)),
+        ("transactions", TransactionSchema, TRANSACTION_COLUMNS,
+         lambda db, columns: TransactionsService(db).get_user_transactions(user_id, limit=rows, columns=columns)),
+    ]
+
+
+def run(user_id: int, rows: int, repeat: int) -> Dict[str, Dict]:
+    """Time both ways per list endpoint; raises AssertionError when their JSON differs."""
+    results = {}
+    db = SessionLocal()
+    try:
+        for name, schema, columns, fetch in cases(user_id, rows):
+            ways = {
+                "models": lambda fetch=fetch, adapter=TypeAdapter(List[schema]): render_models(fetch(db, None), adapter),
+                "rows": lambda fetch=fetch, columns=columns: render_rows(fetch(db, columns)),
+            }
+            rendered = {way: json.loads(render()) for way, render in ways.items()}
+            db.expunge_all()
+            assert rendered["models"] == rendered["rows"], f"{name}: models and rows render differently"
+            
+            for way, render in ways.items():
+                samples = time_calls(render, repeat, setup=db.expunge_all)
+                key = f"{name} {way}"
+                results[key] = summarize(
+                    samples,
+                    rows=len(rendered[way]),
+                    per_row_us=round(min(samples) / max(len(rendered[way]), 1) * 1e6, 2)
+                )
+                print_result(key, results[key])
+                print(f"{'':<55} {results[key]['per_row_us']:.1f} us/row")
+    finally:
+        db.close()
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark list endpoint serialization.")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="Rows of each list")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--seed", type=int, default=datagen.DEFAULT_SEED)
+    parser.add_argument("--output", default=None, help="Result file (JSON)")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated user")
+    args = parser.parse_args()
+    
+    init_db()
+    db = SessionLocal()
+    try:
+        datagen.drop(db, args.seed)
+        user_id = create_user(db, args.seed, args.rows)
+    finally:
+        db.close()
+    
+    try:
+        results = run(user_id, args.rows, args.repeat)
+    finally:
+        if not args.keep:
+            db = SessionLocal()
+            try:
+                datagen.drop(db, args.seed)
+            finally:
+                db.close()
+    
+    if args.output:
+        meta = run_meta(rows=args.rows, seed=args.seed, repeat=args.repeat)
+        write_results(args.output, meta, {"serialization": results})
+        print(f"\nWrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,287 @@
+"""
+Microbenchmarks of the service layer.
+
+Each case calls one service method for the first generated user with a
+fresh session state: the session is rolled back and the user's data
+version bumped before every call, so identity-map hits and version-keyed
+caches (fitted forecasts, compiled rules) never stand in for the work
+being measured. Write cases undo their change outside the timed region.
+"""
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.response_cache import bump_user_version
+from app.db.session import SessionLocal
+from app.models.transaction import Transaction, TransactionType
+from app.schemas.transaction import TransactionCreate, TransactionUpdate
+from app.services.accounts_service import AccountsService
+from app.services.alerts_service import AlertsService
+from app.services.balance_history_service import BalanceHistoryService
+from app.services.budget_service import BudgetService
+from app.services.categorization_service import RULES_SCOPE, CategorizationService
+from app.services.category_stats_service import CategoryStatsService
+from app.services.forecast_service import ForecastService
+from app.services.goals_service import GoalsService
+from app.services.insights_service import InsightsService
+from app.services.reports_service import Breakdown, ReportsService
+from app.services.rollup_service import Granularity, RollupService
+from app.services.transactions_service import TransactionsService
+from benchmarks.results import summarize, time_calls
+
+DEFAULT_REPEAT = 20
+
+# Rows per bulk import call
+IMPORT_ROWS = 100
+
+IMPORT_DESCRIPTION = "Benchmark import"
+
+
+class Case:
+    """A benchmark: ``run(db, ctx)``, optionally undone by ``undo(db, ctx, result)``."""
+    
+    __slots__ = ("name", "run", "undo")
+    
+    def __init__(self, name: str, run: Callable, undo: Optional[Callable] = None):
+        self.name = name
+        self.run = run
+        self.undo = undo
+
+
+def context(db: Session, dataset: Dict) -> Dict:
+    """Ids and dates the cases work with, taken from the first generated user."""
+    user_id = min(dataset["users"])
+    user = dataset["users"][user_id]
+    end = date.fromisoformat(dataset["end"])
+    transaction_id = db.execute(
+        select(Transaction.id).where(
+            Transaction.user_id == user_id,
+            Transaction.transaction_type == TransactionType.EXPENSE
+        ).order_by(Transaction.date.desc()).limit(1)
+    ).scalar()
+    return {
+        "user_id": user_id,
+        "account_id": user["accounts"][0],
+        "budget_id": user["budgets"][0] if user["budgets"] else None,
+        "goal_id": user["goals"][0] if user["goals"] else None,
+        "category_id": dataset["categories"]["Groceries"],
+        "transaction_id": transaction_id,
+        "end": end,
+        "year_start": datetime.combine(end - timedelta(days=365), dt_time.min, tzinfo=timezone.utc),
+        "year_end": datetime.combine(end, dt_time.max, tzinfo=timezone.utc),
+    }
+
+
+def new_transaction(ctx: Dict, amount: str = "42.50") -> TransactionCreate:
+    """A recent expense on the context account."""
+    return TransactionCreate(
+        account_id=ctx["account_id"],
+        category_id=ctx["category_id"],
+        amount=Decimal(amount),
+        transaction_type=TransactionType.EXPENSE,
+        description="Benchmark purchase",
+        date=ctx["year_end"] - timedelta(days=3)
+    )
+
+
+def delete_imported(db: Session, ctx: Dict, _result) -> None:
+    """Delete the transactions created from ``import_rows``."""
+    service = TransactionsService(db)
+    for transaction_id in db.execute(
+        select(Transaction.id).where(
+            Transaction.user_id == ctx["user_id"],
+            Transaction.description == IMPORT_DESCRIPTION
+        )
+    ).scalars().all():
+        service.delete_transaction(transaction_id, ctx["user_id"])
+
+
+def _export(db: Session, ctx: Dict) -> int:
+    return sum(len(batch) for batch in TransactionsService(db).iter_export_batches(ctx["user_id"]))
+
+
+def _toggle_amount(db: Session, ctx: Dict):
+    service = TransactionsService(db)
+    current = service.get_transaction(ctx["transaction_id"], ctx["user_id"]).amount
+    return service.update_transaction(
+        ctx["transaction_id"],
+        TransactionUpdate(amount=current + Decimal("1.00")),
+        ctx["user_id"]
+    )
+
+
+def _restore_amount(db: Session, ctx: Dict, transaction) -> None:
+    TransactionsService(db).update_transaction(
+        ctx["transaction_id"],
+        TransactionUpdate(amount=transaction.amount - Decimal("1.00")),
+        ctx["user_id"]
+    )
+
+
+def import_rows(ctx: Dict) -> List[Dict]:
+    """Raw rows for a bulk import, as a client would send them."""
+    return [
+        {
+            "account_id": ctx["account_id"],
+            "amount": f"{10 + i % 90}.{i % 100:02d}",
+            "transaction_type": "expense",
+            "description": IMPORT_DESCRIPTION,
+            "date": (ctx["year_end"] - timedelta(days=i % 60)).isoformat(),
+        }
+        for i in range(IMPORT_ROWS)
+    ]
+
+
+CASES = [
+    Case("accounts.get_user_accounts", lambda db, ctx: AccountsService(db).get_user_accounts(ctx["user_id"])),
+    Case("accounts.get_account", lambda db, ctx: AccountsService(db).get_account(ctx["account_id"], ctx["user_id"])),
+    Case(
+        "transactions.get_user_transactions",
+        lambda db, ctx: TransactionsService(db).get_user_transactions(ctx["user_id"], limit=100)
+    ),
+    Case(
+        "transactions.get_user_transactions_page",
+        lambda db, ctx: TransactionsService(db).get_user_transactions_page(ctx["user_id"], cursor="", limit=100)
+    ),
+    Case(
+        "transactions.get_user_transactions[category,year]",
+        lambda db, ctx: TransactionsService(db).get_user_transactions(
+            ctx["user_id"],
+            category_id=ctx["category_id"],
+            start_date=ctx["year_start"],
+            end_date=ctx["year_end"]
+        )
+    ),
+    Case(
+        "transactions.get_user_transactions[search]",
+        lambda db, ctx: TransactionsService(db).get_user_transactions(ctx["user_id"], q="starbucks", limit=50)
+    ),
+    Case(
+        "transactions.get_transaction",
+        lambda db, ctx: TransactionsService(db).get_transaction(ctx["transaction_id"], ctx["user_id"])
+    ),
+    Case("transactions.iter_export_batches", _export),
+    Case(
+        "transactions.create_transaction",
+        lambda db, ctx: TransactionsService(db).create_transaction(new_transaction(ctx), ctx["user_id"]),
+        lambda db, ctx, transaction: TransactionsService(db).delete_transaction(transaction.id, ctx["user_id"])
+    ),
+    Case("transactions.update_transaction", _toggle_amount, _restore_amount),
+    Case(
+        "transactions.bulk_create_transactions",
+        lambda db, ctx: TransactionsService(db).bulk_create_transactions(import_rows(ctx), ctx["user_id"]),
+        delete_imported
+    ),
+    Case(
+        "budgets.get_user_budgets_with_spending",
+        lambda db, ctx: BudgetService(db).get_user_budgets_with_spending(ctx["user_id"])
+    ),
+    Case(
+        "budgets.get_budget_with_spending",
+        lambda db, ctx: BudgetService(db).get_budget_with_spending(ctx["budget_id"], ctx["user_id"])
+    ),
+    Case(
+        "budgets.get_budget_history",
+        lambda db, ctx: BudgetService(db).get_budget_history(ctx["budget_id"], ctx["user_id"])
+    ),
+    Case("goals.get_user_goals", lambda db, ctx: GoalsService(db).get_user_goals(ctx["user_id"])),
+    Case(
+        "goals.get_goal_with_progress",
+        lambda db, ctx: GoalsService(db).get_goal_with_progress(ctx["goal_id"], ctx["user_id"])
+    ),
+    Case("alerts.get_user_alerts", lambda db, ctx: AlertsService(db).get_user_alerts(ctx["user_id"], True)),
+    Case("reports.get_dashboard_summary", lambda db, ctx: ReportsService(db).get_dashboard_summary(ctx["user_id"])),
+    Case(
+        "reports.get_expenses_by_category",
+        lambda db, ctx: ReportsService(db).get_expenses_by_category(ctx["user_id"], ctx["year_start"], ctx["year_end"])
+    ),
+    Case(
+        "reports.get_income_vs_expenses",
+        lambda db, ctx: ReportsService(db).get_income_vs_expenses(ctx["user_id"], ctx["year_start"], ctx["year_end"])
+    ),
+    Case(
+        "reports.get_income_vs_expenses[month,category]",
+        lambda db, ctx: ReportsService(db).get_income_vs_expenses(
+            ctx["user_id"], ctx["year_start"], ctx["year_end"], Granularity.MONTH, Breakdown.CATEGORY
+        )
+    ),
+    Case(
+        "balance_history.get_balance_history",
+        lambda db, ctx: BalanceHistoryService(db).get_balance_history(
+            ctx["account_id"], ctx["user_id"], ctx["year_start"].date(), ctx["end"]
+        )
+    ),
+    Case(
+        "balance_history.get_net_worth[week]",
+        lambda db, ctx: BalanceHistoryService(db).get_net_worth(
+            ctx["user_id"], ctx["year_start"].date(), ctx["end"], Granularity.WEEK
+        )
+    ),
+    Case(
+        "forecast.forecast_monthly_expenses",
+        lambda db, ctx: ForecastService(db).forecast_monthly_expenses(ctx["user_id"])
+    ),
+    Case(
+        "forecast.forecast_expenses_by_category",
+        lambda db, ctx: ForecastService(db).forecast_expenses_by_category(ctx["user_id"])
+    ),
+    Case("insights.get_anomalies", lambda db, ctx: InsightsService(db).get_anomalies(ctx["user_id"], ctx["end"])),
+    Case("categorization.matcher", lambda db, ctx: CategorizationService(db).matcher(ctx["user_id"])),
+    Case(
+        "categorization.recategorize[all]",
+        lambda db, ctx: CategorizationService(db).recategorize(ctx["user_id"], only_uncategorized=False)
+    ),
+    Case("rollups.rebuild", lambda db, ctx: RollupService(db).rebuild(ctx["user_id"])),
+    Case(
+        "category_stats.rebuild",
+        lambda db, ctx: CategoryStatsService(db).rebuild(ctx["user_id"]),
+        lambda db, ctx, _: db.commit()
+    ),
+    Case(
+        "balance_history.rebuild",
+        lambda db, ctx: BalanceHistoryService(db).rebuild(ctx["user_id"]),
+        lambda db, ctx, _: db.commit()
+    ),
+]
+
+
+def run(
+    dataset: Dict,
+    repeat: int = DEFAULT_REPEAT,
+    warmup: int = 1,
+    only: Optional[List[str]] = None,
+    report: Optional[Callable[[str, Dict], None]] = None
+) -> Dict[str, Dict]:
+    """Run the cases (those whose name contains one of ``only``) and summarize them by name."""
+    results = {}
+    db = SessionLocal()
+    try:
+        ctx = context(db, dataset)
+        for case in CASES:
+            if only and not any(part in case.name for part in only):
+                continue
+            
+            def setup():
+                db.rollback()
+                bump_user_version(ctx["user_id"])
+                bump_user_version(ctx["user_id"], RULES_SCOPE)
+            
+            teardown = None
+            if case.undo is not None:
+                teardown = lambda result, undo=case.undo: undo(db, ctx, result)
+            
+            samples = time_calls(
+                lambda run=case.run: run(db, ctx),
+                repeat,
+                warmup=warmup,
+                setup=setup,
+                teardown=teardown
+            )
+            results[case.name] = summarize(samples)
+            if report is not None:
+                report(case.name, results[case.name])
+        db.rollback()
+    finally:
+        db.close()
+    return results
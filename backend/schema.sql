@@ -5,3 +5,47 @@
 -- Note: Tables are created automatically by SQLAlchemy models.
 -- See app/models/ for model definitions.
 
+
+-- Composite indexes on transactions (declared in app/models/transaction.py).
+-- For an existing production database, create them without blocking writes:
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_transactions_user_id_date
+    ON transactions (user_id, date DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_transactions_user_id_type_date
+    ON transactions (user_id, transaction_type, date);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_transactions_user_id_category_id_date
+    ON transactions (user_id, category_id, date);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_transactions_account_id_date
+    ON transactions (account_id, date);
+
+-- Budget running totals used for alerts (declared in app/models/budget.py).
+-- create_all does not add columns to an existing table; add them, then fill
+-- them from the rollups with `python -m app.db.rollups rebuild`. A NULL
+-- running_period_start also makes the next write to the budget recompute it:
+ALTER TABLE budgets ADD COLUMN IF NOT EXISTS running_spent NUMERIC(12, 2) NOT NULL DEFAULT 0;
+ALTER TABLE budgets ADD COLUMN IF NOT EXISTS running_period_start DATE;
+
+-- Unique rollup and statistics keys (declared in app/models/daily_rollup.py
+-- and app/models/category_month_stat.py); transaction writes upsert against
+-- them. COALESCE makes rows of uncategorized transactions collide too.
+-- They replace non-unique indexes of the same name. With the application
+-- stopped, drop those, merge duplicate rows with
+-- `python -m app.db.rollups rebuild`, then create the unique ones:
+DROP INDEX IF EXISTS ix_daily_rollups_key;
+DROP INDEX IF EXISTS ix_category_month_stats_key;
+CREATE UNIQUE INDEX ix_daily_rollups_key
+    ON daily_rollups (user_id, day, COALESCE(category_id, 0), account_id, transaction_type);
+CREATE UNIQUE INDEX ix_category_month_stats_key
+    ON category_month_stats (user_id, month, COALESCE(category_id, 0));
+
+-- Transaction text search indexes (declared in app/models/transaction.py).
+-- create_all does not add indexes to an existing transactions table; until
+-- these exist, q= searches scan the user's rows. pg_trgm provides the
+-- trigram operator class:
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_transactions_search
+    ON transactions USING gin ((
+        setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'A')
+        || setweight(to_tsvector('english'::regconfig, coalesce(notes, '')), 'B')
+    ));
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_transactions_description_trgm
+    ON transactions USING gin (description gin_trgm_ops);
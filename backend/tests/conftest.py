@@ -0,0 +1,103 @@
+"""
+Test fixtures: the app running on a private in-memory SQLite database.
+"""
+import os
+
+# Settings are read on import, so the test database is chosen first
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ["DATABASE_ASYNC"] = "false"
+os.environ["AUTO_CREATE_DB"] = "false"
+
+from decimal import Decimal
+from typing import List
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from app.core.response_cache import response_cache
+from app.core.security import create_access_token
+from app.db import init_db as _models  # noqa: F401 (registers every model)
+from app.db.base import Base
+from app.db.session import SessionLocal
+from app.dependencies import user_cache
+from app.main import app
+from app.models.account import Account, AccountType
+from app.models.user import User
+from app.services.categorization_service import matcher_cache
+from app.services.forecast_service import forecast_cache
+
+
+@pytest.fixture
+def engine() -> Engine:
+    """
+    A fresh in-memory database shared by every session and thread.
+
+    The app's sessions (request dependencies and the export stream) are
+    bound to it for the duration of the test.
+    """
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionLocal.configure(bind=engine)
+    # Ids restart with every database, so cached entries would leak across tests
+    for cache in (response_cache, user_cache, forecast_cache, matcher_cache):
+        cache.clear()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine: Engine) -> Session:
+    """A session on the test database."""
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def statements(engine: Engine) -> List[str]:
+    """SQL statements executed on the test database, from now on."""
+    executed: List[str] = []
+    
+    @event.listens_for(engine, "before_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+    
+    yield executed
+    event.remove(engine, "before_cursor_execute", _record)
+
+
+@pytest.fixture
+def user(db: Session) -> User:
+    """A user with one checking account."""
+    user = User(email="test@example.com", username="test", hashed_password="x")
+    db.add(user)
+    db.flush()
+    db.add(Account(
+        user_id=user.id,
+        name="Checking",
+        account_type=AccountType.CHECKING,
+        balance=Decimal("1000.00")
+    ))
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def account(db: Session, user: User) -> Account:
+    """The test user's account."""
+    return db.query(Account).filter(Account.user_id == user.id).one()
+
+
+@pytest.fixture
+def client(user: User) -> TestClient:
+    """An API client authenticated as the test user."""
+    client = TestClient(app)
+    token = create_access_token({"sub": str(user.id), "username": user.username})
+    client.headers["Authorization"] = f"Bearer {token}"
+    return client
@@ -0,0 +1,25 @@
+"""
+Refresh token handling.
+"""
+import pytest
+from app.core.security import create_refresh_token
+
+
+def test_refresh_issues_new_tokens(user, client):
+    token = create_refresh_token({"sub": str(user.id), "username": user.username})
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": token})
+    assert response.status_code == 200, response.text
+    assert response.json()["token_type"] == "bearer"
+
+
+@pytest.mark.parametrize("sub", [None, "", "abc", "1.5"])
+def test_refresh_rejects_malformed_subject(user, client, sub):
+    claims = {"username": user.username} if sub is None else {"sub": sub, "username": user.username}
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": create_refresh_token(claims)})
+    assert response.status_code == 401, response.text
+
+
+def test_refresh_rejects_access_token(client):
+    token = client.headers["Authorization"].split()[1]
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": token})
+    assert response.status_code == 401
@@ -0,0 +1,71 @@
+"""
+Account balance snapshot maintenance.
+"""
+from datetime import datetime, timedelta, timezone
+from app.models.account_balance_snapshot import AccountBalanceSnapshot
+from app.services.balance_history_service import BalanceHistoryService
+
+DAYS = 100
+
+
+def _snapshots(db, account_id):
+    db.expire_all()
+    return [
+        (row.day, row.balance, row.net_change)
+        for row in db.query(AccountBalanceSnapshot).filter(
+            AccountBalanceSnapshot.account_id == account_id
+        ).order_by(AccountBalanceSnapshot.day)
+    ]
+
+
+def _snapshot_writes(statements):
+    return [
+        statement for statement in statements
+        if "account_balance_snapshots" in statement and not statement.startswith("SELECT")
+    ]
+
+
+def _create(client, account, day, amount, transaction_type="expense"):
+    response = client.post("/api/v1/transactions/", json={
+        "account_id": account.id,
+        "amount": amount,
+        "transaction_type": transaction_type,
+        "date": day.isoformat()
+    })
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def test_backdated_writes_match_rebuild(db, account, client, statements):
+    start = datetime.now(timezone.utc) - timedelta(days=DAYS)
+    response = client.post("/api/v1/transactions/bulk", json=[
+        {
+            "account_id": account.id,
+            "amount": f"{day % 7 + 1}.10",
+            "transaction_type": "expense",
+            "date": (start + timedelta(days=day)).isoformat()
+        }
+        for day in range(DAYS)
+    ])
+    assert response.json()["imported"] == DAYS, response.text
+    assert len(_snapshot_writes(statements)) == 3
+    
+    statements.clear()
+    backdated = _create(client, account, start - timedelta(days=1), "250.00", "income")
+    assert len(_snapshot_writes(statements)) == 3
+    
+    moved = client.put(f"/api/v1/transactions/{backdated}", json={
+        "date": (start + timedelta(days=DAYS // 2)).isoformat()
+    })
+    assert moved.status_code == 200, moved.text
+    first = _create(client, account, start, "0.30", "income")
+    assert client.delete(f"/api/v1/transactions/{first}").status_code == 204
+    # Late in the evening at UTC-5, so on the next UTC day
+    late = (start + timedelta(days=10)).astimezone(timezone(timedelta(hours=-5))).replace(hour=23, minute=30)
+    _create(client, account, late, "4.00")
+    
+    incremental = _snapshots(db, account.id)
+    assert len(incremental) == DAYS
+    assert incremental[-1][1] == account.balance
+    BalanceHistoryService(db).rebuild()
+    assert _snapshots(db, account.id) == incremental
@@ -0,0 +1,117 @@
+"""
+Budget spending for many budgets at once, and budget alerts.
+"""
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from app.models.alert import Alert, AlertType
+from app.models.budget import Budget, BudgetPeriod
+from app.models.category import Category
+from app.services.budget_service import BudgetService
+from app.services.spending_service import SPENDING_CHUNK_SIZE
+
+# More budgets than SQLite (2000) or PostgreSQL (1664) allow result columns
+BUDGETS = 2500
+
+
+def _spend(client, account, category_id, amount):
+    response = client.post("/api/v1/transactions/", json={
+        "account_id": account.id,
+        "category_id": category_id,
+        "amount": amount,
+        "transaction_type": "expense",
+        "description": "spend",
+        "date": datetime.now(timezone.utc).isoformat()
+    })
+    assert response.status_code == 201, response.text
+
+
+def _add_budgets(db, user, category_ids, count):
+    start = date.today().replace(day=1)
+    db.add_all([
+        Budget(
+            user_id=user.id,
+            category_id=category_ids[index % len(category_ids)],
+            name=f"Budget {index}",
+            amount=Decimal("100.00"),
+            period=BudgetPeriod.MONTHLY,
+            start_date=start
+        )
+        for index in range(count)
+    ])
+    db.commit()
+
+
+def test_spending_of_many_budgets(db, user, account, client, statements):
+    food, rent = Category(name="Food"), Category(name="Rent")
+    db.add_all([food, rent])
+    db.commit()
+    _spend(client, account, food.id, "30.00")
+    _spend(client, account, food.id, "12.50")
+    _spend(client, account, rent.id, "900.00")
+    _add_budgets(db, user, [food.id, rent.id, None], BUDGETS)
+    user_id, food_id, rent_id = user.id, food.id, rent.id
+    
+    statements.clear()
+    budgets = BudgetService(db).get_user_budgets_with_spending(user_id, limit=BUDGETS)
+    
+    chunks = -(-BUDGETS // SPENDING_CHUNK_SIZE)
+    assert len(statements) <= 1 + chunks
+    assert len(budgets) == BUDGETS
+    expected = {food_id: Decimal("42.50"), rent_id: Decimal("900.00"), None: Decimal("942.50")}
+    for budget in budgets:
+        assert budget.spent == expected[budget.category_id], budget.name
+
+
+def test_budgets_with_spending_follow_cursor(db, user, account, client):
+    food = Category(name="Food")
+    db.add(food)
+    db.commit()
+    _spend(client, account, food.id, "20.00")
+    _add_budgets(db, user, [food.id], 5)
+    
+    seen = []
+    cursor = ""
+    while cursor is not None:
+        response = client.get("/api/v1/budgets/", params={"with_spending": True, "cursor": cursor, "limit": 2})
+        assert response.status_code == 200, response.text
+        page = response.json()
+        assert all(item["spent"] == "20.00" for item in page["items"])
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+    
+    assert seen == sorted(seen) and len(seen) == 5
+
+
+def test_alerts_roll_budgets_into_the_current_period(db, user, client):
+    this_month = date.today().replace(day=1)
+    last_month = (this_month - timedelta(days=1)).replace(day=1)
+    budget = Budget(
+        user_id=user.id,
+        name="Food",
+        amount=Decimal("100.00"),
+        period=BudgetPeriod.MONTHLY,
+        start_date=last_month,
+        running_spent=Decimal("95.00"),
+        running_period_start=last_month
+    )
+    db.add(budget)
+    db.flush()
+    db.add(Alert(
+        user_id=user.id,
+        budget_id=budget.id,
+        threshold=80,
+        alert_type=AlertType.WARNING,
+        spent=Decimal("95.00"),
+        budget_amount=Decimal("100.00"),
+        percentage=95.0
+    ))
+    db.commit()
+    
+    # No expense since last month, so no write rolled the budget over
+    response = client.get("/api/v1/alerts/")
+    assert response.status_code == 200, response.text
+    assert response.json() == []
+    
+    db.refresh(budget)
+    assert budget.running_period_start == this_month
+    assert budget.running_spent == 0
@@ -0,0 +1,56 @@
+"""
+Rule matching with regex rules that can't share one combined pattern.
+"""
+from types import SimpleNamespace
+from app.core.categorization import RuleMatcher, regex_hazard
+from app.models.category import Category
+
+
+def _rule(id, category_id, pattern):
+    return SimpleNamespace(
+        id=id, category_id=category_id, match_type="regex", pattern=pattern,
+        min_amount=None, max_amount=None, account_id=None, priority=0
+    )
+
+
+def test_matcher_with_repeated_group_name():
+    matcher = RuleMatcher([
+        _rule(1, 10, r"(?P<store>tesco) express"),
+        _rule(2, 20, r"(?P<store>aldi|lidl)"),
+    ])
+    assert matcher.regex_filter is None
+    assert matcher.match("TESCO EXPRESS 1234") == 10
+    assert matcher.match("lidl berlin") == 20
+    assert matcher.match("rent") is None
+
+
+def test_rules_with_repeated_group_name(db, client):
+    groceries = Category(name="Groceries")
+    db.add(groceries)
+    db.commit()
+    for pattern in (r"(?P<store>tesco)", r"(?P<store>aldi)"):
+        response = client.post("/api/v1/rules/", json={
+            "category_id": groceries.id, "match_type": "regex", "pattern": pattern
+        })
+        assert response.status_code == 201, response.text
+    
+    response = client.post("/api/v1/rules/apply")
+    assert response.status_code == 200, response.text
+
+
+def test_regex_hazards():
+    for pattern in (r"(a+)+$", r"(a|aa)+$", r"(\w+\s?)+$", r"(a\w|\wb)+", r".*a.*b.*c"):
+        assert regex_hazard(pattern), pattern
+    for pattern in (r"^amzn\s+mktp", r"uber\s*(eats)?", r"(?:foo|bar)+", r"(\d{2})+", r".*tesco.*"):
+        assert regex_hazard(pattern) is None, pattern
+
+
+def test_rules_with_catastrophic_backtracking_rejected(db, client):
+    groceries = Category(name="Groceries")
+    db.add(groceries)
+    db.commit()
+    response = client.post("/api/v1/rules/", json={
+        "category_id": groceries.id, "match_type": "regex", "pattern": r"(a+)+$"
+    })
+    assert response.status_code == 400, response.text
+    assert "backtrack" in response.json()["detail"]
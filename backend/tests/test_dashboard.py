@@ -0,0 +1,46 @@
+"""
+Dashboard summary query count.
+"""
+from datetime import datetime, timezone
+from app.core.config import settings
+from app.services.reports_service import ReportsService
+
+
+def _create(client, account, amount, transaction_type, description):
+    response = client.post("/api/v1/transactions/", json={
+        "account_id": account.id,
+        "amount": amount,
+        "transaction_type": transaction_type,
+        "description": description,
+        "date": datetime.now(timezone.utc).isoformat()
+    })
+    assert response.status_code == 201, response.text
+
+
+def test_dashboard_summary_runs_two_statements(db, user, account, client, statements):
+    for index in range(8):
+        _create(client, account, "25.00", "expense", f"groceries {index}")
+    _create(client, account, "2000.00", "income", "salary")
+    
+    statements.clear()
+    summary = ReportsService(db).get_dashboard_summary(user.id)
+    
+    assert len(statements) <= 2
+    assert summary["month_income"] == 2000.0
+    assert summary["month_expenses"] == 200.0
+    assert summary["total_balance"] == 2800.0
+    assert len(summary["recent_transactions"]) == 5
+
+
+def test_dashboard_endpoint_runs_two_statements(user, account, client, statements, monkeypatch):
+    _create(client, account, "40.00", "expense", "coffee")
+    # Neither the user lookup nor a cached response should hide the count
+    monkeypatch.setattr(settings, "AUTH_TRUST_TOKEN_CLAIMS", True)
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_TTL_SECONDS", 0)
+    
+    statements.clear()
+    response = client.get("/api/v1/dashboard/summary")
+    
+    assert response.status_code == 200
+    assert response.json()["month_expenses"] == 40.0
+    assert len(statements) <= 2
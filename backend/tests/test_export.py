@@ -0,0 +1,45 @@
+"""
+Transaction export memory use.
+"""
+import os
+from sqlalchemy import text
+import pytest
+from app.core.export import ExportFormat, encode_batches
+from app.services.transactions_service import EXPORT_COLUMNS, TransactionsService
+
+EXPORT_ROWS = 1_000_000
+
+# Allowed resident memory growth while streaming the whole export
+MAX_GROWTH_BYTES = 32 * 1024 * 1024
+
+
+def _resident_bytes() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="needs /proc to read resident memory")
+def test_export_memory_stays_bounded(engine, db, user, account):
+    with engine.begin() as connection:
+        connection.execute(text("""
+            WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :rows)
+            INSERT INTO transactions (user_id, account_id, amount, transaction_type, description, date)
+            SELECT :user_id, :account_id, (i % 10000) / 100.0, 'EXPENSE', 'row ' || i,
+                   datetime('2020-01-01', '+' || (i / 1000) || ' days')
+            FROM n
+        """), {"rows": EXPORT_ROWS, "user_id": user.id, "account_id": account.id})
+    
+    batches = TransactionsService(db).iter_export_batches(user.id)
+    chunks = encode_batches(ExportFormat.CSV, EXPORT_COLUMNS, batches)
+    
+    baseline = peak = _resident_bytes()
+    exported = lines = 0
+    for chunk in chunks:
+        exported += len(chunk)
+        lines += chunk.count(b"\n")
+        peak = max(peak, _resident_bytes())
+    
+    assert lines == EXPORT_ROWS + 1  # header
+    # The export is larger than the allowed growth, so it cannot have been buffered
+    assert exported > MAX_GROWTH_BYTES
+    assert peak - baseline < MAX_GROWTH_BYTES, f"grew by {(peak - baseline) / 2 ** 20:.1f} MiB"
@@ -0,0 +1,88 @@
+"""
+Rollup and category statistics upserts.
+"""
+from datetime import datetime, timedelta, timezone
+from app.models.category import Category
+from app.models.category_month_stat import CategoryMonthStat
+from app.models.daily_rollup import DailyRollup
+from app.services.category_stats_service import CategoryStatsService
+from app.services.rollup_service import RollupService
+
+DAYS = 300
+
+
+def _stats(db):
+    db.expire_all()
+    return {
+        (row.user_id, row.month, row.category_id): (
+            row.count, row.total, row.min_amount, row.max_amount, round(row.mean, 6), round(row.m2, 4)
+        )
+        for row in db.query(CategoryMonthStat)
+    }
+
+
+def _upserts(statements, table):
+    return [statement for statement in statements if statement.startswith(f"INSERT INTO {table}")]
+
+
+def test_import_upserts_each_table_once(db, account, client, statements):
+    food = Category(name="Food")
+    db.add(food)
+    db.commit()
+    category_id = food.id
+    start = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+    rows = [
+        {
+            "account_id": account.id,
+            "category_id": category_id if day % 2 else None,
+            "amount": f"{day % 50 + 1}.25",
+            "transaction_type": "expense",
+            "date": (start + timedelta(days=day)).isoformat()
+        }
+        for day in range(DAYS)
+    ]
+    
+    for _ in range(2):
+        statements.clear()
+        response = client.post("/api/v1/transactions/bulk", json=rows)
+        assert response.json()["imported"] == DAYS, response.text
+        assert len(_upserts(statements, "daily_rollups")) == 1
+        assert len(_upserts(statements, "category_month_stats")) == 1
+    
+    # The second import updated the existing rows, NULL categories included
+    assert db.query(DailyRollup).count() == DAYS
+    assert {row.count for row in db.query(DailyRollup)} == {2}
+    assert RollupService(db).find_inconsistencies() == []
+    incremental = _stats(db)
+    CategoryStatsService(db).rebuild()
+    assert _stats(db) == incremental
+
+
+def test_delete_prunes_emptied_rollup(db, account, client):
+    response = client.post("/api/v1/transactions/", json={
+        "account_id": account.id,
+        "amount": "12.00",
+        "transaction_type": "expense",
+        "date": datetime.now(timezone.utc).isoformat()
+    })
+    assert db.query(DailyRollup).count() == 1
+    
+    assert client.delete(f"/api/v1/transactions/{response.json()['id']}").status_code == 204
+    db.expire_all()
+    assert db.query(DailyRollup).count() == 0
+    assert db.query(CategoryMonthStat).count() == 0
+
+
+def test_rollup_day_of_offset_timestamp(db, account, client):
+    # 23:30 at UTC-5 is already the next day in UTC
+    response = client.post("/api/v1/transactions/", json={
+        "account_id": account.id,
+        "amount": "10.00",
+        "transaction_type": "expense",
+        "description": "late dinner",
+        "date": "2024-03-01T23:30:00-05:00"
+    })
+    assert response.status_code == 201, response.text
+    
+    assert [row.day for row in db.query(DailyRollup)] == [datetime(2024, 3, 2).date()]
+    assert RollupService(db).find_inconsistencies() == []
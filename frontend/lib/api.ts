@@ -7,8 +7,11 @@ import { AccountsSchema, type Accounts } from '@/lib/schemas/account'
 import {
   ExpensesByCategorySchema,
   IncomeVsExpensesSchema,
+  IncomeVsExpensesTrendSchema,
   type ExpensesByCategory,
   type IncomeVsExpenses,
+  type IncomeVsExpensesTrend,
+  type TrendGranularity,
 } from '@/lib/schemas/reports'
 
 const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000/api/v1';
@@ -155,8 +158,8 @@ class ApiClient {
   }
 
   // Budget endpoints
-  async getBudgets() {
-    const response = await this.client.get('/budgets');
+  async getBudgets(params?: any) {
+    const response = await this.client.get('/budgets', { params });
     return response.data;
   }
 
@@ -224,6 +227,13 @@ class ApiClient {
     });
     return IncomeVsExpensesSchema.parse(response.data) as IncomeVsExpenses;
   }
+
+  async getIncomeVsExpensesTrend(granularity: TrendGranularity, startDate?: string, endDate?: string) {
+    const response = await this.client.get('/reports/income-vs-expenses', {
+      params: { granularity, start_date: startDate, end_date: endDate },
+    });
+    return IncomeVsExpensesTrendSchema.parse(response.data) as IncomeVsExpensesTrend;
+  }
 }
 
 export const apiClient = new ApiClient();
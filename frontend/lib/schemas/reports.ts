@@ -25,4 +25,16 @@ export const IncomeVsExpensesSchema = z.object({
 
 export type IncomeVsExpenses = z.infer<typeof IncomeVsExpensesSchema>
 
+export const TrendGranularitySchema = z.enum(['day', 'week', 'month', 'quarter'])
+export type TrendGranularity = z.infer<typeof TrendGranularitySchema>
 
+export const IncomeVsExpensesTrendSchema = z.object({
+  granularity: TrendGranularitySchema,
+  series: z.array(
+    IncomeVsExpensesSchema.extend({
+      period: z.string(),
+    })
+  ),
+})
+
+export type IncomeVsExpensesTrend = z.infer<typeof IncomeVsExpensesTrendSchema>